@@ -1,4 +1,6 @@
 # config.py
+import os
+
 # -------------------------------------------------
 # Application Configuration (Global)
 # -------------------------------------------------
@@ -14,11 +16,87 @@ LAYOUT = "wide"
 # -------------------------------------------------
 SESSION_DF_KEY = "df"
 
+# Columns read by name on dashboards (in addition to auto-detected roles)
+CORE_COLUMNS = [
+    "ORDER_DATE", "ORDER_ID", "AMOUNT", "TOTAL_QUANTITY",
+    "CITY", "WAREHOUSE", "BRAND", "ORDERSTATE", "ORDERTYPE"
+]
+
+# -------------------------------------------------
+# Dataset Cache (Parquet, content-addressed)
+# -------------------------------------------------
+ENABLE_DATASET_CACHE = True
+DATASET_CACHE_DIR = os.environ.get("DS_DATASET_CACHE_DIR", ".cache/datasets")
+DATASET_CACHE_MAX_BYTES = 10 * 1024 ** 3  # LRU eviction above 10 GB
+
+# -------------------------------------------------
+# Streaming CSV Ingestion
+# -------------------------------------------------
+CSV_CHUNK_ROWS = 250_000
+CSV_SAMPLE_ROWS = 20_000
+CSV_SAMPLE_BYTES = 4 * 1024 * 1024
+STREAMING_MIN_BYTES = 200 * 1024 ** 2  # auto-enable streaming above 200 MB
+CATEGORY_MAX_RATIO = 0.5  # max unique/rows ratio for categorical columns
+
+INGEST_MAX_WORKERS = 4  # files parsed in parallel on multi-file upload
+
+# -------------------------------------------------
+# Server-side Ingestion (whitelisted directory, memory-mapped)
+# -------------------------------------------------
+SERVER_DATA_DIR = os.environ.get("DS_SERVER_DATA_DIR")  # unset = disabled
+SERVER_FILE_EXTENSIONS = (".csv", ".xlsx", ".xls", ".parquet", ".arrow", ".feather")
+
+# -------------------------------------------------
+# Excel Ingestion
+# -------------------------------------------------
+EXCEL_MAX_WORKERS = 4  # sheets parsed in parallel
+EXCEL_SHEET_COLUMN = "SHEET"  # source sheet label when several are combined
+EXCEL_BLOCK_ROWS = 50_000  # streamed rows converted to columns at a time
+
 # -------------------------------------------------
 # Date & Formatting
 # -------------------------------------------------
 DEFAULT_DATE_FORMAT = "%Y-%m-%d"
+DATE_SAMPLE_SIZE = 1000  # values used to infer a date column's format
+DATE_MIN_PARSE_RATIO = 0.8  # share of sample that must parse to convert
 CURRENCY_SYMBOL = "₹"
+FISCAL_YEAR_START_MONTH = 4  # fiscal year starts in April
+
+# -------------------------------------------------
+# OLAP Cube (pre-aggregated rollups)
+# -------------------------------------------------
+CUBE_BUILD_ON_UPLOAD = True  # otherwise built on first use
+CUBE_MAX_ROLLUPS = 48  # materialized rollups kept per dataset
+CUBE_MAX_DATASETS = 2  # cubes kept in memory across uploads
+ORDER_SKETCHES = True  # HyperLogLog order sketches per day x filter cell
+HLL_PRECISION = 12  # 2**12 registers, ~1.6% standard error
+HLL_MERGE_BLOCK_BYTES = 2 ** 24  # dense registers built at once when merging sketches
+QUANTILE_SKETCH_ALPHA = 0.01  # order value quantiles within ±1%
+ORDER_VALUE_PERCENTILES = [0.5, 0.9, 0.99]
+
+# -------------------------------------------------
+# Date Layout (rows stored sorted by order date)
+# -------------------------------------------------
+SORT_BY_DATE = True
+ZONE_MAP_CHUNK_ROWS = 65_536  # rows per min/max zone
+
+# -------------------------------------------------
+# Aggregation Result Cache (LRU)
+# -------------------------------------------------
+AGG_CACHE_MAX_BYTES = 256 * 1024 ** 2
+AGG_CACHE_MAX_ENTRIES = 1024
+
+# -------------------------------------------------
+# Top-N Charts (approximate heavy hitters)
+# -------------------------------------------------
+HEAVY_HITTER_EPSILON = 0.001  # max over-count as a share of the total
+HEAVY_HITTER_MIN_GROUPS = 200_000  # approximate only above this many groups
+
+# -------------------------------------------------
+# Rolling Windows (dense daily series)
+# -------------------------------------------------
+TRAILING_WINDOWS = [7, 28, 90]  # days summed / averaged per point
+YOY_LAG_DAYS = 364  # 52 weeks, so compared days fall on the same weekday
 
 # -------------------------------------------------
 # Forecasting Defaults
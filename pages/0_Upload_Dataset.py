@@ -1,5 +1,11 @@
 import streamlit as st
-from utils.data_loader import load_dataset
+from utils.data_loader import file_kind, load_dataset, load_datasets
+from utils.excel_ingest import list_sheets
+from utils.server_source import (
+    list_server_files,
+    open_server_file,
+    server_source_enabled
+)
 
 # -------------------------------------------------
 # Page Config
@@ -72,27 +78,177 @@ st.markdown(
 # -------------------------------------------------
 st.markdown('<div class="upload-card">', unsafe_allow_html=True)
 
-uploaded_file = st.file_uploader(
-    "Upload CSV or Excel File",
-    type=["csv", "xlsx"],
-    help="Supported formats: CSV, XLSX"
-)
+source = "Upload File(s)"
+if server_source_enabled():
+    source = st.radio(
+        "Data Source",
+        ["Upload File(s)", "Server Directory"],
+        horizontal=True,
+        help="Server Directory reads extracts already on this machine via "
+             "memory-mapped I/O, without buffering an upload in RAM"
+    )
 
-if uploaded_file is not None:
-    with st.spinner("Processing dataset..."):
-        df = load_dataset(uploaded_file)
+if source == "Server Directory":
+    selected_paths = st.multiselect(
+        "Files in server data directory",
+        list_server_files(),
+        help="Supported formats: CSV, XLSX, XLS, Parquet, Arrow/Feather"
+    )
+    try:
+        uploaded_files = [open_server_file(name) for name in selected_paths]
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        st.stop()
+else:
+    uploaded_files = st.file_uploader(
+        "Upload CSV or Excel File(s)",
+        type=["csv", "xlsx", "xls"],
+        accept_multiple_files=True,
+        help="Supported formats: CSV, XLSX, XLS. Several daily extracts can be uploaded together."
+    )
 
-    if df is not None and not df.empty:
-        # 🔒 CRITICAL: Keep BOTH keys for backward compatibility
-        st.session_state["data"] = df
-        st.session_state["df"] = df
+with st.expander("⚙ Ingestion Options"):
+    streaming_mode = st.checkbox(
+        "Streaming ingestion (chunked CSV reading for very large files)",
+        value=False,
+        help="Enabled automatically for uploaded CSV files above 200 MB; "
+             "server files are always read through their memory map"
+    )
+    compact_mode = st.checkbox(
+        "Compact in-memory representation (categoricals + narrower integer keys)",
+        value=True,
+        help="Dictionary-encodes repetitive text columns and narrows integer key "
+             "columns (IDs, codes) to 32 bits; measures keep their 64-bit types"
+    )
+    keep_all_columns = st.checkbox(
+        "Keep all columns",
+        value=False,
+        help="By default only the columns used by the dashboards are loaded"
+    )
+
+append_mode = False
+if uploaded_files and st.session_state.get("df") is not None:
+    append_mode = st.radio(
+        "Load Mode",
+        ["Replace current dataset", "Append to current dataset"],
+        horizontal=True,
+        help="Append adds new deltas and replaces order lines already loaded "
+             "(matched on ORDER_ID + line key)"
+    ) == "Append to current dataset"
+
+selected_sheets = None
+if (
+    len(uploaded_files) == 1
+    and file_kind(uploaded_files[0].name) == "excel"
+):
+    sheet_names = list_sheets(uploaded_files[0])
+    selected_sheets = st.multiselect(
+        "Sheets to load",
+        sheet_names,
+        default=sheet_names[:1],
+        help="Several sheets are parsed in parallel and combined into one dataset"
+    )
+    if not selected_sheets:
+        st.info("Select at least one sheet to load.")
+        st.stop()
+
+if uploaded_files:
+    # Streamlit reruns this page on every interaction: only ingest again
+    # when the files or options changed. file_id is new for every upload,
+    # even of a file with the same name and size; content is only hashed
+    # (for the Parquet cache) when a load actually happens
+    upload_signature = (
+        tuple((f.name, f.size, f.file_id) for f in uploaded_files),
+        streaming_mode,
+        compact_mode,
+        keep_all_columns,
+        tuple(selected_sheets or ()),
+        append_mode
+    )
+
+    if st.session_state.get("upload_signature") == upload_signature:
+        df = st.session_state.get("df")
+    else:
+        progress = st.progress(0.0, text="Reading dataset...")
+
+        def _update_progress(fraction):
+            progress.progress(fraction, text=f"Reading dataset... {fraction:.0%}")
+
+        with st.spinner("Processing dataset..."):
+            if len(uploaded_files) == 1 and not append_mode:
+                df = load_dataset(
+                    uploaded_files[0],
+                    streaming=True if streaming_mode else None,
+                    compact=compact_mode,
+                    sheets=selected_sheets,
+                    project=not keep_all_columns,
+                    progress_callback=_update_progress
+                )
+                st.session_state["append_report"] = None
+            else:
+                df = load_datasets(
+                    uploaded_files,
+                    append=append_mode,
+                    compact=compact_mode,
+                    sheets=selected_sheets,
+                    project=not keep_all_columns,
+                    progress_callback=_update_progress
+                )
 
+        progress.empty()
+
+        if df is not None:
+            st.session_state["upload_signature"] = upload_signature
+
+    if source == "Server Directory":
+        for server_file in uploaded_files:
+            server_file.close()
+
+    if df is not None and not df.empty:
         st.success("✅ Dataset loaded successfully")
 
+        if st.session_state.get("dataset_cache_hit"):
+            st.caption("⚡ Served from local Parquet cache (file previously ingested)")
+
+        file_types = sorted({f.name.split(".")[-1].upper() for f in uploaded_files})
+
         c1, c2, c3 = st.columns(3)
         c1.metric("Rows", f"{df.shape[0]:,}")
         c2.metric("Columns", df.shape[1])
-        c3.metric("File Type", uploaded_file.name.split(".")[-1].upper())
+        c3.metric(
+            "Files" if len(uploaded_files) > 1 else "File Type",
+            len(uploaded_files) if len(uploaded_files) > 1 else file_types[0]
+        )
+
+        append_report = st.session_state.get("append_report")
+        if append_report:
+            a1, a2, a3 = st.columns(3)
+            a1.metric("Files Combined", append_report["files"])
+            a2.metric("New Lines Added", f"{append_report['added_rows']:,}")
+            a3.metric("Duplicate Lines Replaced", f"{append_report['replaced_rows']:,}")
+            if not append_report.get("line_key", True):
+                st.warning(
+                    "No order line number column found: only identical lines were "
+                    "de-duplicated, so lines changed since the earlier file appear twice."
+                )
+
+        date_failures = st.session_state.get("date_parse_failures")
+        if date_failures:
+            st.warning(
+                "Some dates did not match their column's format and were left empty: "
+                + ", ".join(f"{col} ({failed:,} values)" for col, failed in date_failures.items())
+            )
+
+        memory_report = st.session_state.get("memory_report")
+        if memory_report:
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Memory Before", f"{memory_report['before'] / 1024 ** 2:,.1f} MB")
+            m2.metric("Memory After", f"{memory_report['after'] / 1024 ** 2:,.1f} MB")
+            m3.metric(
+                "Memory Saved",
+                f"{memory_report['saved'] / 1024 ** 2:,.1f} MB",
+                f"{memory_report['saved_pct']:.0f}%"
+            )
 
         st.divider()
 
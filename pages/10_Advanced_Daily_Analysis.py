@@ -4,6 +4,10 @@ import numpy as np
 import plotly.express as px
 from prophet import Prophet
 
+from utils.cube import get_cube
+from utils.schema import get_schema
+from utils.time_windows import TOTAL, daily_series
+
 # -------------------------------------------------
 # Page Config
 # -------------------------------------------------
@@ -72,34 +76,44 @@ if "data" not in st.session_state or st.session_state["data"] is None:
     st.warning("📤 Please upload data from the **Upload Dataset** page.")
     st.stop()
 
-df = st.session_state["data"].copy()
+df = st.session_state["data"]
+schema = get_schema(df)
 
 # -------------------------------------------------
 # Required Columns Check
 # -------------------------------------------------
-required_cols = [
-    "ORDER_DATE", "ORDER_ID", "AMOUNT",
-    "TOTAL_QUANTITY", "CITY", "WAREHOUSE", "BRAND"
+required_roles = [
+    "date", "order_id", "sales",
+    "quantity", "city", "warehouse", "brand"
 ]
 
-missing_cols = [c for c in required_cols if c not in df.columns]
+missing_cols = schema.missing(required_roles)
 if missing_cols:
     st.error(f"❌ Missing required columns: {missing_cols}")
     st.stop()
 
-# -------------------------------------------------
-# Data Preprocessing
-# -------------------------------------------------
-df["ORDER_DATE"] = pd.to_datetime(df["ORDER_DATE"], errors="coerce")
-df = df.dropna(subset=["ORDER_DATE"])
+date_col = schema.col("date")
+sales_col = schema.col("sales")
+qty_col = schema.col("quantity")
+city_col = schema.col("city")
+warehouse_col = schema.col("warehouse")
+brand_col = schema.col("brand")
+
+# Every aggregate below is answered from the pre-built cube
+cube = get_cube(df)
 
 # -------------------------------------------------
 # Sidebar Filters (UI only)
 # -------------------------------------------------
 st.sidebar.markdown("### 🔍 Filters")
 
-min_date = df["ORDER_DATE"].min().date()
-max_date = df["ORDER_DATE"].max().date()
+if schema.date_min is not None and pd.notna(schema.date_min):
+    min_date = schema.date_min.date()
+    max_date = schema.date_max.date()
+else:
+    order_days = cube.labels(date_col)
+    min_date = order_days.min().date()
+    max_date = order_days.max().date()
 
 date_range = st.sidebar.date_input(
     "Select Date Range",
@@ -110,41 +124,51 @@ date_range = st.sidebar.date_input(
 
 city_filter = st.sidebar.multiselect(
     "City",
-    sorted(df["CITY"].dropna().unique())
+    sorted(cube.labels(city_col))
 )
 
 warehouse_filter = st.sidebar.multiselect(
     "Warehouse",
-    sorted(df["WAREHOUSE"].dropna().unique())
+    sorted(cube.labels(warehouse_col))
 )
 
 brand_filter = st.sidebar.multiselect(
     "Brand",
-    sorted(df["BRAND"].dropna().unique())
+    sorted(cube.labels(brand_col))
 )
 
-filtered_df = df[
-    (df["ORDER_DATE"].dt.date >= date_range[0]) &
-    (df["ORDER_DATE"].dt.date <= date_range[1])
-]
+exact_orders = st.sidebar.toggle(
+    "Exact order counts",
+    value=cube.order_sketch is None,
+    help="Off: merge pre-built HyperLogLog sketches (fast, approximate)."
+)
+if not exact_orders and cube.order_count_error is not None:
+    st.sidebar.caption(f"Order counts ±{cube.order_count_error:.1%} (HyperLogLog)")
 
-if city_filter:
-    filtered_df = filtered_df[filtered_df["CITY"].isin(city_filter)]
-if warehouse_filter:
-    filtered_df = filtered_df[filtered_df["WAREHOUSE"].isin(warehouse_filter)]
-if brand_filter:
-    filtered_df = filtered_df[filtered_df["BRAND"].isin(brand_filter)]
+filters = {
+    date_col: (date_range[0], date_range[1]),
+    city_col: city_filter or None,
+    warehouse_col: warehouse_filter or None,
+    brand_col: brand_filter or None
+}
 
 # -------------------------------------------------
-# Daily Aggregation
+# Daily Aggregation (daily and top-contributor rollups in one pass)
 # -------------------------------------------------
-daily_sales = filtered_df.groupby(filtered_df["ORDER_DATE"].dt.date).agg(
-    Total_Sales_Amount=("AMOUNT", "sum"),
-    Total_Quantity=("TOTAL_QUANTITY", "sum"),
-    Total_Orders=("ORDER_ID", "nunique")
-).reset_index()
+rollups = cube.grouping_sets(
+    [[date_col], [city_col], [warehouse_col], [brand_col]],
+    where=filters,
+    orders=True,
+    approximate=not exact_orders
+)
+daily_cells = rollups[(date_col,)]
 
-daily_sales.rename(columns={"ORDER_DATE": "Date"}, inplace=True)
+daily_sales = pd.DataFrame({
+    "Date": daily_cells[date_col].dt.date,
+    "Total_Sales_Amount": daily_cells[sales_col],
+    "Total_Quantity": daily_cells[qty_col],
+    "Total_Orders": daily_cells["orders"]
+})
 
 # -------------------------------------------------
 # Growth Metrics
@@ -154,23 +178,21 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-daily_sales["Week"] = pd.to_datetime(daily_sales["Date"]).dt.isocalendar().week
-daily_sales["Month"] = pd.to_datetime(daily_sales["Date"]).dt.to_period("M")
-
-weekly_growth = (
-    daily_sales.groupby("Week")["Total_Sales_Amount"]
-    .sum().pct_change().fillna(0) * 100
+# Calendar weeks are keyed by their Monday, so weeks of different years
+# never collapse together
+sales_series = daily_series(df, date_col, sales_col, where=filters)
+weekly_growth = sales_series.period_growth("W")[TOTAL]
+monthly_growth = sales_series.period_growth("M")[TOTAL]
+yearly_growth = sales_series.latest(sales_series.yoy())[TOTAL]
+
+g1, g2, g3 = st.columns(3)
+g1.metric("Week-on-Week Growth", f"{weekly_growth:.2f}%")
+g2.metric("Month-on-Month Growth", f"{monthly_growth:.2f}%")
+g3.metric(
+    "Year-on-Year (last 28 days)",
+    "n/a" if pd.isna(yearly_growth) else f"{yearly_growth:.2f}%"
 )
 
-monthly_growth = (
-    daily_sales.groupby("Month")["Total_Sales_Amount"]
-    .sum().pct_change().fillna(0) * 100
-)
-
-g1, g2 = st.columns(2)
-g1.metric("Week-on-Week Growth", f"{weekly_growth.iloc[-1]:.2f}%")
-g2.metric("Month-on-Month Growth", f"{monthly_growth.iloc[-1]:.2f}%")
-
 st.divider()
 
 # -------------------------------------------------
@@ -181,14 +203,14 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-top_cities = filtered_df.groupby("CITY")["AMOUNT"].sum().nlargest(5).reset_index()
-top_warehouses = filtered_df.groupby("WAREHOUSE")["AMOUNT"].sum().nlargest(5).reset_index()
-top_brands = filtered_df.groupby("BRAND")["AMOUNT"].sum().nlargest(5).reset_index()
+top_cities = rollups[(city_col,)].set_index(city_col)[sales_col].nlargest(5).reset_index()
+top_warehouses = rollups[(warehouse_col,)].set_index(warehouse_col)[sales_col].nlargest(5).reset_index()
+top_brands = rollups[(brand_col,)].set_index(brand_col)[sales_col].nlargest(5).reset_index()
 
 c1, c2, c3 = st.columns(3)
-c1.bar_chart(top_cities.set_index("CITY"))
-c2.bar_chart(top_warehouses.set_index("WAREHOUSE"))
-c3.bar_chart(top_brands.set_index("BRAND"))
+c1.bar_chart(top_cities.set_index(city_col))
+c2.bar_chart(top_warehouses.set_index(warehouse_col))
+c3.bar_chart(top_brands.set_index(brand_col))
 
 st.divider()
 
@@ -200,14 +222,16 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-heatmap_df = filtered_df.copy()
-heatmap_df["Day"] = heatmap_df["ORDER_DATE"].dt.day
-heatmap_df["Month"] = heatmap_df["ORDER_DATE"].dt.month
+heatmap_df = pd.DataFrame({
+    "Day": daily_cells[date_col].dt.day,
+    "Month": daily_cells[date_col].dt.month,
+    sales_col: daily_cells[sales_col]
+})
 
 pivot = heatmap_df.pivot_table(
     index="Day",
     columns="Month",
-    values="AMOUNT",
+    values=sales_col,
     aggfunc="sum",
     fill_value=0
 )
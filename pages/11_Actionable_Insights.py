@@ -2,6 +2,12 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from config import TRAILING_WINDOWS
+from utils.cube import get_cube
+from utils.kpi_engine import compute_kpis
+from utils.schema import get_schema
+from utils.time_windows import CALENDARS, GRANULARITIES, TOTAL, daily_series, year_label
+
 # -------------------------------------------------
 # Page config
 # -------------------------------------------------
@@ -19,45 +25,64 @@ if "data" not in st.session_state or st.session_state["data"] is None:
     st.warning("⚠ Please upload a dataset from the Upload Dataset page.")
     st.stop()
 
-df = st.session_state["data"].copy()
+df = st.session_state["data"]
+schema = get_schema(df)
 
 # -------------------------------------------------
 # Column validation
 # -------------------------------------------------
-required_cols = [
-    "ORDER_DATE",
-    "AMOUNT",
-    "CITY",
-    "WAREHOUSE",
-    "BRAND"
+required_roles = [
+    "date",
+    "sales",
+    "city",
+    "warehouse",
+    "brand"
 ]
 
-missing_cols = [c for c in required_cols if c not in df.columns]
+missing_cols = schema.missing(required_roles)
 if missing_cols:
     st.error(f"❌ Missing required columns: {missing_cols}")
     st.stop()
 
+date_col = schema.col("date")
+sales_col = schema.col("sales")
+city_col = schema.col("city")
+warehouse_col = schema.col("warehouse")
+brand_col = schema.col("brand")
+
 # -------------------------------------------------
-# Data preparation
+# Data preparation (every rollup of the page in one cube pass)
 # -------------------------------------------------
-df["ORDER_DATE"] = pd.to_datetime(df["ORDER_DATE"], errors="coerce")
-df = df.dropna(subset=["ORDER_DATE"])
+cube = get_cube(df)
+rollups = cube.grouping_sets([
+    [date_col],
+    [city_col],
+    [warehouse_col],
+    [brand_col]
+])
+daily = rollups[(date_col,)]
+
+daily["order_day"] = daily[date_col].dt.day
+daily["order_month"] = daily[date_col].dt.month
 
-df["order_day"] = df["ORDER_DATE"].dt.day
-df["order_month"] = df["ORDER_DATE"].dt.month
-df["order_week"] = df["ORDER_DATE"].dt.isocalendar().week
-df["order_year"] = df["ORDER_DATE"].dt.year
+# Dense daily sales (overall and per dimension) with prefix sums: every
+# trend and trailing window below is read from these, not the rows
+sales_series = daily_series(df, date_col, sales_col)
 
 # -------------------------------------------------
 # KPI SECTION
 # -------------------------------------------------
 st.subheader("🚦 Business KPIs")
 
-total_sales = df["AMOUNT"].sum()
-daily_sales = df.groupby("ORDER_DATE")["AMOUNT"].sum()
+kpis = compute_kpis(
+    df,
+    ["total_sales", "avg_daily_sales", "best_day_sales"],
+    cols={"sales": sales_col, "date": date_col}
+)
 
-avg_daily_sales = daily_sales.mean()
-best_day_sales = daily_sales.max()
+total_sales = kpis.get("total_sales", 0)
+avg_daily_sales = kpis.get("avg_daily_sales", 0)
+best_day_sales = kpis.get("best_day_sales", 0)
 
 k1, k2, k3 = st.columns(3)
 
@@ -76,45 +101,42 @@ c1, c2, c3 = st.columns(3)
 
 with c1:
     top_cities = (
-        df.groupby("CITY", as_index=False)["AMOUNT"]
-        .sum()
-        .sort_values("AMOUNT", ascending=False)
+        rollups[(city_col,)][[city_col, sales_col]]
+        .sort_values(sales_col, ascending=False)
         .head(5)
     )
     fig = px.bar(
         top_cities,
-        x="CITY",
-        y="AMOUNT",
+        x=city_col,
+        y=sales_col,
         title="Top 5 Cities by Sales"
     )
     st.plotly_chart(fig, use_container_width=True)
 
 with c2:
     top_warehouses = (
-        df.groupby("WAREHOUSE", as_index=False)["AMOUNT"]
-        .sum()
-        .sort_values("AMOUNT", ascending=False)
+        rollups[(warehouse_col,)][[warehouse_col, sales_col]]
+        .sort_values(sales_col, ascending=False)
         .head(5)
     )
     fig = px.bar(
         top_warehouses,
-        x="WAREHOUSE",
-        y="AMOUNT",
+        x=warehouse_col,
+        y=sales_col,
         title="Top 5 Warehouses by Sales"
     )
     st.plotly_chart(fig, use_container_width=True)
 
 with c3:
     top_brands = (
-        df.groupby("BRAND", as_index=False)["AMOUNT"]
-        .sum()
-        .sort_values("AMOUNT", ascending=False)
+        rollups[(brand_col,)][[brand_col, sales_col]]
+        .sort_values(sales_col, ascending=False)
         .head(5)
     )
     fig = px.bar(
         top_brands,
-        x="BRAND",
-        y="AMOUNT",
+        x=brand_col,
+        y=sales_col,
         title="Top 5 Brands by Sales"
     )
     st.plotly_chart(fig, use_container_width=True)
@@ -127,14 +149,15 @@ st.divider()
 st.subheader("🔥 Sales Heatmap (Day vs Month)")
 
 heatmap_df = (
-    df.groupby(["order_day", "order_month"], as_index=False)
-    .agg({"AMOUNT": "sum"})
+    daily[["order_day", "order_month", sales_col]]
+    .groupby(["order_day", "order_month"], as_index=False)
+    .agg({sales_col: "sum"})
 )
 
 pivot_heatmap = heatmap_df.pivot(
     index="order_day",
     columns="order_month",
-    values="AMOUNT"
+    values=sales_col
 ).fillna(0)
 
 fig_heatmap = px.imshow(
@@ -158,37 +181,147 @@ st.divider()
 # -------------------------------------------------
 st.subheader("📈 Growth Trends")
 
-g1, g2 = st.columns(2)
+yoy_mode = st.toggle(
+    "Year-over-year comparison",
+    help="Compare two years day by day, week by week or month by month, "
+         "aligned on the ISO or fiscal calendar."
+)
 
-with g1:
-    weekly_sales = (
-        df.groupby(["order_year", "order_week"], as_index=False)["AMOUNT"]
-        .sum()
+if yoy_mode:
+    # Every choice below re-reads the cached dense daily arrays only
+    y1, y2, y3 = st.columns(3)
+    calendar = y1.radio(
+        "Calendar",
+        CALENDARS,
+        format_func={"iso": "ISO week", "fiscal": "Fiscal year"}.get,
+        horizontal=True
     )
-    fig = px.line(
-        weekly_sales,
-        x="order_week",
-        y="AMOUNT",
-        color="order_year",
-        markers=True,
-        title="Week-on-Week Sales Trend"
+    granularity = y2.radio(
+        "Granularity",
+        GRANULARITIES,
+        index=1,
+        format_func=str.title,
+        horizontal=True
     )
-    st.plotly_chart(fig, use_container_width=True)
+    split_by = y3.selectbox("Split by", ["Overall", city_col, warehouse_col, brand_col])
 
-with g2:
-    monthly_sales = (
-        df.groupby(["order_year", "order_month"], as_index=False)["AMOUNT"]
-        .sum()
-    )
-    fig = px.line(
-        monthly_sales,
-        x="order_month",
-        y="AMOUNT",
-        color="order_year",
-        markers=True,
-        title="Month-on-Month Sales Trend"
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    if split_by == "Overall":
+        compared, member = sales_series, TOTAL
+    else:
+        compared = daily_series(df, date_col, sales_col, by=split_by)
+        member = st.selectbox(split_by, list(compared.names))
+
+    years = compared.years(calendar)
+    if len(years) < 2:
+        st.info("ℹ️ At least two years of data are needed for a year-over-year comparison.")
+    else:
+        c1, c2 = st.columns(2)
+        year = c1.selectbox(
+            "Year",
+            years[::-1],
+            format_func=lambda each: year_label(each, calendar)
+        )
+        compare_year = c2.selectbox(
+            "Compare with",
+            [other for other in years[::-1] if other != year],
+            format_func=lambda each: year_label(each, calendar)
+        )
+
+        aligned = compared.year_over_year(year, compare_year, calendar, granularity, member)
+        current, previous = year_label(year, calendar), year_label(compare_year, calendar)
+
+        k1, k2, k3 = st.columns(3)
+        k1.metric(current, f"₹ {aligned[current].sum():,.0f}")
+        k2.metric(previous, f"₹ {aligned[previous].sum():,.0f}")
+        like_for_like = aligned[[current, previous]].dropna()
+        if like_for_like[previous].sum():
+            change = (like_for_like[current].sum() / like_for_like[previous].sum() - 1) * 100
+            k3.metric("Like-for-like Change", f"{change:.2f}%")
+        else:
+            k3.metric("Like-for-like Change", "n/a")
+
+        fig = px.line(
+            aligned.reset_index(),
+            x=granularity,
+            y=[current, previous],
+            markers=granularity != "day",
+            labels={"value": sales_col, "variable": "Year"},
+            title=f"{member}: {current} vs {previous}"
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+        fig = px.bar(
+            aligned.reset_index(),
+            x=granularity,
+            y="Change %",
+            title="Year-over-Year Change %"
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+else:
+    g1, g2 = st.columns(2)
+
+    with g1:
+        weekly_totals = sales_series.period_totals("W")[TOTAL]
+        iso = weekly_totals.index.isocalendar()
+        weekly_sales = pd.DataFrame({
+            "order_year": iso["year"].to_numpy(),
+            "order_week": iso["week"].to_numpy(),
+            sales_col: weekly_totals.to_numpy()
+        })
+        fig = px.line(
+            weekly_sales,
+            x="order_week",
+            y=sales_col,
+            color="order_year",
+            markers=True,
+            title="Week-on-Week Sales Trend"
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    with g2:
+        monthly_totals = sales_series.period_totals("M")[TOTAL]
+        monthly_sales = pd.DataFrame({
+            "order_year": monthly_totals.index.year,
+            "order_month": monthly_totals.index.month,
+            sales_col: monthly_totals.to_numpy()
+        })
+        fig = px.line(
+            monthly_sales,
+            x="order_month",
+            y=sales_col,
+            color="order_year",
+            markers=True,
+            title="Month-on-Month Sales Trend"
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+trailing = pd.DataFrame({
+    f"{window}-day average": sales_series.moving_average(window)[0]
+    for window in TRAILING_WINDOWS
+}, index=sales_series.days)
+fig = px.line(
+    trailing,
+    labels={"index": "Date", "value": sales_col, "variable": "Window"},
+    title="Trailing Average Daily Sales"
+)
+st.plotly_chart(fig, use_container_width=True)
+
+# -------------------------------------------------
+# MOMENTUM (trailing 28 days vs the 28 before, every series at once)
+# -------------------------------------------------
+st.subheader("🚀 Momentum (last 28 days vs previous 28)")
+
+m1, m2, m3 = st.columns(3)
+
+for column, dim in zip([m1, m2, m3], [city_col, warehouse_col, brand_col]):
+    series = daily_series(df, date_col, sales_col, by=dim)
+    momentum = pd.DataFrame({
+        "Last 28 days": series.latest(series.trailing_sum(28)),
+        "Change %": series.latest(series.mom()).round(2)
+    }).dropna().sort_values("Change %", ascending=False)
+    column.markdown(f"**{dim}**")
+    column.dataframe(momentum.head(5), use_container_width=True)
 
 # -------------------------------------------------
 # Success
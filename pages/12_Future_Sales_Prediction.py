@@ -4,6 +4,10 @@ import numpy as np
 import plotly.express as px
 from sklearn.ensemble import RandomForestRegressor
 
+from utils.dataset_view import DatasetView
+from utils.date_parsing import ensure_datetime
+from utils.schema import get_schema
+
 # -------------------------------------------------
 # Page config
 # -------------------------------------------------
@@ -21,30 +25,35 @@ if "data" not in st.session_state or st.session_state["data"] is None:
     st.warning("⚠ Please upload dataset from the Upload Dataset page.")
     st.stop()
 
-df = st.session_state["data"].copy()
+df = DatasetView(st.session_state["data"])
+schema = get_schema(st.session_state["data"])
 
 # -------------------------------------------------
 # Required columns check
 # -------------------------------------------------
-required_cols = ["ORDER_DATE", "AMOUNT"]
-missing_cols = [c for c in required_cols if c not in df.columns]
+missing_cols = schema.missing(["date", "sales"])
 
 if missing_cols:
     st.error(f"❌ Missing required columns: {missing_cols}")
     st.stop()
 
+date_col = schema.col("date")
+sales_col = schema.col("sales")
+
 # -------------------------------------------------
 # Data preparation
 # -------------------------------------------------
-df["ORDER_DATE"] = pd.to_datetime(df["ORDER_DATE"], errors="coerce")
-df = df.dropna(subset=["ORDER_DATE"])
+df[date_col] = ensure_datetime(df[date_col])
+df = df.dropna(subset=[date_col])
 
 # Convert to monthly level
-df["Date"] = df["ORDER_DATE"].dt.to_period("M").dt.to_timestamp()
+df["Date"] = df[date_col].dt.to_period("M").dt.to_timestamp()
 
 monthly_sales = (
-    df.groupby("Date", as_index=False)["AMOUNT"]
+    df.frame(["Date", sales_col])
+    .groupby("Date", as_index=False)[sales_col]
     .sum()
+    .rename(columns={sales_col: "AMOUNT"})
     .sort_values("Date")
     .reset_index(drop=True)
 )
@@ -1,6 +1,7 @@
 import streamlit as st
-from utils.column_detector import auto_detect_columns
+from utils.schema import get_schema
 from utils.data_processing import preprocess
+from utils.kpi_engine import compute_kpis
 from utils.metrics import *
 from utils.visualizations import *
 
@@ -83,7 +84,7 @@ if df is None:
 # -------------------------------------------------
 # Column Detection & Preprocessing
 # -------------------------------------------------
-cols = auto_detect_columns(df)
+cols = get_schema(df).columns
 df = preprocess(df, cols["date"])
 
 # -------------------------------------------------
@@ -91,13 +92,16 @@ df = preprocess(df, cols["date"])
 # -------------------------------------------------
 st.markdown('<div class="section-title">📊 Business KPIs</div>', unsafe_allow_html=True)
 
+# All headline KPIs in one batched pass
+kpis = compute_kpis(df, cols={"sales": cols["sales"]})
+
 k1, k2, k3 = st.columns(3)
 
 with k1:
     st.markdown('<div class="kpi-wrapper">', unsafe_allow_html=True)
     st.metric(
         "💰 Total Sales",
-        f"{kpi_total_sales(df, cols['sales']):,.0f}"
+        f"{kpis.get('total_sales', 0):,.0f}"
     )
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -105,7 +109,7 @@ with k2:
     st.markdown('<div class="kpi-wrapper">', unsafe_allow_html=True)
     st.metric(
         "📦 Total Orders",
-        kpi_orders(df)
+        kpis.get("orders", kpis.get("lines", 0))
     )
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -113,10 +117,26 @@ with k3:
     st.markdown('<div class="kpi-wrapper">', unsafe_allow_html=True)
     st.metric(
         "💹 Avg Order Value",
-        f"{kpi_aov(df, cols['sales']):,.0f}"
+        f"{kpis.get('aov', kpis.get('avg_line_value', 0)):,.0f}"
     )
     st.markdown('</div>', unsafe_allow_html=True)
 
+# -------------------------------------------------
+# Order Value Distribution
+# -------------------------------------------------
+if cols["order_id"]:
+    percentiles = kpi_order_value_percentiles(df, cols["sales"], cols["order_id"])
+
+    if percentiles:
+        for column, (label, value) in zip(st.columns(len(percentiles)), percentiles.items()):
+            column.metric(f"🎯 {label.upper()} Order Value", f"{value:,.0f}")
+
+    if cols["brand"]:
+        st.plotly_chart(
+            box_order_values(df, cols["brand"], cols["sales"], cols["order_id"], "Order Value by Brand"),
+            use_container_width=True
+        )
+
 # -------------------------------------------------
 # Sales Trend
 # -------------------------------------------------
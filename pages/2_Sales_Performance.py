@@ -1,5 +1,5 @@
 import streamlit as st
-from utils.column_detector import auto_detect_columns
+from utils.schema import get_schema
 from utils.data_processing import preprocess
 from utils.visualizations import line_sales_trend, bar_top
 
@@ -74,7 +74,7 @@ if df is None:
 # -------------------------------------------------
 # Column Detection & Preprocessing
 # -------------------------------------------------
-cols = auto_detect_columns(df)
+cols = get_schema(df).columns
 df = preprocess(df, cols["date"])
 
 # -------------------------------------------------
@@ -1,5 +1,5 @@
 import streamlit as st
-from utils.column_detector import auto_detect_columns
+from utils.schema import get_schema
 from utils.visualizations import bar_top
 
 # -------------------------------------------------
@@ -73,7 +73,7 @@ if df is None:
 # -------------------------------------------------
 # Column Detection
 # -------------------------------------------------
-cols = auto_detect_columns(df)
+cols = get_schema(df).columns
 
 # -------------------------------------------------
 # Sales per Sales Representative
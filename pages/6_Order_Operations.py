@@ -1,5 +1,6 @@
 import streamlit as st
-from utils.column_detector import auto_detect_columns
+from utils.orders import ORDER_LINES, ORDER_QUANTITY, ORDER_TOTAL, get_order_facts
+from utils.schema import get_schema
 from utils.visualizations import bar_top
 
 # -------------------------------------------------
@@ -73,7 +74,28 @@ if df is None:
 # -------------------------------------------------
 # Column Detection
 # -------------------------------------------------
-cols = auto_detect_columns(df)
+cols = get_schema(df).columns
+
+# -------------------------------------------------
+# Order KPIs (order fact table built at upload)
+# -------------------------------------------------
+facts = get_order_facts(df)
+
+if facts is not None:
+    st.markdown(
+        '<div class="section-title">📌 Order KPIs</div>',
+        unsafe_allow_html=True
+    )
+
+    k1, k2, k3, k4 = st.columns(4)
+    k1.metric("Total Orders", f"{len(facts):,}")
+    k2.metric("Avg Order Value", f"₹ {facts[ORDER_TOTAL].mean():,.0f}")
+    k3.metric("Avg Lines per Order", f"{facts[ORDER_LINES].mean():,.2f}")
+
+    if ORDER_QUANTITY in facts.columns:
+        k4.metric("Avg Units per Order", f"{facts[ORDER_QUANTITY].mean():,.1f}")
+
+    st.divider()
 
 # -------------------------------------------------
 # Order State Performance
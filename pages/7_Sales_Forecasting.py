@@ -4,7 +4,7 @@ import streamlit as st
 import plotly.express as px
 
 from utils.forecasting import prepare_time_series, forecast_sales
-from utils.column_detector import auto_detect_columns
+from utils.schema import get_schema
 
 # -------------------------------------------------
 # Page config
@@ -81,7 +81,7 @@ if df is None:
 # -------------------------------------------------
 # Auto detect columns
 # -------------------------------------------------
-cols = auto_detect_columns(df)
+cols = get_schema(df).columns
 date_col = cols.get("date")
 sales_col = cols.get("sales")
 
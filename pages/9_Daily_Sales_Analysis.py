@@ -1,6 +1,9 @@
 import streamlit as st
 import pandas as pd
 
+from utils.cube import get_cube
+from utils.schema import get_schema
+
 # -------------------------------------------------
 # Page Config
 # -------------------------------------------------
@@ -68,33 +71,48 @@ if "data" not in st.session_state or st.session_state["data"] is None:
     st.warning("📤 Please upload data from the **Upload Dataset** page.")
     st.stop()
 
-df = st.session_state["data"].copy()
+df = st.session_state["data"]
+schema = get_schema(df)
 
 # -------------------------------------------------
 # Required Columns Check
 # -------------------------------------------------
-required_cols = ["ORDER_DATE", "AMOUNT", "TOTAL_QUANTITY"]
-missing = [c for c in required_cols if c not in df.columns]
+missing = schema.missing(["date", "sales", "quantity", "order_id"])
 
 if missing:
     st.error(f"❌ Missing required columns: {missing}")
     st.stop()
 
+date_col = schema.col("date")
+sales_col = schema.col("sales")
+qty_col = schema.col("quantity")
+order_col = schema.col("order_id")
+
 # -------------------------------------------------
-# Data Preparation
+# Order Count Mode
 # -------------------------------------------------
-df["ORDER_DATE"] = pd.to_datetime(df["ORDER_DATE"], errors="coerce")
-df = df.dropna(subset=["ORDER_DATE"])
+cube = get_cube(df)
+
+exact_orders = st.sidebar.toggle(
+    "Exact order counts",
+    value=cube.order_sketch is None,
+    help="Off: merge pre-built HyperLogLog sketches (fast, approximate)."
+)
 
+# -------------------------------------------------
+# Data Preparation (daily rollup of the cube)
+# -------------------------------------------------
 daily_sales = (
-    df.groupby(df["ORDER_DATE"].dt.date)
-      .agg(
-          Total_Sales_Amount=("AMOUNT", "sum"),
-          Total_Quantity=("TOTAL_QUANTITY", "sum"),
-          Total_Orders=("ORDER_ID", "nunique")
-      )
-      .reset_index()
+    cube
+      .rollup([date_col], orders=True, approximate=not exact_orders)
+      .rename(columns={
+          sales_col: "Total_Sales_Amount",
+          qty_col: "Total_Quantity",
+          "orders": "Total_Orders"
+      })
 )
+daily_sales[date_col] = daily_sales[date_col].dt.date
+daily_sales = daily_sales[[date_col, "Total_Sales_Amount", "Total_Quantity", "Total_Orders"]]
 
 # -------------------------------------------------
 # KPI Section
@@ -121,6 +139,12 @@ k3.metric(
     f"{daily_sales['Total_Orders'].sum():,}"
 )
 
+if not exact_orders and cube.order_count_error is not None:
+    st.caption(
+        f"Order counts are HyperLogLog estimates "
+        f"(±{cube.order_count_error:.1%} standard error per day)."
+    )
+
 st.divider()
 
 # -------------------------------------------------
@@ -133,7 +157,7 @@ st.markdown(
 
 st.markdown('<div class="card">', unsafe_allow_html=True)
 st.line_chart(
-    daily_sales.set_index("ORDER_DATE")["Total_Sales_Amount"]
+    daily_sales.set_index(date_col)["Total_Sales_Amount"]
 )
 st.markdown('</div>', unsafe_allow_html=True)
 
@@ -144,7 +168,7 @@ st.markdown(
 
 st.markdown('<div class="card">', unsafe_allow_html=True)
 st.bar_chart(
-    daily_sales.set_index("ORDER_DATE")["Total_Orders"]
+    daily_sales.set_index(date_col)["Total_Orders"]
 )
 st.markdown('</div>', unsafe_allow_html=True)
 
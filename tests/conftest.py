@@ -0,0 +1,43 @@
+# tests/conftest.py
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.fingerprint import new_version, register_version  # noqa: E402
+
+
+def make_lines(rows: int = 20_000, seed: int = 0) -> pd.DataFrame:
+    """Synthetic order lines with every dashboard role and some gaps."""
+    rng = np.random.default_rng(seed)
+    orders = rng.integers(0, rows // 3, rows)
+    days = rng.integers(0, 400, rows)
+
+    return pd.DataFrame({
+        "ORDER_ID": np.array([f"O{order}" for order in orders]),
+        "ORDER_DATE": pd.Timestamp("2024-01-01") + pd.to_timedelta(days, unit="D"),
+        "CITY": rng.choice(["Delhi", "Mumbai", "Pune", "Noida", None], rows),
+        "WAREHOUSE": rng.choice(["W1", "W2", "W3"], rows),
+        "BRAND": rng.choice([f"B{i}" for i in range(12)], rows),
+        "SKU": rng.choice([f"S{i}" for i in range(60)], rows),
+        "OUTLET": rng.choice([f"OUT{i}" for i in range(500)], rows),
+        "AMOUNT": rng.gamma(2.0, 500.0, rows),
+        "QTY": rng.integers(1, 20, rows).astype(np.float64)
+    })
+
+
+@pytest.fixture
+def lines() -> pd.DataFrame:
+    return make_lines()
+
+
+@pytest.fixture
+def published(lines) -> pd.DataFrame:
+    """The sample lines registered under a fresh dataset version."""
+    register_version(lines, new_version())
+    return lines
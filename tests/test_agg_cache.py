@@ -0,0 +1,60 @@
+# tests/test_agg_cache.py
+
+import pandas as pd
+
+from utils import charts, visualizations
+from utils.agg_cache import aggregation_cache_stats, cached_aggregate
+from utils.data_processing import preprocess
+from utils.fingerprint import dataset_version, new_version, register_version
+from utils.kpi_engine import compute_kpis
+
+
+def _total(df: pd.DataFrame, calls: list) -> float:
+    def compute():
+        calls.append(1)
+        return float(df["AMOUNT"].sum())
+
+    return cached_aggregate(df, [], ["AMOUNT"], ("sum", "test"), compute)
+
+
+def test_same_version_is_served_from_cache(published):
+    calls = []
+    assert _total(published, calls) == _total(published, calls)
+    assert len(calls) == 1
+
+
+def test_mutated_copy_is_never_served_stale(published):
+    calls = []
+    original = _total(published, calls)
+
+    # Only the last row changes: a sampled fingerprint would miss it
+    mutated = published.copy()
+    mutated.loc[len(mutated) - 1, "AMOUNT"] += 1_000_000
+
+    assert dataset_version(mutated) is None
+    assert _total(mutated, calls) == original + 1_000_000
+    assert len(calls) == 2
+
+
+def test_republished_data_gets_fresh_results(published):
+    before = compute_kpis(published)["total_sales"]
+
+    changed = published.copy()
+    changed["AMOUNT"] *= 2
+    register_version(changed, new_version())
+
+    assert compute_kpis(changed)["total_sales"] == 2 * before
+    assert compute_kpis(published)["total_sales"] == before
+
+
+def test_preprocessed_view_shares_the_version(published):
+    view = preprocess(published, "ORDER_DATE")
+    assert dataset_version(view) == dataset_version(published)
+    assert compute_kpis(view)["total_sales"] == compute_kpis(published)["total_sales"]
+
+
+def test_line_trends_of_both_chart_modules_are_cached_apart(published):
+    misses = aggregation_cache_stats()["misses"]
+    charts.line_sales_trend(published, "ORDER_DATE", "AMOUNT")
+    visualizations.line_sales_trend(published, "ORDER_DATE", "AMOUNT")
+    assert aggregation_cache_stats()["misses"] == misses + 2
@@ -0,0 +1,65 @@
+# tests/test_csv_streaming.py
+
+import io
+
+import numpy as np
+import pandas as pd
+
+import utils.csv_streaming as csv_streaming
+from utils.csv_streaming import read_csv_chunked
+
+
+def _csv(df: pd.DataFrame, encoding: str = "utf-8") -> io.BytesIO:
+    return io.BytesIO(df.to_csv(index=False).encode(encoding))
+
+
+def _frame(rows: int = 60_000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "ORDER_ID": np.arange(rows),
+        "CITY": rng.choice(["Delhi", "Mumbai", "Pune"], rows),
+        "AMOUNT": rng.random(rows) * 1_000,
+        "QTY": rng.integers(1, 20, rows).astype(np.float64),
+        "NOTE": [f"note {i}" for i in range(rows)]
+    })
+    # Values that only show up after the dtype sample
+    df.loc[rows - 10:, "CITY"] = "Kochi"
+    df.loc[rows - 5:, "QTY"] = np.nan
+    return df
+
+
+def _assert_round_trip(got: pd.DataFrame, expected: pd.DataFrame):
+    assert list(got.columns) == list(expected.columns)
+    for col in expected.columns:
+        values = got[col].astype(str) if isinstance(got[col].dtype, pd.CategoricalDtype) else got[col]
+        pd.testing.assert_series_equal(
+            values, expected[col], check_dtype=False, check_names=False, check_exact=False
+        )
+
+
+def test_chunked_read_matches_read_csv():
+    df = _frame()
+    got = read_csv_chunked(_csv(df), chunk_rows=7_000, sample_rows=500)
+
+    _assert_round_trip(got, pd.read_csv(_csv(df)))
+    assert isinstance(got["CITY"].dtype, pd.CategoricalDtype)
+    assert "Kochi" in got["CITY"].cat.categories
+    assert got["QTY"].isna().sum() == 5
+
+
+def test_undecodable_bytes_are_read_as_latin1(monkeypatch):
+    df = _frame(rows=20_000)
+    df.loc[len(df) - 1, "NOTE"] = "café"
+
+    # As if the sniffed head of a larger file were clean UTF-8
+    monkeypatch.setattr(csv_streaming, "sniff_encoding", lambda file: "utf-8")
+    got = read_csv_chunked(_csv(df, "latin1"), chunk_rows=5_000, sample_rows=500)
+
+    assert got["NOTE"].iloc[-1] == "café"
+    assert len(got) == len(df)
+
+
+def test_header_only_csv():
+    got = read_csv_chunked(io.BytesIO(b"ORDER_ID,AMOUNT\n"))
+    assert got.empty
+    assert list(got.columns) == ["ORDER_ID", "AMOUNT"]
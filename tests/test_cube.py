@@ -0,0 +1,85 @@
+# tests/test_cube.py
+
+import pandas as pd
+import pytest
+
+from utils.cube import LINES, ORDERS, Cube
+
+DIMS = [
+    [],
+    ["CITY"],
+    ["BRAND"],
+    ["ORDER_DATE", "CITY"],
+    ["CITY", "WAREHOUSE", "BRAND"],
+    ["SKU", "OUTLET"]
+]
+
+
+def _reference(lines: pd.DataFrame, dims: list, orders: bool = False) -> pd.DataFrame:
+    aggs = {"AMOUNT": ("AMOUNT", "sum"), "QTY": ("QTY", "sum"), LINES: ("AMOUNT", "size")}
+    if orders:
+        aggs[ORDERS] = ("ORDER_ID", "nunique")
+    if not dims:
+        return pd.DataFrame({name: [lines[col].agg(func)] for name, (col, func) in aggs.items()})
+    return lines.groupby(dims, observed=True, as_index=False).agg(**aggs)
+
+
+def _compare(got: pd.DataFrame, expected: pd.DataFrame, dims: list):
+    columns = list(expected.columns)
+    got = got[columns].sort_values(dims).reset_index(drop=True) if dims else got[columns]
+    expected = expected.sort_values(dims).reset_index(drop=True) if dims else expected
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False, check_exact=False, rtol=1e-9)
+
+
+@pytest.mark.parametrize("dims", DIMS)
+def test_rollup_matches_groupby(published, dims):
+    cube = Cube(published)
+    _compare(cube.rollup(dims, orders=True), _reference(published, dims, orders=True), dims)
+
+
+def test_rollup_filters_match_groupby(published):
+    cube = Cube(published)
+    where = {
+        "CITY": ["Delhi", "Pune"],
+        "ORDER_DATE": (pd.Timestamp("2024-03-01"), pd.Timestamp("2024-06-30"))
+    }
+    rows = published[
+        published["CITY"].isin(where["CITY"])
+        & published["ORDER_DATE"].between(*where["ORDER_DATE"])
+    ]
+    _compare(cube.rollup(["BRAND"], where=where), _reference(rows, ["BRAND"]), ["BRAND"])
+
+
+def test_grouping_sets_match_single_rollups(published):
+    cube = Cube(published)
+    sets = [("CITY",), ("CITY", "BRAND"), ()]
+    results = cube.grouping_sets(sets, orders=True)
+    for dims in sets:
+        _compare(results[dims], _reference(published, list(dims), orders=True), list(dims))
+
+
+
+def test_filtered_grouping_sets_match_groupby(published):
+    # The Actionable Insights sets, under a sidebar-style filter
+    cube = Cube(published)
+    sets = [("ORDER_DATE",), ("CITY",), ("WAREHOUSE",), ("BRAND",)]
+    where = {"WAREHOUSE": ["W1", "W3"], "BRAND": ["B0", "B4", "B7"]}
+    rows = published[
+        published["WAREHOUSE"].isin(where["WAREHOUSE"]) & published["BRAND"].isin(where["BRAND"])
+    ]
+
+    results = cube.grouping_sets(sets, where=where, orders=True)
+    assert set(results) == set(sets)
+    for dims in sets:
+        _compare(results[dims], _reference(rows, list(dims), orders=True), list(dims))
+
+
+def test_grouping_sets_aggregate_the_union_once(published, monkeypatch):
+    cube = Cube(published)
+    calls = []
+    rollup = cube._rollup
+    monkeypatch.setattr(cube, "_rollup", lambda *a, **k: calls.append(a) or rollup(*a, **k))
+
+    cube.grouping_sets([("CITY",), ("BRAND",), ("CITY", "WAREHOUSE")])
+    assert len(calls) == 1
+    assert set(calls[0][0]) == {"CITY", "BRAND", "WAREHOUSE"}
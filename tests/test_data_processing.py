@@ -0,0 +1,38 @@
+# tests/test_data_processing.py
+
+import pandas as pd
+
+from utils.data_processing import calendar_features, preprocess
+from utils.fingerprint import dataset_version
+
+
+def test_preprocess_with_missing_dates_keeps_version(published):
+    published.loc[[3, 500], "ORDER_DATE"] = pd.NaT
+    view = preprocess(published, "ORDER_DATE")
+
+    assert dataset_version(view) is not None
+    assert dataset_version(view) == dataset_version(published)
+    assert len(view) == len(published)
+    assert view.loc[[3, 500], ["Year", "Month", "MonthName"]].isna().all().all()
+
+
+def test_calendar_matches_pandas(published):
+    published.loc[::40, "ORDER_DATE"] = pd.NaT
+    view = preprocess(published, "ORDER_DATE")
+    dates = published["ORDER_DATE"]
+
+    pd.testing.assert_series_equal(view["Year"], dates.dt.year, check_dtype=False, check_names=False)
+    pd.testing.assert_series_equal(view["Month"], dates.dt.month, check_dtype=False, check_names=False)
+    assert (view["MonthName"].astype(str)[dates.notna()] == dates.dt.strftime("%b")[dates.notna()]).all()
+
+    # Monthly totals over the calendar columns equal a plain date groupby
+    got = view.groupby(["Year", "Month"])["AMOUNT"].sum()
+    expected = published.groupby([dates.dt.year, dates.dt.month])["AMOUNT"].sum()
+    assert got.index.tolist() == [(int(year), int(month)) for year, month in expected.index]
+    assert got.to_numpy().tolist() == expected.to_numpy().tolist()
+
+
+def test_calendar_is_cached_per_dataset(published):
+    first = calendar_features(published, "ORDER_DATE")
+    assert calendar_features(published, "ORDER_DATE") is first
+    assert calendar_features(published.copy(), "ORDER_DATE") is not first
@@ -0,0 +1,59 @@
+# tests/test_dataset_merge.py
+
+import numpy as np
+import pandas as pd
+
+from conftest import make_lines
+from utils.dataset_merge import append_deltas, dedup_key_columns, row_hashes
+
+
+def _numbered(lines: pd.DataFrame) -> pd.DataFrame:
+    """Lines with a line number within each order."""
+    return lines.assign(LINE_NO=lines.groupby("ORDER_ID").cumcount() + 1)
+
+
+def test_without_line_numbers_only_identical_lines_match(lines):
+    # ORDER_ID + SKU repeats are legitimate lines, so they are no key
+    assert lines.duplicated(["ORDER_ID", "SKU"]).any()
+    assert dedup_key_columns(lines) == lines.columns.tolist()
+
+    merged, _, report = append_deltas(None, lines)
+    assert len(merged) == len(lines)
+    assert report["replaced_rows"] == 0
+    assert not report["line_key"]
+
+
+def test_overlapping_extracts_lose_no_lines():
+    extract = make_lines(rows=30_000)
+    merged, _, report = append_deltas(extract.iloc[:20_000], extract.iloc[15_000:])
+
+    assert (report["added_rows"], report["replaced_rows"]) == (10_000, 5_000)
+    pd.testing.assert_frame_equal(
+        merged.sort_values(list(extract.columns)).reset_index(drop=True),
+        extract.sort_values(list(extract.columns)).reset_index(drop=True)
+    )
+
+
+def test_delta_replaces_every_line_with_its_key(lines):
+    lines = _numbered(lines)
+    assert dedup_key_columns(lines) == ["ORDER_ID", "LINE_NO"]
+
+    delta = lines.iloc[:500].assign(AMOUNT=0.0)
+    merged, index, report = append_deltas(lines, delta)
+
+    assert report["line_key"]
+    assert report["replaced_rows"] == 500
+    assert report["added_rows"] == 0
+    assert len(merged) == len(lines) == len(index)
+    assert np.isclose(merged["AMOUNT"].sum(), lines["AMOUNT"].iloc[500:].sum())
+
+
+def test_key_dtypes_do_not_change_hashes():
+    ids = np.arange(1_000)
+    lines = [i % 7 for i in ids]
+    as_int = pd.DataFrame({"ORDER_ID": ids.astype(np.int32), "LINE_NO": lines})
+    as_float = pd.DataFrame({"ORDER_ID": ids.astype(np.float64), "LINE_NO": pd.Categorical(lines)})
+
+    np.testing.assert_array_equal(
+        row_hashes(as_int, ["ORDER_ID", "LINE_NO"]), row_hashes(as_float, ["ORDER_ID", "LINE_NO"])
+    )
@@ -0,0 +1,49 @@
+# tests/test_dataset_view.py
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset_view import DatasetView
+
+
+def test_overlay_shadows_without_touching_the_base(lines):
+    original = lines.copy()
+    view = DatasetView(lines)
+
+    view["AMOUNT"] = lines["AMOUNT"] * 2
+    view["MARGIN"] = lines["AMOUNT"] - lines["QTY"]
+
+    pd.testing.assert_frame_equal(lines, original)
+    assert view.columns == list(lines.columns) + ["MARGIN"]
+
+    expected = lines.assign(AMOUNT=lines["AMOUNT"] * 2, MARGIN=lines["AMOUNT"] - lines["QTY"])
+    pd.testing.assert_frame_equal(view.frame(), expected)
+
+
+def test_filters_match_pandas(lines):
+    view = DatasetView(lines)
+    view["MARGIN"] = lines["AMOUNT"] - lines["QTY"]
+
+    delhi = view.where(view["CITY"] == "Delhi")
+    big = delhi.where(delhi["AMOUNT"] > 1_000)
+
+    expected = lines.assign(MARGIN=lines["AMOUNT"] - lines["QTY"])
+    expected = expected[(expected["CITY"] == "Delhi") & (expected["AMOUNT"] > 1_000)]
+
+    assert len(big) == len(expected)
+    pd.testing.assert_frame_equal(big.frame(), expected)
+    pd.testing.assert_index_equal(big.index, expected.index)
+
+
+def test_dropna_matches_pandas(lines):
+    view = DatasetView(lines).dropna(["CITY"])
+    expected = lines.dropna(subset=["CITY"])
+    pd.testing.assert_frame_equal(view.frame(["CITY", "AMOUNT"]), expected[["CITY", "AMOUNT"]])
+
+
+def test_unfiltered_columns_are_not_copied(lines):
+    view = DatasetView(lines)
+    assert view.where(np.ones(len(lines), dtype=bool)) is view
+
+    frame = view.frame(["AMOUNT"])
+    assert np.shares_memory(frame["AMOUNT"].to_numpy(), lines["AMOUNT"].to_numpy())
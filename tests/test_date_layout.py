@@ -0,0 +1,62 @@
+# tests/test_date_layout.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.cube import Cube
+from utils.date_layout import ZoneMap, sort_by_date
+from utils.fingerprint import new_version, register_version
+
+RANGES = [(0, 10), (37, 38), (120, 260), (-5, 1_000), (400, 500)]
+
+
+@pytest.mark.parametrize("lo, hi", RANGES)
+def test_zone_map_positions_match_a_scan(lo, hi):
+    values = np.random.default_rng(0).integers(0, 400, 50_000)
+    zones = ZoneMap(values, chunk_rows=1_000)
+    np.testing.assert_array_equal(
+        zones.positions(lo, hi), np.flatnonzero((values >= lo) & (values < hi))
+    )
+
+
+def test_zone_map_skips_and_takes_whole_chunks():
+    # Mostly ordered days: most chunks are wholly inside or outside
+    values = np.sort(np.random.default_rng(0).integers(0, 400, 50_000))
+    values[::997] = 399
+    zones = ZoneMap(values, chunk_rows=1_000, null_value=-1)
+    np.testing.assert_array_equal(
+        zones.positions(100, 200), np.flatnonzero((values >= 100) & (values < 200))
+    )
+
+    # Chunks of nulls never overlap a range
+    empty = ZoneMap(np.full(3_000, -1), chunk_rows=1_000, null_value=-1)
+    assert len(empty.positions(-10, 10)) == 0
+
+
+def test_sort_by_date_orders_rows_stably_nat_last(lines):
+    lines.loc[::50, "ORDER_DATE"] = pd.NaT
+    got, order = sort_by_date(lines, "ORDER_DATE")
+
+    expected = lines.sort_values("ORDER_DATE", kind="stable", na_position="last")
+    pd.testing.assert_frame_equal(got, expected.reset_index(drop=True))
+    np.testing.assert_array_equal(order, expected.index.to_numpy())
+
+    # Already sorted: nothing to do
+    assert sort_by_date(got, "ORDER_DATE")[1] is None
+
+
+@pytest.mark.parametrize("date_sorted", [True, False])
+def test_cube_date_ranges_match_pandas(lines, date_sorted):
+    if date_sorted:
+        lines, _ = sort_by_date(lines, "ORDER_DATE")
+    register_version(lines, new_version())
+    cube = Cube(lines)
+    assert cube.date_sorted == date_sorted
+
+    lo, hi = pd.Timestamp("2024-02-10"), pd.Timestamp("2024-05-31")
+    rows = cube.select_rows({"ORDER_DATE": (lo, hi)})
+    positions = np.arange(len(lines))[rows] if isinstance(rows, slice) else rows
+
+    expected = np.flatnonzero(lines["ORDER_DATE"].between(lo, hi).to_numpy())
+    np.testing.assert_array_equal(positions, expected)
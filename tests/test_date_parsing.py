@@ -0,0 +1,39 @@
+# tests/test_date_parsing.py
+
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import date_parse_failures
+from utils.date_parsing import parse_date_columns
+
+
+def _raw_dates(rows: int = 10_000) -> pd.Series:
+    days = pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(rows) % 365, unit="D")
+    text = pd.Series(days.strftime("%d/%m/%Y"), dtype=object)
+    text[::100] = "not a date"
+    text[1::100] = None
+    text[2::100] = " "
+    return text
+
+
+def test_failed_dates_are_counted(tmp_path):
+    raw = _raw_dates()
+    df = parse_date_columns(pd.DataFrame({"ORDER_DATE": raw.copy(), "AMOUNT": 1.0}))
+
+    expected = pd.to_datetime(raw, format="%d/%m/%Y", errors="coerce")
+    pd.testing.assert_series_equal(df["ORDER_DATE"], expected, check_names=False, check_dtype=False)
+
+    # Only non-blank text that did not parse counts as a failure
+    assert df.attrs["date_parse_failures"] == {"ORDER_DATE": 100}
+
+    # The count survives the Parquet cache and adds up over files
+    path = tmp_path / "cached.parquet"
+    df.to_parquet(path)
+    assert date_parse_failures([df, pd.read_parquet(path)]) == {"ORDER_DATE": 200}
+
+
+def test_clean_dates_report_nothing():
+    raw = _raw_dates().where(lambda s: s != "not a date")
+    df = parse_date_columns(pd.DataFrame({"ORDER_DATE": raw}))
+    assert df.attrs["date_parse_failures"] == {}
+    assert date_parse_failures([df]) == {}
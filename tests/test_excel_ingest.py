@@ -0,0 +1,91 @@
+# tests/test_excel_ingest.py
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils.excel_ingest as excel_ingest
+from utils.excel_ingest import list_sheets, read_excel_fast
+
+
+def _frame(rows: int = 3_000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "ORDER_ID": np.arange(rows, dtype=np.float64),
+        "ORDER_DATE": pd.date_range("2024-01-01", periods=rows, freq="h"),
+        "CITY": rng.choice(["Delhi", "Mumbai", "Pune"], rows),
+        "AMOUNT": rng.random(rows) * 1_000,
+        "QTY": rng.integers(1, 20, rows).astype(np.float64)
+    })
+    # Fully empty rows, including whole streamed blocks
+    df.loc[10] = None
+    df.loc[1_200:2_100] = None
+    return df
+
+
+def _workbook(df: pd.DataFrame) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        df.to_excel(writer, sheet_name="Lines", index=False)
+        df.head(40).to_excel(writer, sheet_name="Extra", index=False)
+    buffer.name = "upload.xlsx"
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.fixture(params=["openpyxl", "calamine"])
+def engine(request, monkeypatch):
+    if request.param == "calamine":
+        pytest.importorskip("python_calamine")
+    else:
+        monkeypatch.setattr(excel_ingest, "calamine_available", lambda: False)
+    monkeypatch.setattr(excel_ingest, "EXCEL_BLOCK_ROWS", 500)
+    return request.param
+
+
+def test_sheet_round_trip(engine):
+    df = _frame()
+    got = read_excel_fast(_workbook(df), sheets=["Lines"])
+
+    expected = df.dropna(how="all").reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+
+def test_several_sheets_are_combined(engine):
+    df = _frame()
+    upload = _workbook(df)
+    assert list_sheets(upload) == ["Lines", "Extra"]
+
+    got = read_excel_fast(upload, sheets=["Lines", "Extra"])
+    counts = got[excel_ingest.EXCEL_SHEET_COLUMN].value_counts()
+    assert counts["Lines"] == len(df.dropna(how="all"))
+    assert counts["Extra"] == len(df.head(40).dropna(how="all"))
+
+
+def test_upload_is_not_consumed(engine):
+    upload = _workbook(_frame())
+    read_excel_fast(upload)
+    assert upload.tell() == 0
+    assert read_excel_fast(upload).shape == read_excel_fast(upload).shape
+
+
+def test_projection_reads_each_sheet_once(engine, monkeypatch):
+    df = _frame().assign(NOTES="unused")
+    monkeypatch.setattr(pd, "read_excel", lambda *a, **k: pytest.fail("sheet read through read_excel"))
+
+    got = read_excel_fast(_workbook(df), sheets=["Lines"], project=True)
+    assert "NOTES" not in got.columns
+    expected = df.drop(columns="NOTES").dropna(how="all").reset_index(drop=True)
+    pd.testing.assert_frame_equal(got[expected.columns], expected, check_dtype=False)
+
+
+def test_upload_buffer_is_released(engine):
+    upload = _workbook(_frame())
+    list_sheets(upload)
+    read_excel_fast(upload, sheets=["Lines", "Extra"])
+
+    # A view still exported would refuse to let the upload grow
+    upload.seek(0, io.SEEK_END)
+    upload.write(b"\0")
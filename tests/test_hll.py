@@ -0,0 +1,50 @@
+# tests/test_hll.py
+
+import numpy as np
+import pandas as pd
+
+import utils.hll as hll
+from utils.cube import ORDERS, Cube
+from utils.hll import CellSketches, hash_values
+
+
+def _sketches(rows: int = 200_000, cells: int = 400, ids: int = 60_000, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    cell_ids = rng.integers(0, cells, rows)
+    values = rng.integers(0, ids, rows)
+    return cell_ids, values, CellSketches(cell_ids, hash_values(values))
+
+
+def test_estimates_within_error_bound():
+    cell_ids, values, sketches = _sketches()
+    groups = np.arange(400) % 8
+
+    got = sketches.estimate(groups, 8)
+    exact = pd.Series(values).groupby(groups[cell_ids]).nunique().to_numpy()
+    assert (np.abs(got / exact - 1) <= 4 * sketches.error).all()
+
+
+def test_sparse_group_ids_and_blocks(monkeypatch):
+    _, _, sketches = _sketches()
+    # 20 groups spread over a key space of a million ids
+    groups = (np.arange(400) % 20) * 50_000
+    got = sketches.estimate(groups, 1_000_000)
+
+    assert got.shape == (1_000_000,)
+    assert np.count_nonzero(got) == 20
+
+    monkeypatch.setattr(hll, "HLL_MERGE_BLOCK_BYTES", sketches.m * 3)
+    np.testing.assert_array_equal(sketches.estimate(groups, 1_000_000), got)
+
+
+def test_empty_selection():
+    _, _, sketches = _sketches(rows=1_000)
+    assert not sketches.estimate(np.full(400, -1), 5).any()
+    assert sketches.estimate(np.full(400, -1), 0).shape == (0,)
+
+
+def test_cube_approximate_order_counts(published):
+    cube = Cube(published)
+    got = cube.rollup(["CITY"], orders=True, approximate=True).set_index("CITY")[ORDERS]
+    exact = published.groupby("CITY")["ORDER_ID"].nunique()
+    assert (np.abs(got.reindex(exact.index) / exact - 1) <= 4 * cube.order_count_error).all()
@@ -0,0 +1,71 @@
+# tests/test_kpi_engine.py
+
+import pandas as pd
+import pytest
+
+import utils.schema as schema_module
+from utils.agg_cache import aggregation_cache_stats
+from utils.cube import get_cube
+from utils.kpi_engine import KPIS, compute_kpis
+from utils.schema import build_schema
+
+
+def _expected(df: pd.DataFrame) -> dict:
+    daily = df.groupby(df["ORDER_DATE"].dt.normalize())["AMOUNT"].sum()
+    with_order = df[df["ORDER_ID"].notna()]
+    return {
+        "total_sales": df["AMOUNT"].sum(),
+        "avg_line_value": df["AMOUNT"].mean(),
+        "total_quantity": df["QTY"].sum(),
+        "lines": len(df),
+        "orders": with_order["ORDER_ID"].nunique(),
+        "aov": with_order["AMOUNT"].sum() / with_order["ORDER_ID"].nunique(),
+        "date_min": df["ORDER_DATE"].min().normalize(),
+        "date_max": df["ORDER_DATE"].max().normalize(),
+        "active_days": len(daily),
+        "avg_daily_sales": daily.mean(),
+        "best_day_sales": daily.max()
+    }
+
+
+def _compare(got: dict, expected: dict):
+    for kpi, value in expected.items():
+        if isinstance(value, pd.Timestamp):
+            assert got[kpi] == value, kpi
+        else:
+            assert got[kpi] == pytest.approx(value), kpi
+
+
+def test_kpis_match_pandas(published):
+    _compare(compute_kpis(published, list(KPIS)), _expected(published))
+
+
+def test_filtered_frame_matches_pandas_without_rescanning(published, monkeypatch):
+    monkeypatch.setitem(schema_module.st.session_state, "schema", build_schema(published))
+    monkeypatch.setattr(schema_module, "build_schema", lambda df: pytest.fail("schema rebuilt"))
+
+    subset = published[published["CITY"] == "Delhi"]
+    _compare(compute_kpis(subset, list(KPIS)), _expected(subset))
+
+
+def test_missing_columns_are_left_out(published):
+    got = compute_kpis(published[["ORDER_ID", "AMOUNT"]], list(KPIS))
+    assert set(got) == {"total_sales", "avg_line_value", "lines", "orders", "aov"}
+
+
+@pytest.mark.parametrize("with_cube", [False, True])
+def test_where_filter_matches_pandas_and_is_cached(published, with_cube):
+    # Rows come from the cube's row index when it exists, else from masks
+    if with_cube:
+        assert get_cube(published, build=True) is not None
+    where = {"CITY": ["Delhi", "Pune"], "ORDER_DATE": ("2024-03-01", "2024-06-30")}
+    dates = published["ORDER_DATE"]
+    subset = published[
+        published["CITY"].isin(["Delhi", "Pune"])
+        & (dates >= "2024-03-01") & (dates < "2024-07-01")
+    ]
+    _compare(compute_kpis(published, list(KPIS), where=where), _expected(subset))
+
+    hits = aggregation_cache_stats()["hits"]
+    compute_kpis(published, list(KPIS), where=where)
+    assert aggregation_cache_stats()["hits"] == hits + 1
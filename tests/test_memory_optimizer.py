@@ -0,0 +1,47 @@
+# tests/test_memory_optimizer.py
+
+import numpy as np
+import pandas as pd
+
+from utils.memory_optimizer import compact_dataframe
+
+
+def _wide_lines(rows: int = 10_000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "ORDER_ID": rng.integers(0, 5_000, rows),
+        "BRAND": rng.choice(["B1", "B2", "B3"], rows),
+        # price * qty exceeds int32 (2**31 - 1) on every row
+        "PRICE": rng.integers(100_000, 200_000, rows),
+        "QTY": rng.integers(30_000, 40_000, rows)
+    })
+
+
+def test_price_times_qty_does_not_overflow():
+    df = _wide_lines()
+    compacted, _ = compact_dataframe(df)
+
+    expected = df["PRICE"] * df["QTY"]
+    pd.testing.assert_series_equal(compacted["PRICE"] * compacted["QTY"], expected)
+    assert (expected > np.iinfo(np.int32).max).all()
+
+
+def test_measures_keep_64_bit_and_keys_narrow():
+    df = _wide_lines()
+    compacted, report = compact_dataframe(df)
+
+    assert compacted["PRICE"].dtype == np.int64
+    assert compacted["QTY"].dtype == np.int64
+    assert compacted["ORDER_ID"].dtype == np.int32
+    assert isinstance(compacted["BRAND"].dtype, pd.CategoricalDtype)
+    assert report["after"] < report["before"]
+
+
+def test_aggregates_unchanged_by_compaction():
+    df = _wide_lines()
+    compacted, _ = compact_dataframe(df)
+
+    def revenue(frame):
+        return (frame["PRICE"] * frame["QTY"]).groupby(frame["BRAND"].astype(str)).sum()
+
+    pd.testing.assert_series_equal(revenue(compacted), revenue(df))
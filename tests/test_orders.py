@@ -0,0 +1,36 @@
+# tests/test_orders.py
+
+import numpy as np
+import pandas as pd
+
+from utils.orders import FIRST_DATE, ORDER_LINES, ORDER_QUANTITY, ORDER_TOTAL, build_order_facts
+
+
+def test_order_facts_match_groupby(published):
+    lines = published.copy()
+    lines.loc[::50, "ORDER_ID"] = None
+    lines.loc[::31, "ORDER_DATE"] = pd.NaT
+
+    facts = build_order_facts(lines)
+    expected = lines.groupby("ORDER_ID", sort=False).agg(**{
+        ORDER_TOTAL: ("AMOUNT", "sum"),
+        ORDER_LINES: ("AMOUNT", "size"),
+        ORDER_QUANTITY: ("QTY", "sum"),
+        FIRST_DATE: ("ORDER_DATE", "min"),
+        "outlet": ("OUTLET", "first")
+    })
+    expected[FIRST_DATE] = expected[FIRST_DATE].astype("datetime64[ns]")
+
+    pd.testing.assert_frame_equal(
+        facts[expected.columns].sort_index(), expected.sort_index(), check_dtype=False
+    )
+
+
+def test_no_order_facts_without_order_ids(published):
+    assert build_order_facts(published.drop(columns="ORDER_ID")) is None
+
+
+def test_order_totals_add_up(published):
+    facts = build_order_facts(published)
+    assert np.isclose(facts[ORDER_TOTAL].sum(), published["AMOUNT"].sum())
+    assert facts[ORDER_LINES].sum() == len(published)
@@ -0,0 +1,102 @@
+# tests/test_quantile_sketch.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import QUANTILE_SKETCH_ALPHA
+from utils.cube import get_cube
+from utils.fingerprint import new_version, register_version
+from utils.orders import order_value_quantiles
+from utils.quantile_sketch import CellQuantiles, exact_quantiles, quantile_label
+
+QS = [0.05, 0.5, 0.9, 0.99]
+
+
+def test_sketch_quantiles_within_relative_error():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(7, 1.2, 100_000)
+    cells = rng.integers(0, 50, len(values))
+    sketch = CellQuantiles(cells, values)
+
+    groups = np.arange(50) % 5
+    got, totals = sketch.quantiles(groups, 5, QS)
+
+    for group in range(5):
+        group_values = pd.Series(values[groups[cells] == group])
+        exact = exact_quantiles(group_values, QS)
+        assert totals[group] == len(group_values)
+        for i, q in enumerate(QS):
+            expected = exact[quantile_label(q)]
+            assert abs(got[group, i] - expected) <= QUANTILE_SKETCH_ALPHA * expected * (1 + 1e-9)
+
+
+def test_overall_order_values_within_relative_error(published):
+    # Answered from the cube's sketches
+    assert get_cube(published, build=True).value_sketch is not None
+    got = order_value_quantiles(published, "AMOUNT", "ORDER_ID", QS).iloc[0]
+    orders = published.groupby("ORDER_ID")["AMOUNT"].sum()
+    exact = exact_quantiles(orders, QS)
+
+    assert got["orders"] == len(orders)
+    for q in QS:
+        label = quantile_label(q)
+        assert got[label] == pytest.approx(exact[label], rel=QUANTILE_SKETCH_ALPHA)
+
+
+def test_group_order_values_split_multi_group_orders(published):
+    got = order_value_quantiles(published, "AMOUNT", "ORDER_ID", QS, "BRAND").set_index("BRAND")
+
+    # Each order contributes its lines of a brand to that brand
+    values = published.groupby(["BRAND", "ORDER_ID"])["AMOUNT"].sum()
+    for brand, brand_values in values.groupby(level=0):
+        exact = exact_quantiles(brand_values, QS)
+        assert got.loc[brand, "orders"] == len(brand_values)
+        for q in QS:
+            assert got.loc[brand, quantile_label(q)] == pytest.approx(exact[quantile_label(q)])
+
+
+@pytest.fixture
+def order_level(lines) -> pd.DataFrame:
+    """Lines whose date, city and warehouse are those of the order header."""
+    for col in ["ORDER_DATE", "CITY", "WAREHOUSE"]:
+        lines[col] = lines.groupby("ORDER_ID")[col].transform("first")
+    register_version(lines, new_version())
+    return lines
+
+
+def _assert_close(got: pd.DataFrame, values: pd.Series, group_col: str):
+    got = got.set_index(group_col)
+    for label, group_values in values.groupby(level=0):
+        exact = exact_quantiles(group_values, QS)
+        assert got.loc[label, "orders"] == len(group_values)
+        for q in QS:
+            assert got.loc[label, quantile_label(q)] == pytest.approx(
+                exact[quantile_label(q)], rel=QUANTILE_SKETCH_ALPHA
+            )
+
+
+def test_group_order_values_from_cell_sketches(order_level):
+    cube = get_cube(order_level, build=True)
+    assert set(cube._order_level) == {"ORDER_DATE", "CITY", "WAREHOUSE"}
+
+    # Brand splits orders: answered from per (order, cell) values
+    by_brand = cube.order_value_quantiles(["BRAND"], QS)
+    assert by_brand is not None
+    _assert_close(by_brand, order_level.groupby(["BRAND", "ORDER_ID"])["AMOUNT"].sum(), "BRAND")
+
+    # City is order-level: answered from whole orders
+    by_city = cube.order_value_quantiles(["CITY"], QS)
+    assert by_city is not None
+    _assert_close(by_city, order_level.groupby(["CITY", "ORDER_ID"])["AMOUNT"].sum(), "CITY")
+
+
+def test_filtered_order_values_from_cell_sketches(order_level):
+    cube = get_cube(order_level, build=True)
+
+    got = cube.order_value_quantiles(["BRAND"], QS, where={"CITY": ["Delhi", "Pune"]})
+    subset = order_level[order_level["CITY"].isin(["Delhi", "Pune"])]
+    _assert_close(got, subset.groupby(["BRAND", "ORDER_ID"])["AMOUNT"].sum(), "BRAND")
+
+    # A brand filter without grouping on brand would split orders
+    assert cube.order_value_quantiles([], QS, where={"BRAND": ["B1"]}) is None
@@ -0,0 +1,57 @@
+# tests/test_row_index.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.cube import Cube
+from utils.row_index import DimensionIndex, RowIndex
+
+DIMS = ["CITY", "WAREHOUSE", "BRAND"]
+
+
+def _index(lines: pd.DataFrame) -> RowIndex:
+    """Row index over factorized dimension codes (missing -> last code)."""
+    codes, labels = {}, {}
+    for col in DIMS:
+        col_codes, uniques = pd.factorize(lines[col])
+        col_codes[col_codes < 0] = len(uniques)
+        codes[col], labels[col] = col_codes, pd.Index(uniques)
+    return RowIndex(codes, labels)
+
+
+def test_dimension_index_rows_match_a_scan():
+    codes = np.random.default_rng(0).integers(0, 50, 10_000)
+    index = DimensionIndex(codes, 50)
+
+    for wanted in [np.array([7]), np.array([3, 11, 40]), np.array([], dtype=np.int64)]:
+        expected = np.flatnonzero(np.isin(codes, wanted))
+        np.testing.assert_array_equal(index.rows(wanted), expected)
+        assert index.count(wanted) == len(expected)
+
+
+@pytest.mark.parametrize("where", [
+    {"CITY": ["Delhi"]},
+    {"CITY": ["Delhi", "Pune"], "BRAND": ["B1", "B5", "B9"]},
+    {"CITY": ["Mumbai"], "WAREHOUSE": ["W2"], "BRAND": ["B3"]},
+    {"CITY": ["Nowhere"], "BRAND": ["B1"]},
+    {"BRAND": ["B2", "unknown"]}
+])
+def test_select_matches_pandas_filters(lines, where):
+    mask = np.ones(len(lines), dtype=bool)
+    for col, values in where.items():
+        mask &= lines[col].isin(values).to_numpy()
+
+    np.testing.assert_array_equal(_index(lines).select(where), np.flatnonzero(mask))
+
+
+def test_no_filter_selects_nothing_to_filter(lines):
+    assert _index(lines).select({}) is None
+    assert _index(lines).select({"CITY": None}) is None
+
+
+def test_cube_filters_go_through_the_index(published):
+    cube = Cube(published)
+    where = {"CITY": ["Delhi", "Noida"], "WAREHOUSE": ["W1"]}
+    expected = published["CITY"].isin(where["CITY"]) & (published["WAREHOUSE"] == "W1")
+    np.testing.assert_array_equal(cube.select_rows(where), np.flatnonzero(expected))
@@ -0,0 +1,57 @@
+# tests/test_schema.py
+
+import pytest
+
+import utils.schema as schema_module
+from utils.fingerprint import dataset_version
+from utils.schema import DIMENSION_ROLES, build_schema, derive_schema, get_schema
+
+
+def test_schema_matches_pandas(published):
+    schema = build_schema(published)
+
+    assert schema.version == dataset_version(published)
+    assert schema.row_count == len(published)
+    assert schema.dtypes == {col: str(dtype) for col, dtype in published.dtypes.items()}
+    for role in DIMENSION_ROLES:
+        col = schema.col(role)
+        if col:
+            assert schema.cardinalities[col] == published[col].nunique(dropna=True)
+    assert schema.date_min == published["ORDER_DATE"].min()
+    assert schema.date_max == published["ORDER_DATE"].max()
+    assert schema.date_nulls == 0
+
+
+def test_schema_is_built_once_per_version(published, monkeypatch):
+    first = get_schema(published)
+    monkeypatch.setattr(schema_module, "build_schema", lambda df: pytest.fail("schema rebuilt"))
+    assert get_schema(published) is first
+
+
+def test_filtered_frame_derives_without_scanning(published, monkeypatch):
+    parent = build_schema(published)
+    monkeypatch.setattr(schema_module, "build_schema", lambda df: pytest.fail("schema rebuilt"))
+
+    subset = published[published["CITY"] == "Delhi"]
+    schema = get_schema(subset, parent)
+
+    assert schema.version is None
+    assert schema.row_count == len(subset)
+    assert schema.columns == parent.columns
+    # The parent's cardinalities and date range bound the subset's
+    for col, n in schema.cardinalities.items():
+        assert subset[col].nunique(dropna=True) <= n
+    assert schema.date_min <= subset["ORDER_DATE"].min()
+    assert schema.date_max >= subset["ORDER_DATE"].max()
+
+
+def test_changed_columns_redetect_roles(published):
+    parent = build_schema(published)
+    derived = published.drop(columns=["BRAND"]).rename(columns={"AMOUNT": "NET_SALES"})
+    schema = derive_schema(parent, derived)
+
+    assert schema.col("brand") is None
+    assert schema.col("sales") == "NET_SALES"
+    assert "BRAND" not in schema.cardinalities
+    assert schema.dtypes == {col: str(dtype) for col, dtype in derived.dtypes.items()}
+    assert schema.row_count == len(derived)
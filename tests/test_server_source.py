@@ -0,0 +1,35 @@
+# tests/test_server_source.py
+
+import pandas as pd
+import pytest
+
+import utils.data_loader as data_loader
+import utils.server_source as server_source
+from conftest import make_lines
+from utils.data_loader import read_dataset
+from utils.server_source import open_server_file
+
+
+@pytest.fixture
+def server_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(server_source, "SERVER_DATA_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_large_server_csv_is_read_from_its_memory_map(server_dir, monkeypatch):
+    df = make_lines(5_000)
+    df.to_csv(server_dir / "lines.csv", index=False)
+    monkeypatch.setattr(
+        data_loader, "read_csv_chunked", lambda *a, **k: pytest.fail("chunked reader used")
+    )
+
+    with open_server_file("lines.csv") as file:
+        got = read_dataset(file, streaming=True)
+
+    pd.testing.assert_frame_equal(got, pd.read_csv(server_dir / "lines.csv"))
+
+
+def test_paths_outside_the_directory_are_refused(server_dir):
+    (server_dir.parent / "secret.csv").write_text("a\n1\n")
+    with pytest.raises(ValueError):
+        open_server_file("../secret.csv")
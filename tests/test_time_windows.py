@@ -0,0 +1,66 @@
+# tests/test_time_windows.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.time_windows import DailySeries, daily_series
+
+
+def _daily(published: pd.DataFrame, by: str = None) -> pd.DataFrame:
+    days = published["ORDER_DATE"].dt.normalize()
+    full = pd.date_range(days.min(), days.max(), freq="D")
+    if by is None:
+        return published.groupby(days)["AMOUNT"].sum().reindex(full, fill_value=0).to_frame("Total")
+    table = published.groupby([days, by])["AMOUNT"].sum().unstack(by)
+    return table.reindex(full).fillna(0)
+
+
+@pytest.mark.parametrize("by", [None, "CITY"])
+def test_daily_values_match_groupby(published, by):
+    series = daily_series(published, "ORDER_DATE", "AMOUNT", by=by)
+    expected = _daily(published, by)
+    pd.testing.assert_frame_equal(
+        series.frame(), expected, check_names=False, check_freq=False, check_column_type=False
+    )
+
+
+@pytest.mark.parametrize("window", [1, 7, 28])
+def test_trailing_windows_match_rolling(published, window):
+    series = daily_series(published, "ORDER_DATE", "AMOUNT", by="CITY")
+    expected = _daily(published, "CITY").rolling(window).sum()
+    np.testing.assert_allclose(series.trailing_sum(window).T, expected.to_numpy(), rtol=1e-9)
+
+
+def test_change_matches_shifted_windows():
+    values = np.arange(1, 61, dtype=np.float64)
+    series = DailySeries(values, "2024-01-01")
+    frame = series.frame()["Total"]
+
+    current = frame.rolling(7).sum()
+    expected = (current / current.shift(7) - 1) * 100
+    np.testing.assert_allclose(series.wow()[0], expected.to_numpy(), rtol=1e-9)
+
+
+def test_period_totals_match_resample(published):
+    series = daily_series(published, "ORDER_DATE", "AMOUNT")
+    days = series.frame()["Total"]
+
+    months = series.period_totals("M")["Total"]
+    expected = days.groupby(days.index.to_period("M")).sum()
+    np.testing.assert_allclose(months.to_numpy(), expected.to_numpy())
+
+    weeks = series.period_totals("W")["Total"]
+    expected = days.groupby(days.index.to_period("W-SUN")).sum()
+    np.testing.assert_allclose(weeks.to_numpy(), expected.to_numpy())
+
+
+def test_year_over_year_by_month():
+    days = pd.date_range("2023-01-01", "2024-12-31", freq="D")
+    series = DailySeries(np.ones(len(days)), days[0])
+
+    aligned = series.year_over_year(2024, 2023, calendar="fiscal", granularity="month")
+    # Fiscal years start in April: only FY2023-24 is covered completely
+    assert aligned.columns[:2].tolist() == ["FY2024-25", "FY2023-24"]
+    covered = aligned["FY2023-24"].dropna()
+    assert covered.sum() == (days >= "2023-04-01").sum() - (days >= "2024-04-01").sum()
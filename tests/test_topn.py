@@ -0,0 +1,74 @@
+# tests/test_topn.py
+
+import numpy as np
+import pandas as pd
+
+import utils.topn as topn
+from utils.topn import SpaceSaving, heavy_hitters, top_groups, top_n_series
+
+EPSILON = 0.002
+
+
+def _stream(skewed: bool, rows: int = 200_000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    keys = rng.zipf(1.3, rows) % 5_000 if skewed else rng.integers(0, 20_000, rows)
+    return pd.DataFrame({"KEY": pd.Categorical(keys), "VALUE": rng.random(rows)})
+
+
+def test_top_n_series_matches_nlargest():
+    totals = pd.Series(np.random.default_rng(1).random(1_000))
+    pd.testing.assert_series_equal(top_n_series(totals, 15), totals.nlargest(15))
+
+
+def test_space_saving_bounds():
+    df = _stream(skewed=True)
+    _, summary = heavy_hitters(df, "KEY", "VALUE", epsilon=EPSILON, chunk_rows=25_000)
+    exact = df.groupby("KEY", observed=True)["VALUE"].sum()
+
+    tracked = exact.reindex(summary.counts.index)
+    assert (summary.counts >= tracked - 1e-9).all()
+    assert (summary.counts - summary.errors <= tracked + 1e-9).all()
+    assert summary.max_error <= EPSILON * summary.total
+
+    untracked = exact.drop(summary.counts.index)
+    assert (untracked <= summary.untracked_bound + 1e-9).all()
+    assert summary.untracked_bound <= EPSILON * summary.total
+
+
+def test_merged_summaries_keep_bounds():
+    df = _stream(skewed=True)
+    halves = [df.iloc[:100_000], df.iloc[100_000:]]
+    summary = SpaceSaving(EPSILON)
+    for half in halves:
+        part = SpaceSaving(EPSILON)
+        part.update(half["KEY"].to_numpy(), half["VALUE"].to_numpy())
+        summary.merge(part)
+
+    exact = df.groupby("KEY", observed=True)["VALUE"].sum()
+    assert (summary.counts >= exact.reindex(summary.counts.index) - 1e-9).all()
+    assert (exact.drop(summary.counts.index) <= summary.untracked_bound + 1e-9).all()
+
+
+def test_guaranteed_top_n_is_exact_set():
+    df = _stream(skewed=True)
+    top, summary = heavy_hitters(df, "KEY", "VALUE", n=10, epsilon=EPSILON)
+    assert summary.top_guaranteed(10)
+
+    exact = df.groupby("KEY", observed=True)["VALUE"].sum().nlargest(10)
+    assert set(top.index) == set(exact.index)
+
+
+def test_top_groups_falls_back_to_exact(monkeypatch):
+    df = _stream(skewed=False)
+    _, summary = heavy_hitters(df, "KEY", "VALUE", n=10, chunk_rows=25_000)
+    assert not summary.top_guaranteed(10)
+
+    # Stream in several chunks, so the summary is not exact
+    streamed = topn.heavy_hitters
+    monkeypatch.setattr(topn, "heavy_hitters", lambda *args: streamed(*args, chunk_rows=25_000))
+
+    frame, caption = top_groups(df, "KEY", "VALUE", n=10, approximate=True)
+    exact = df.groupby("KEY", observed=True)["VALUE"].sum().nlargest(10)
+
+    assert caption is None
+    np.testing.assert_allclose(frame["VALUE"].to_numpy(), exact.to_numpy())
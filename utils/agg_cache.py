@@ -0,0 +1,142 @@
+# utils/agg_cache.py
+
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from config import AGG_CACHE_MAX_BYTES, AGG_CACHE_MAX_ENTRIES
+from utils.fingerprint import dataset_version
+
+
+def _size_of(value) -> int:
+    """Approximate memory footprint of a cached result in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sum(_size_of(item) for item in value.values())
+    if isinstance(value, tuple):
+        return sum(_size_of(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def _freeze(value):
+    """Hashable form of keys / measures / predicates (lists, dicts, sets)."""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted((_freeze(v) for v in value), key=repr))
+    return value
+
+
+class AggregationCache:
+    """
+    Bounded LRU cache of aggregation results.
+
+    Entries are evicted least recently used first once either the entry
+    count or the byte budget is exceeded. Hits and misses are counted
+    for monitoring.
+    """
+
+    def __init__(self, max_bytes: int = AGG_CACHE_MAX_BYTES, max_entries: int = AGG_CACHE_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = _size_of(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+
+            self._entries[key] = (value, size)
+            self.bytes += size
+
+            while self._entries and (
+                self.bytes > self.max_bytes or len(self._entries) > self.max_entries
+            ):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+            "bytes": self.bytes
+        }
+
+
+_CACHE = AggregationCache()
+
+
+def cached_aggregate(source, keys, measures, predicate, compute):
+    """
+    Result of compute() for an aggregation of source (a DataFrame or an
+    already known dataset version), memoized by
+    (dataset version, group keys, measures, predicate).
+
+    predicate describes everything else that shapes the result
+    (operation, filters, top N). DataFrame / Series results are handed
+    out as shallow copies so callers can add columns freely. Frames
+    without a version (filtered subsets, ad-hoc copies) are computed
+    every time, never served from the cache.
+    """
+    version = source if isinstance(source, str) else dataset_version(source)
+    if version is None:
+        return compute()
+
+    key = (
+        version,
+        _freeze(keys),
+        _freeze(measures),
+        _freeze(predicate)
+    )
+
+    result = _CACHE.get(key)
+    if result is None:
+        result = compute()
+        _CACHE.put(key, result)
+
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return result.copy(deep=False)
+    return result
+
+
+def aggregation_cache_stats() -> dict:
+    """Hit / miss counters and current size of the aggregation cache."""
+    return _CACHE.stats()
+
+
+def clear_aggregation_cache():
+    _CACHE.clear()
@@ -3,6 +3,11 @@
 import pandas as pd
 import plotly.express as px
 
+from utils.agg_cache import cached_aggregate
+from utils.cube import get_cube
+from utils.date_parsing import ensure_datetime
+from utils.topn import top_groups
+
 
 # ---------------- Line Chart ----------------
 def line_sales_trend(df: pd.DataFrame, date_col: str, sales_col: str):
@@ -10,14 +15,24 @@ def line_sales_trend(df: pd.DataFrame, date_col: str, sales_col: str):
     if df.empty or date_col not in df.columns or sales_col not in df.columns:
         return None
 
-    temp = df.copy()
-    temp[date_col] = pd.to_datetime(temp[date_col], errors="coerce")
+    def compute():
+        cube = get_cube(df)
+        if cube is not None and cube.has([date_col]) and sales_col in cube.measures:
+            return cube.rollup([date_col])[[date_col, sales_col]]
 
-    trend = (
-        temp.groupby(date_col, as_index=False)[sales_col]
-        .sum()
-        .dropna()
-    )
+        # Group on the parsed dates directly instead of copying the frame
+        dates = ensure_datetime(df[date_col])
+
+        return (
+            df[sales_col]
+            .groupby(dates)
+            .sum()
+            .reset_index()
+            .dropna()
+        )
+
+    # Tagged per module: the other line_sales_trend shapes its result differently
+    trend = cached_aggregate(df, [date_col], [sales_col], ("sum", "charts.line_sales_trend"), compute)
 
     fig = px.line(trend, x=date_col, y=sales_col, title="Sales Trend")
     fig.update_layout(xaxis_title=date_col, yaxis_title=sales_col)
@@ -30,26 +45,21 @@ def bar_top(
     group_col: str,
     value_col: str,
     top_n: int = 10,
-    title: str = "Top Categories"
+    title: str = "Top Categories",
+    approximate: bool = None
 ):
-    """Top N bar chart"""
+    """Top N bar chart (approximate results show their error bound)"""
     if df.empty or group_col not in df.columns or value_col not in df.columns:
         return None
 
-    agg = (
-        df.groupby(group_col)[value_col]
-        .sum()
-        .sort_values(ascending=False)
-        .head(top_n)
-        .reset_index()
-    )
+    agg, caption = top_groups(df, group_col, value_col, top_n, approximate)
 
     fig = px.bar(
         agg,
         x=group_col,
         y=value_col,
         text=value_col,
-        title=title
+        title=title if caption is None else f"{title}<br><sup>{caption}</sup>"
     )
     fig.update_layout(xaxis_title=group_col, yaxis_title=value_col)
     return fig
@@ -67,14 +77,23 @@ def heatmap(
     if df.empty or not all(col in df.columns for col in [x_col, y_col, value_col]):
         return None
 
-    pivot_df = pd.pivot_table(
-        df,
-        index=y_col,
-        columns=x_col,
-        values=value_col,
-        aggfunc="sum",
-        fill_value=0
-    )
+    def compute():
+        source = df
+        cube = get_cube(df)
+        if cube is not None and cube.has([x_col, y_col]) and value_col in cube.measures:
+            source = cube.rollup([x_col, y_col])
+
+        return pd.pivot_table(
+            source,
+            index=y_col,
+            columns=x_col,
+            values=value_col,
+            aggfunc="sum",
+            fill_value=0,
+            observed=True
+        )
+
+    pivot_df = cached_aggregate(df, [y_col, x_col], [value_col], "pivot_sum", compute)
 
     fig = px.imshow(
         pivot_df,
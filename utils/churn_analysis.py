@@ -1,13 +1,15 @@
 # utils/churn_analysis.py
 import pandas as pd
 
+from utils.date_parsing import ensure_datetime
+
 
 def churn_risk(df, outlet_col, date_col):
     temp = df[[outlet_col, date_col]].copy()
-    temp[date_col] = pd.to_datetime(temp[date_col], errors="coerce")
+    temp[date_col] = ensure_datetime(temp[date_col])
 
     last_order = (
-        temp.groupby(outlet_col)[date_col]
+        temp.groupby(outlet_col, observed=True)[date_col]
         .max()
         .reset_index()
     )
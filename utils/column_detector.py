@@ -1,3 +1,6 @@
+from config import CORE_COLUMNS
+
+
 def detect_column(columns, keywords):
     """
     Detect first matching column based on keyword priority.
@@ -24,19 +27,18 @@ def auto_detect_columns(df):
     """
 
     if df is None or df.empty:
-        return {
-            "date": None,
-            "sales": None,
-            "quantity": None,
-            "sku": None,
-            "brand": None,
-            "city": None,
-            "state": None,
-            "outlet": None,
-            "rep": None
-        }
-
-    cols = df.columns.tolist()
+        return detect_roles([])
+
+    return detect_roles(df.columns.tolist())
+
+
+def detect_roles(cols):
+    """
+    Role -> column mapping from a list of column names alone
+    (usable on a file header before any data is read).
+    """
+
+    cols = [col for col in cols if isinstance(col, str)]
 
     return {
         # Date
@@ -91,5 +93,41 @@ def auto_detect_columns(df):
         "rep": detect_column(
             cols,
             ["sales_rep", "rep", "salesman", "user", "executive"]
+        ),
+
+        # Order Identifier
+        "order_id": detect_column(
+            cols,
+            ["order_id", "order_no", "invoice_no"]
+        ),
+
+        # Warehouse / Depot
+        "warehouse": detect_column(
+            cols,
+            ["warehouse", "depot"]
+        ),
+
+        # Order State / Status
+        "order_state": detect_column(
+            cols,
+            ["orderstate", "order_state", "order_status"]
+        ),
+
+        # Order Type
+        "order_type": detect_column(
+            cols,
+            ["ordertype", "order_type"]
         )
     }
+
+
+def projection_columns(cols):
+    """
+    Columns the dashboards actually use: auto-detected roles plus
+    CORE_COLUMNS, returned in the file's own column order.
+    """
+
+    wanted = {col for col in detect_roles(cols).values() if col}
+    wanted.update(CORE_COLUMNS)
+
+    return [col for col in cols if col in wanted]
@@ -0,0 +1,250 @@
+# utils/csv_streaming.py
+
+import codecs
+import io
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from config import (
+    CATEGORY_MAX_RATIO,
+    CSV_CHUNK_ROWS,
+    CSV_SAMPLE_BYTES,
+    CSV_SAMPLE_ROWS
+)
+
+
+def file_size(file) -> int:
+    """Size in bytes of an uploaded / opened file."""
+    size = getattr(file, "size", None)
+    if size is not None:
+        return int(size)
+
+    position = file.tell()
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(position)
+    return size
+
+
+def sniff_encoding(file, sample_bytes: int = CSV_SAMPLE_BYTES) -> str:
+    """
+    Detect the text encoding from the head of the file.
+    Falls back to latin1, which can decode any byte sequence.
+    """
+    file.seek(0)
+    sample = file.read(sample_bytes)
+    file.seek(0)
+
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+
+    try:
+        # final=False: a multi-byte character cut at the sample edge is fine
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "latin1"
+
+
+def csv_header(file) -> list:
+    """Column names of a CSV, read without parsing any data rows."""
+    header = pd.read_csv(file, encoding=sniff_encoding(file), nrows=0)
+    file.seek(0)
+    return header.columns.tolist()
+
+
+def infer_dtypes(sample: pd.DataFrame) -> dict:
+    """
+    Choose per-column dtypes from a sample so every chunk parses alike.
+    Repetitive string columns become categoricals; numeric and
+    high-cardinality columns are left to the parser.
+    """
+    dtypes = {}
+    rows = max(len(sample), 1)
+
+    for col in sample.columns:
+        series = sample[col]
+        if pd.api.types.is_numeric_dtype(series):
+            continue
+        if series.nunique(dropna=True) / rows <= CATEGORY_MAX_RATIO:
+            dtypes[col] = "category"
+
+    return dtypes
+
+
+def estimate_rows(file, sample: pd.DataFrame) -> int:
+    """
+    Rough row count of the full file, extrapolated from the bytes per
+    row of its head.
+    """
+    if sample.empty:
+        return 0
+
+    file.seek(0)
+    head = io.BytesIO(file.read(CSV_SAMPLE_BYTES))
+    file.seek(0)
+    disk_rows = sum(1 for _ in head) - 1
+    disk_bytes = head.tell()
+
+    if disk_rows <= 0:
+        return 0
+
+    return int(file_size(file) / (disk_bytes / disk_rows))
+
+
+class ColumnBuilder:
+    """
+    One column assembled chunk by chunk (of a CSV, or of Excel rows),
+    so each chunk can be released as soon as it is read.
+
+    NumPy numeric columns are copied into a buffer pre-sized from the
+    estimated row count (grown by half when it runs out, trimmed in
+    place at the end); categoricals store their codes the same way over
+    a growing category index. Other columns (Arrow strings, objects)
+    keep their chunks, which concatenate without copying.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(capacity, 1)
+        self.values = None
+        self.size = 0
+        self.categories = None
+        self.pieces = None
+
+    def _extend(self, values: np.ndarray):
+        if self.values is None:
+            self.values = np.empty(max(self.capacity, len(values)), dtype=values.dtype)
+        elif values.dtype != self.values.dtype:
+            self.values = self.values.astype(np.result_type(self.values.dtype, values.dtype))
+
+        needed = self.size + len(values)
+        if needed > len(self.values):
+            self.values.resize(max(needed, int(len(self.values) * 1.5)), refcheck=False)
+
+        self.values[self.size:needed] = values
+        self.size = needed
+
+    def _extend_codes(self, series: pd.Series):
+        categories = series.cat.categories
+        if self.categories is None:
+            self.categories = categories
+        else:
+            new = categories[~categories.isin(self.categories)]
+            if len(new):
+                self.categories = self.categories.append(new)
+
+        mapping = self.categories.get_indexer(categories)
+        codes = series.cat.codes.to_numpy()
+        self._extend(np.where(codes >= 0, mapping[codes], -1).astype(np.int32))
+
+    def _built(self) -> pd.Series:
+        self.values.resize(self.size, refcheck=False)
+        if self.categories is not None:
+            return pd.Series(pd.Categorical.from_codes(self.values, self.categories))
+        return pd.Series(self.values, copy=False)
+
+    def append(self, series: pd.Series):
+        if self.pieces is None:
+            if isinstance(series.dtype, pd.CategoricalDtype) and (
+                self.values is None or self.categories is not None
+            ):
+                self._extend_codes(series)
+                return
+
+            numeric = isinstance(series.dtype, np.dtype) and series.dtype.kind in "iuf"
+            if numeric and self.categories is None and (
+                self.values is None or self.values.dtype.kind in "iuf"
+            ):
+                self._extend(series.to_numpy())
+                return
+
+            # Anything else (or a dtype change) is kept as chunks
+            self.pieces = [] if self.values is None else [self._built()]
+            self.values = None
+
+        self.pieces.append(series)
+
+    def series(self, name) -> pd.Series:
+        if self.pieces is not None:
+            if all(isinstance(p.dtype, pd.CategoricalDtype) for p in self.pieces):
+                return pd.Series(union_categoricals(self.pieces), name=name)
+            return pd.concat(self.pieces, ignore_index=True).rename(name)
+        return self._built().rename(name)
+
+
+def read_csv_chunked(
+    file,
+    chunk_rows: int = CSV_CHUNK_ROWS,
+    sample_rows: int = CSV_SAMPLE_ROWS,
+    usecols=None,
+    progress_callback=None
+) -> pd.DataFrame:
+    """
+    Stream a CSV in fixed-size chunks and build the frame incrementally.
+
+    Encoding and dtypes are inferred once from a sample; repetitive
+    string columns are stored as categoricals while reading so the
+    resident size stays well below the raw file size. The encoding is
+    sniffed from the head of the file only: if bytes further on do not
+    decode, the file is read again as latin1 rather than replacing them.
+    usecols restricts parsing to the given columns.
+    progress_callback(fraction) is called after every chunk.
+    """
+    encoding = sniff_encoding(file)
+
+    try:
+        return _read_chunks(file, encoding, chunk_rows, sample_rows, usecols, progress_callback)
+    except UnicodeDecodeError:
+        if encoding == "latin1":
+            raise
+        file.seek(0)
+        return _read_chunks(file, "latin1", chunk_rows, sample_rows, usecols, progress_callback)
+
+
+def _read_chunks(file, encoding, chunk_rows, sample_rows, usecols, progress_callback) -> pd.DataFrame:
+    total_bytes = max(file_size(file), 1)
+
+    sample = pd.read_csv(
+        file,
+        encoding=encoding,
+        usecols=usecols,
+        nrows=sample_rows
+    )
+    file.seek(0)
+
+    dtypes = infer_dtypes(sample)
+
+    rows = estimate_rows(file, sample)
+
+    reader = pd.read_csv(
+        file,
+        encoding=encoding,
+        usecols=usecols,
+        dtype=dtypes,
+        chunksize=chunk_rows
+    )
+
+    # Each chunk is copied into its column builders and released, so
+    # peak memory stays close to the final frame plus one chunk
+    builders = {}
+    with reader:
+        for chunk in reader:
+            for col in chunk.columns:
+                builders.setdefault(col, ColumnBuilder(rows)).append(chunk[col])
+            del chunk
+
+            if progress_callback is not None:
+                progress_callback(min(file.tell() / total_bytes, 1.0))
+
+    columns = {}
+    for col in list(builders):
+        columns[col] = builders.pop(col).series(col)
+    df = pd.DataFrame(columns, copy=False)
+
+    if progress_callback is not None:
+        progress_callback(1.0)
+
+    return df
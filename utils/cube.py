@@ -0,0 +1,837 @@
+# utils/cube.py
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from config import CUBE_MAX_DATASETS, CUBE_MAX_ROLLUPS, ORDER_SKETCHES
+from utils.agg_cache import cached_aggregate
+from utils.date_layout import ZoneMap
+from utils.date_parsing import ensure_datetime
+from utils.fingerprint import dataset_version
+from utils.hll import CellSketches, hash_values
+from utils.quantile_sketch import CellQuantiles, quantile_label
+from utils.row_index import RowIndex
+from utils.schema import get_schema
+
+# Roles kept as cube dimensions, alongside the order day
+CUBE_ROLES = [
+    "city", "warehouse", "brand", "sku", "outlet",
+    "rep", "state", "order_state", "order_type"
+]
+
+# Rollups materialized with the cube ("date" = order day)
+PREBUILT_ROLLUPS = [
+    ["date", "city", "warehouse", "brand"],
+    ["date", "city"],
+    ["date", "warehouse"],
+    ["date", "brand"],
+    ["date"]
+] + [[role] for role in CUBE_ROLES]
+
+# Sidebar filter dimensions whose row indexes are built with the cube
+FILTER_ROLES = ["city", "warehouse", "brand"]
+
+LINES = "lines"
+ORDERS = "orders"
+
+# dataset version -> Cube, most recently used last
+_CUBES = OrderedDict()
+
+
+# ---------------- Encoding ----------------
+def _encode(series: pd.Series):
+    """
+    Integer codes and labels of a dimension column. Missing values get
+    their own code (len(labels)) so every row lands in a cell.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        labels = series.cat.categories
+    else:
+        codes, labels = pd.factorize(series)
+
+    na_code = len(labels)
+    if (codes < 0).any():
+        codes = np.where(codes < 0, na_code, codes)
+
+    return codes.astype(np.min_scalar_type(na_code), copy=False), pd.Index(labels)
+
+
+def _encode_days(series: pd.Series):
+    """
+    Dense day codes (days since the first order day) and the matching
+    calendar, plus whether the column holds whole days only.
+    """
+    values = ensure_datetime(series).to_numpy()
+    days = values.astype("datetime64[D]")
+    valid = ~np.isnat(days)
+
+    if not valid.any():
+        return np.zeros(len(values), dtype=np.uint8), pd.DatetimeIndex([]), True
+
+    day_numbers = days.view("int64")
+    first = day_numbers[valid].min()
+    span = int(day_numbers[valid].max() - first) + 1
+
+    codes = np.where(valid, day_numbers - first, span)
+    codes = codes.astype(np.min_scalar_type(span))
+
+    labels = pd.date_range(pd.Timestamp(days[valid].min()), periods=span, freq="D")
+    whole_days = bool((days[valid] == values[valid]).all())
+
+    return codes, labels, whole_days
+
+
+def _group_ids(code_arrays: list, cards: list, size: int):
+    """
+    Group id per position for a combination of code arrays.
+    Returns (ids, number of ids); some ids may be empty when the key
+    space is small enough to use directly.
+    """
+    if not code_arrays:
+        return np.zeros(size, dtype=np.int64), 1
+
+    space = 1
+    for card in cards:
+        space *= int(card)
+
+    if space < 2 ** 62:
+        key = np.zeros(size, dtype=np.int64)
+        for codes, card in zip(code_arrays, cards):
+            key *= int(card)
+            key += codes
+        if space <= 4 * size + 1024:
+            return key, space
+        ids, uniques = pd.factorize(key)
+        return ids, len(uniques)
+
+    # Key space too large for int64: fold one dimension at a time
+    ids, n = code_arrays[0].astype(np.int64), int(cards[0])
+    for codes, card in zip(code_arrays[1:], cards[1:]):
+        ids, uniques = pd.factorize(ids * int(card) + codes)
+        n = len(uniques)
+    return ids, n
+
+
+def _first_positions(ids: np.ndarray, n: int) -> np.ndarray:
+    """Position of the first element of every group id."""
+    first = np.zeros(n, dtype=np.int64)
+    positions = np.arange(len(ids) - 1, -1, -1)
+    first[ids[::-1]] = positions
+    return first
+
+
+def _aggregate(codes: dict, cards: dict, measures: dict, size: int, lines=None) -> pd.DataFrame:
+    """
+    Sum measures (and line counts) per combination of the given codes.
+    """
+    dims = list(codes)
+    ids, n = _group_ids([codes[dim] for dim in dims], [cards[dim] for dim in dims], size)
+
+    if lines is None:
+        line_counts = np.bincount(ids, minlength=n)
+    else:
+        line_counts = np.bincount(ids, weights=lines, minlength=n).astype(np.int64)
+
+    keep = np.flatnonzero(line_counts)
+    first = _first_positions(ids, n)[keep]
+
+    out = {dim: codes[dim][first] for dim in dims}
+    for name, values in measures.items():
+        out[name] = np.bincount(ids, weights=values, minlength=n)[keep]
+    out[LINES] = line_counts[keep]
+
+    return pd.DataFrame(out)
+
+
+# ---------------- Cube ----------------
+class Cube:
+    """
+    Pre-aggregated order lines of one dataset.
+
+    The finest cell is day x every dimension role present (city,
+    warehouse, brand, SKU, outlet, rep, state, order state/type) with
+    summed sales and quantity and a line count. Coarser rollups are
+    derived from the smallest materialized rollup that contains the
+    requested dimensions and kept (bounded) for reuse. Distinct order
+    counts are not additive: exact counts are computed from the row
+    codes on request, approximate ones merge HyperLogLog sketches kept
+    per day x filter-dimension cell. Order values (summed sales per
+    order) are kept as mergeable quantile sketches on the same cells.
+    """
+
+    def __init__(self, df: pd.DataFrame, schema=None):
+        schema = schema or get_schema(df)
+
+        self.version = schema.version
+        self.rows = len(df)
+        self.date_col = schema.col("date")
+        self.whole_days = False
+        self.date_sorted = False
+        self._day_zones = None
+
+        self._codes = {}
+        self._labels = {}
+
+        if self.date_col and self.date_col in df.columns:
+            codes, labels, self.whole_days = _encode_days(df[self.date_col])
+            self._codes[self.date_col] = codes
+            self._labels[self.date_col] = labels
+
+            # Missing dates carry the largest code, so a date-sorted
+            # dataset has non-decreasing day codes
+            self.date_sorted = bool((codes[1:] >= codes[:-1]).all())
+            if not self.date_sorted:
+                self._day_zones = ZoneMap(codes, null_value=len(labels))
+
+        for role in CUBE_ROLES:
+            col = schema.col(role)
+            if col and col in df.columns and col not in self._codes:
+                self._codes[col], self._labels[col] = _encode(df[col])
+
+        self._cards = {col: len(labels) + 1 for col, labels in self._labels.items()}
+        self.index = RowIndex(self._codes, self._labels)
+
+        self.measures = [
+            col for col in dict.fromkeys([schema.col("sales"), schema.col("quantity")])
+            if col and col in df.columns and pd.api.types.is_numeric_dtype(df[col])
+        ]
+
+        self._order_codes = None
+        self._order_counts = {}
+        self.order_sketch = None
+        self.value_sketch = None
+        self.cell_value_sketch = None
+        self._sketch_dims = []
+        self._order_level = []
+        order_col = schema.col("order_id")
+        if order_col and order_col in df.columns:
+            self._order_codes, order_labels = pd.factorize(df[order_col])
+            self._order_labels = order_labels
+            self._n_orders = len(order_labels)
+
+        measures = {
+            col: np.nan_to_num(df[col].to_numpy(dtype=np.float64, na_value=np.nan))
+            for col in self.measures
+        }
+
+        if self._order_codes is not None and ORDER_SKETCHES:
+            self._build_order_sketches(schema, order_labels, measures.get(schema.col("sales")))
+
+        self._finest = frozenset(self._codes)
+        self._rollups = OrderedDict()
+        finest = _aggregate(dict(self._codes), self._cards, measures, self.rows)
+        if self.date_col in self._codes and not self.date_sorted:
+            finest = finest.iloc[np.argsort(finest[self.date_col].to_numpy(), kind="stable")]
+        self._rollups[self._finest] = finest.reset_index(drop=True)
+
+        for roles in PREBUILT_ROLLUPS:
+            cols = [self.date_col if role == "date" else schema.col(role) for role in roles]
+            if all(col in self._codes for col in cols):
+                self._materialize(cols)
+
+        for role in FILTER_ROLES:
+            if schema.col(role) in self._codes:
+                self.index.index(schema.col(role))
+
+    def _build_order_sketches(self, schema, order_labels, sales):
+        """
+        Order sketches per day x filter-dimension cell: HyperLogLog of
+        order ids and, given sales, two quantile sketches of order
+        values: whole orders in the cell of their first line, and each
+        order's value within every cell it has lines in.
+
+        Sketch dimensions constant within every order (typically the
+        date, city and warehouse) are recorded as order-level: grouping
+        or filtering on those alone never splits an order.
+        """
+        dims = [self.date_col] + [schema.col(role) for role in FILTER_ROLES]
+        self._sketch_dims = [dim for dim in dims if dim in self._codes]
+
+        valid = self._order_codes >= 0
+        codes = [self._codes[dim][valid] for dim in self._sketch_dims]
+
+        ids, _ = _group_ids(codes, [self._cards[dim] for dim in self._sketch_dims], int(valid.sum()))
+        ids, cells = pd.factorize(ids)
+        first = _first_positions(ids, len(cells))
+
+        self._sketch_cells = {dim: dim_codes[first] for dim, dim_codes in zip(self._sketch_dims, codes)}
+        self._n_sketch_cells = len(cells)
+
+        # Hash each distinct order id once, then spread to the rows
+        orders = self._order_codes[valid]
+        hashes = hash_values(order_labels)[orders]
+        self.order_sketch = CellSketches(ids, hashes)
+
+        first_lines = _first_positions(orders, self._n_orders)
+        self._order_level = [
+            dim for dim, dim_codes in zip(self._sketch_dims, codes)
+            if (dim_codes == dim_codes[first_lines][orders]).all()
+        ]
+
+        if sales is not None:
+            order_values = np.bincount(orders, weights=sales[valid], minlength=self._n_orders)
+            self.value_sketch = CellQuantiles(ids[first_lines], order_values)
+
+            pairs, pair_ids = np.unique(ids * np.int64(self._n_orders) + orders, return_inverse=True)
+            pair_values = np.bincount(pair_ids, weights=sales[valid], minlength=len(pairs))
+            self.cell_value_sketch = CellQuantiles(pairs // self._n_orders, pair_values)
+
+    # ---------------- Introspection ----------------
+    @property
+    def dimensions(self) -> list:
+        return list(self._codes)
+
+    def has(self, cols: list, exact_dates: bool = True) -> bool:
+        """
+        True when every column is a cube dimension. With exact_dates the
+        date column only counts if it holds whole days (so a daily
+        rollup matches grouping on the raw timestamps).
+        """
+        for col in cols:
+            if col not in self._codes:
+                return False
+            if col == self.date_col and exact_dates and not self.whole_days:
+                return False
+        return True
+
+    def order_codes(self):
+        """(order code per row, -1 when missing; order ids), or None."""
+        if self._order_codes is None:
+            return None
+        return self._order_codes, self._order_labels
+
+    @property
+    def order_count_error(self):
+        """Relative standard error of approximate order counts, or None."""
+        return None if self.order_sketch is None else self.order_sketch.error
+
+    def can_estimate_orders(self, dims: list, where: dict = None) -> bool:
+        """True when approximate order counts cover dims and filters."""
+        return (
+            self.order_sketch is not None
+            and set(dims) | set(where or {}) <= set(self._sketch_dims)
+        )
+
+    def labels(self, col: str) -> pd.Index:
+        """Observed values of a dimension."""
+        used = self.rollup([col])[col]
+        return pd.Index(used)
+
+    # ---------------- Rollups ----------------
+    def _materialize(self, dims: list) -> pd.DataFrame:
+        # Day first keeps every rollup ordered by day (see _rollup)
+        dims = sorted(dims, key=lambda dim: dim != self.date_col)
+        key = frozenset(dims)
+
+        rollup = self._rollups.get(key)
+        if rollup is not None:
+            self._rollups.move_to_end(key)
+            return rollup
+
+        parent = min(
+            (cells for cols, cells in self._rollups.items() if key <= cols),
+            key=len
+        )
+
+        rollup = _aggregate(
+            {dim: parent[dim].to_numpy() for dim in dims},
+            self._cards,
+            {col: parent[col].to_numpy() for col in self.measures},
+            len(parent),
+            lines=parent[LINES].to_numpy()
+        )
+
+        self._rollups[key] = rollup
+        while len(self._rollups) > CUBE_MAX_ROLLUPS:
+            oldest = next(iter(self._rollups))
+            if oldest == self._finest:
+                self._rollups.move_to_end(oldest)
+                oldest = next(iter(self._rollups))
+            self._rollups.pop(oldest)
+
+        return rollup
+
+    def _is_range(self, col: str, wanted) -> bool:
+        """Date filters given as a (start, end) tuple are ranges."""
+        return col == self.date_col and isinstance(wanted, tuple)
+
+    def _day_bounds(self, wanted: tuple):
+        """Half-open range of day codes for an inclusive (start, end)."""
+        labels = self._labels[self.date_col]
+        lo = labels.searchsorted(pd.Timestamp(wanted[0]), side="left")
+        hi = labels.searchsorted(pd.Timestamp(wanted[1]), side="right")
+        return lo, hi
+
+    def _date_rows(self, lo: int, hi: int):
+        """
+        Rows whose day code is in [lo, hi): a slice found by binary
+        search on a date-sorted dataset, else positions from the
+        per-chunk zone map.
+        """
+        days = self._codes[self.date_col]
+        if self.date_sorted:
+            return slice(
+                int(np.searchsorted(days, lo, side="left")),
+                int(np.searchsorted(days, hi, side="left"))
+            )
+        return self._day_zones.positions(lo, hi)
+
+    def _mask(self, codes: dict, where: dict) -> np.ndarray:
+        """Boolean mask over code arrays for a where clause."""
+        size = len(next(iter(codes.values()))) if codes else 0
+        mask = np.ones(size, dtype=bool)
+
+        for col, wanted in (where or {}).items():
+            values = codes[col]
+            if self._is_range(col, wanted):
+                lo, hi = self._day_bounds(wanted)
+                mask &= (values >= lo) & (values < hi)
+            else:
+                mask &= np.isin(values, self.index.wanted_codes(col, wanted))
+
+        return mask
+
+    def _orders(self, dims: list, where: dict) -> pd.DataFrame:
+        """
+        Distinct order count per cell, computed from the row codes.
+        Unfiltered counts are memoized per set of dimensions.
+        """
+        key = frozenset(dims)
+        if not where and key in self._order_counts:
+            return self._order_counts[key]
+
+        counts = self._count_orders(dims, where)
+        if not where:
+            self._order_counts[key] = counts
+        return counts
+
+    def select_rows(self, where: dict):
+        """
+        Rows matching a where clause: None (all rows), a slice or
+        sorted row ids.
+        """
+        where = where or {}
+        ranges = {col: wanted for col, wanted in where.items() if self._is_range(col, wanted)}
+        filters = {col: wanted for col, wanted in where.items() if col not in ranges}
+
+        # Dimension filters resolve to row ids through the row index,
+        # the date range to a contiguous slice (or zone-map positions)
+        rows = self.index.select(filters)
+
+        for col, wanted in ranges.items():
+            lo, hi = self._day_bounds(wanted)
+            if rows is None:
+                rows = self._date_rows(lo, hi)
+            elif self.date_sorted:
+                window = self._date_rows(lo, hi)
+                rows = rows[np.searchsorted(rows, window.start):np.searchsorted(rows, window.stop)]
+            else:
+                days = self._codes[col][rows]
+                rows = rows[(days >= lo) & (days < hi)]
+
+        return rows
+
+    def _order_pairs(self, dims: list, where: dict):
+        """
+        Codes of dims and order codes of the rows matching where,
+        leaving out rows without an order id.
+        """
+        rows = self.select_rows(where)
+
+        codes = {}
+        for col in dims:
+            codes[col] = self._codes[col] if rows is None else self._codes[col][rows]
+        orders = self._order_codes if rows is None else self._order_codes[rows]
+
+        valid = orders >= 0
+        return {col: codes[col][valid] for col in dims}, orders[valid]
+
+    def _count_orders(self, dims: list, where: dict) -> pd.DataFrame:
+        codes, orders = self._order_pairs(dims, where)
+
+        if not dims:
+            return pd.DataFrame({ORDERS: [len(pd.unique(orders))]})
+
+        ids, n = _group_ids(
+            [codes[col] for col in dims], [self._cards[col] for col in dims], len(orders)
+        )
+        pairs = pd.unique(ids * np.int64(self._n_orders) + orders)
+        counts = np.bincount(pairs // self._n_orders, minlength=n)
+
+        keep = np.flatnonzero(counts)
+        first = _first_positions(ids, n)[keep]
+
+        out = {col: codes[col][first] for col in dims}
+        out[ORDERS] = counts[keep]
+        return pd.DataFrame(out)
+
+    def _sketch_groups(self, dims: list, where: dict):
+        """
+        Sketch cells passing the filters and their group ids over dims:
+        (selected cells, group id per selected cell, number of ids).
+        """
+        cells = self._sketch_cells
+        mask = np.ones(self._n_sketch_cells, dtype=bool)
+        if where:
+            mask &= self._mask({col: cells[col] for col in where}, where)
+
+        selected = np.flatnonzero(mask)
+        ids, n = _group_ids(
+            [cells[col][selected] for col in dims], [self._cards[col] for col in dims], len(selected)
+        )
+        return selected, ids, n
+
+    def _estimate_orders(self, dims: list, where: dict) -> pd.DataFrame:
+        """
+        Approximate distinct orders per cell of dims, merging the
+        sketches of the sketch cells that pass the filters.
+        """
+        cells = self._sketch_cells
+        selected, ids, n = self._sketch_groups(dims, where)
+
+        groups = np.full(self._n_sketch_cells, -1, dtype=np.int64)
+        groups[selected] = ids
+
+        estimates = np.rint(self.order_sketch.estimate(groups, n)).astype(np.int64)
+
+        if not dims:
+            return pd.DataFrame({ORDERS: estimates[:1]})
+
+        keep = np.flatnonzero(estimates)
+        first = selected[_first_positions(ids, n)[keep]]
+
+        out = {col: cells[col][first] for col in dims}
+        out[ORDERS] = estimates[keep]
+        return pd.DataFrame(out)
+
+    def _order_counts_for(self, dims: list, where: dict, approximate: bool) -> pd.DataFrame:
+        if approximate and self.can_estimate_orders(dims, where):
+            return self._estimate_orders(dims, where)
+        return self._orders(dims, where)
+
+    def _value_sketch_for(self, dims: list, where: dict):
+        """
+        Quantile sketch answering order values over dims and filters
+        exactly (up to the sketch error), or None:
+
+        - whole-order sketch when every dim and filter is order-level,
+          so no order is split across groups or filters;
+        - per-cell sketch when every other sketch dim is grouped on, so
+          an order's lines within a group share one cell (e.g. per
+          brand when date, city and warehouse are order-level).
+        """
+        used = set(dims) | set(where)
+        if self.value_sketch is None or not used <= set(self._sketch_dims):
+            return None
+        if used <= set(self._order_level):
+            return self.value_sketch
+        if set(self._sketch_dims) - set(self._order_level) <= set(dims):
+            return self.cell_value_sketch
+        return None
+
+    def order_value_quantiles(self, dims: list, qs, where: dict = None):
+        """
+        Order value quantiles (e.g. qs=[0.5, 0.9]) per combination of
+        dims, merged from the quantile sketches, with an "orders" count.
+        Within a group an order's value is the sum of its lines there.
+        Columns are labelled p50, p90, ... Returns None when the
+        sketches cannot answer dims and filters (see _value_sketch_for).
+        """
+        dims = list(dict.fromkeys(dims))
+        where = {
+            col: wanted if isinstance(wanted, tuple) else frozenset(wanted)
+            for col, wanted in (where or {}).items()
+            if wanted is not None
+        }
+        sketch = self._value_sketch_for(dims, where)
+        if sketch is None:
+            return None
+
+        return cached_aggregate(
+            self.version,
+            dims,
+            ["order_value"],
+            ("quantiles", tuple(qs), where),
+            lambda: self._order_value_quantiles(sketch, dims, list(qs), where)
+        )
+
+    def _order_value_quantiles(self, sketch, dims: list, qs: list, where: dict) -> pd.DataFrame:
+        cells = self._sketch_cells
+        selected, ids, n = self._sketch_groups(dims, where)
+
+        groups = np.full(self._n_sketch_cells, -1, dtype=np.int64)
+        groups[selected] = ids
+        values, totals = sketch.quantiles(groups, n, qs)
+
+        keep = np.flatnonzero(totals) if dims else np.arange(1)
+        first = selected[_first_positions(ids, n)[keep]]
+
+        out = {col: cells[col][first] for col in dims}
+        for i, q in enumerate(qs):
+            out[quantile_label(q)] = values[keep, i]
+        out[ORDERS] = totals[keep]
+
+        return self._decode(pd.DataFrame(out), dims)
+
+    def rollup(
+        self,
+        dims: list,
+        where: dict = None,
+        orders: bool = False,
+        approximate: bool = False
+    ) -> pd.DataFrame:
+        """
+        Aggregated measures per combination of dims, answered from the
+        smallest matching materialized rollup.
+
+        where maps a dimension to the labels to keep, or for the date
+        column to an inclusive (start, end) range. orders=True adds a
+        distinct order count; with approximate=True it is merged from
+        the HyperLogLog sketches when they cover dims and filters (see
+        order_count_error). Cells with a missing dimension value are
+        dropped, as groupby does.
+        """
+        dims = list(dict.fromkeys(dims))
+        where = {
+            col: wanted if isinstance(wanted, tuple) else frozenset(wanted)
+            for col, wanted in (where or {}).items()
+            if wanted is not None
+        }
+
+        return cached_aggregate(
+            self.version,
+            dims,
+            self.measures,
+            ("cube", where, orders, approximate),
+            lambda: self._rollup(dims, where, orders, approximate=approximate)
+        )
+
+    def _rollup(
+        self,
+        dims: list,
+        where: dict,
+        orders: bool,
+        decode: bool = True,
+        approximate: bool = False
+    ) -> pd.DataFrame:
+        cells = self._materialize(dims + [col for col in where if col not in dims])
+
+        # Rollups are ordered by day: a date range is a binary-searched slice
+        ranges = {col: wanted for col, wanted in where.items() if self._is_range(col, wanted)}
+        for col, wanted in ranges.items():
+            lo, hi = self._day_bounds(wanted)
+            days = cells[col].to_numpy()
+            cells = cells.iloc[np.searchsorted(days, lo):np.searchsorted(days, hi)]
+
+        filters = {col: wanted for col, wanted in where.items() if col not in ranges}
+        if filters:
+            cells = cells[self._mask({col: cells[col].to_numpy() for col in filters}, filters)]
+
+        if set(where) - set(dims):
+            cells = _aggregate(
+                {dim: cells[dim].to_numpy() for dim in dims},
+                self._cards,
+                {col: cells[col].to_numpy() for col in self.measures},
+                len(cells),
+                lines=cells[LINES].to_numpy()
+            )
+
+        if orders and self._order_codes is not None:
+            cells = self._with_orders(cells, dims, self._order_counts_for(dims, where, approximate))
+
+        return self._decode(cells, dims) if decode else cells
+
+    def _with_orders(self, cells: pd.DataFrame, dims: list, counts: pd.DataFrame) -> pd.DataFrame:
+        """Attach distinct order counts (by code) to rollup cells."""
+        if not dims:
+            return cells.assign(**{ORDERS: counts[ORDERS].iloc[0]})
+
+        cells = cells.merge(counts, on=dims, how="left")
+        cells[ORDERS] = cells[ORDERS].fillna(0).astype(np.int64)
+        return cells
+
+    def grouping_sets(
+        self,
+        sets: list,
+        where: dict = None,
+        orders: bool = False,
+        approximate: bool = False
+    ) -> dict:
+        """
+        Several rollups at once, like SQL GROUPING SETS.
+
+        The rollup over the union of all sets is filtered once and every
+        set is aggregated from those cells, and distinct orders come from
+        a single pass over the matching rows, instead of one rollup (and
+        one row scan) per set. Returns {tuple(dims): frame}, each frame
+        shaped like rollup(dims, where, orders, approximate).
+        """
+        sets = [tuple(dict.fromkeys(dims)) for dims in sets]
+        where = {
+            col: wanted if isinstance(wanted, tuple) else frozenset(wanted)
+            for col, wanted in (where or {}).items()
+            if wanted is not None
+        }
+
+        results = cached_aggregate(
+            self.version,
+            sets,
+            self.measures,
+            ("cube-sets", where, orders, approximate),
+            lambda: self._grouping_sets(sets, where, orders, approximate)
+        )
+        return {dims: cells.copy(deep=False) for dims, cells in results.items()}
+
+    def _grouping_sets(self, sets: list, where: dict, orders: bool, approximate: bool) -> dict:
+        union = list(dict.fromkeys(dim for dims in sets for dim in dims))
+        cells = self._rollup(union, where, orders=False, decode=False)
+
+        counts = {}
+        if orders and self._order_codes is not None:
+            estimated = [
+                dims for dims in sets
+                if approximate and self.can_estimate_orders(list(dims), where)
+            ]
+            for dims in estimated:
+                counts[dims] = self._estimate_orders(list(dims), where)
+
+            exact = [dims for dims in sets if dims not in counts]
+            if exact:
+                exact_union = list(dict.fromkeys(dim for dims in exact for dim in dims))
+                counts.update(self._count_order_sets(exact_union, exact, where))
+
+        results = {}
+        for dims in sets:
+            if list(dims) == union:
+                subset = cells
+            else:
+                subset = _aggregate(
+                    {dim: cells[dim].to_numpy() for dim in dims},
+                    self._cards,
+                    {col: cells[col].to_numpy() for col in self.measures},
+                    len(cells),
+                    lines=cells[LINES].to_numpy()
+                )
+            if dims in counts:
+                subset = self._with_orders(subset, list(dims), counts[dims])
+            results[dims] = self._decode(subset, list(dims))
+
+        return results
+
+    def _count_order_sets(self, union: list, sets: list, where: dict) -> dict:
+        """
+        Distinct orders for every set from one pass over the rows: the
+        distinct (union cell, order) pairs are found once and each set
+        counts distinct (set cell, order) pairs among them.
+        """
+        codes, orders = self._order_pairs(union, where)
+
+        ids, n = _group_ids(
+            [codes[col] for col in union], [self._cards[col] for col in union], len(orders)
+        )
+        pairs = pd.unique(ids * np.int64(self._n_orders) + orders)
+        pair_cells, pair_orders = np.divmod(pairs, self._n_orders)
+
+        first = _first_positions(ids, n)
+        cell_codes = {col: codes[col][first][pair_cells] for col in union}
+
+        counts = {}
+        for dims in sets:
+            if not dims:
+                counts[dims] = pd.DataFrame({ORDERS: [len(pd.unique(pair_orders))]})
+                continue
+
+            set_ids, m = _group_ids(
+                [cell_codes[col] for col in dims], [self._cards[col] for col in dims], len(pairs)
+            )
+            unique = pd.unique(set_ids * np.int64(self._n_orders) + pair_orders)
+            per_set = np.bincount(unique // self._n_orders, minlength=m)
+
+            keep = np.flatnonzero(per_set)
+            set_first = _first_positions(set_ids, m)[keep]
+
+            out = {col: cell_codes[col][set_first] for col in dims}
+            out[ORDERS] = per_set[keep]
+            counts[dims] = pd.DataFrame(out)
+
+        return counts
+
+    def _decode(self, cells: pd.DataFrame, dims: list) -> pd.DataFrame:
+        """Replace codes with labels and drop cells with missing values."""
+        keep = np.ones(len(cells), dtype=bool)
+        for dim in dims:
+            keep &= cells[dim].to_numpy() < len(self._labels[dim])
+
+        cells = cells[keep]
+        out = {dim: self._labels[dim].take(cells[dim].to_numpy()) for dim in dims}
+        for col in cells.columns:
+            if col not in out:
+                out[col] = cells[col].to_numpy()
+
+        return pd.DataFrame(out)
+
+    def total(self, where: dict = None, orders: bool = False) -> pd.Series:
+        """Grand totals (optionally filtered) as a Series of measures."""
+        cells = self.rollup([], where=where, orders=orders)
+        if cells.empty:
+            return pd.Series(0, index=self.measures + [LINES], dtype=float)
+        return cells.iloc[0]
+
+
+# ---------------- Access ----------------
+def _remember(cube: Cube):
+    if cube.version is None:
+        return
+    _CUBES[cube.version] = cube
+    _CUBES.move_to_end(cube.version)
+    while len(_CUBES) > CUBE_MAX_DATASETS:
+        _CUBES.popitem(last=False)
+
+
+def publish_cube(df: pd.DataFrame) -> Cube:
+    """Build the cube of a newly loaded dataset and keep it in session."""
+    if df is None or df.empty:
+        st.session_state["cube"] = None
+        return None
+
+    cube = Cube(df)
+    _remember(cube)
+    st.session_state["cube"] = cube
+    return cube
+
+
+def get_cube(df: pd.DataFrame, build: bool = None):
+    """
+    Cube of a dataset, or None.
+
+    The upload's cube is returned whenever the frame has the same
+    dataset version. Otherwise a cube is only built for the session
+    dataset itself (or when build=True), never for ad-hoc filtered
+    frames.
+    """
+    if df is None or df.empty:
+        return None
+
+    version = dataset_version(df)
+
+    cube = st.session_state.get("cube")
+    if version is not None and cube is not None and cube.version == version:
+        return cube
+
+    cube = _CUBES.get(version) if version is not None else None
+    if cube is not None:
+        _CUBES.move_to_end(version)
+        return cube
+
+    if build is None:
+        build = df is st.session_state.get("data")
+    if not build:
+        return None
+
+    cube = Cube(df)
+    _remember(cube)
+    return cube
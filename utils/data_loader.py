@@ -1,33 +1,265 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import pandas as pd
 import streamlit as st
 
+from config import (
+    CUBE_BUILD_ON_UPLOAD,
+    INGEST_MAX_WORKERS,
+    SORT_BY_DATE,
+    STREAMING_MIN_BYTES
+)
+from utils.column_detector import detect_roles, projection_columns
+from utils.cube import publish_cube
+from utils.csv_streaming import csv_header, file_size, read_csv_chunked
+from utils.dataset_cache import (
+    cache_available,
+    file_fingerprint,
+    load_cached,
+    store_cached
+)
+from utils.dataset_merge import append_deltas
+from utils.date_layout import sort_by_date
+from utils.date_parsing import parse_date_columns
+from utils.excel_ingest import read_excel_fast
+from utils.fingerprint import new_version, register_version
+from utils.memory_optimizer import compact_dataframe
+from utils.orders import publish_order_facts
+from utils.schema import publish_schema
+from utils.server_source import columnar_header, read_columnar
+
+
+def file_kind(name):
+    """
+    Return 'csv', 'excel', 'columnar' (Parquet / Arrow) or None
+    based on the file extension.
+    """
+    name = name.lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".xlsx", ".xls")):
+        return "excel"
+    if name.endswith((".parquet", ".arrow", ".feather")):
+        return "columnar"
+    return None
+
+
+def read_dataset(
+    file,
+    streaming=False,
+    sheets=None,
+    project=False,
+    progress_callback=None
+):
+    """
+    Parse a CSV or Excel file into a DataFrame.
+    Pure parsing step: no Streamlit calls, errors are raised to the caller.
+    streaming=True reads uploaded CSVs in chunks (see utils.csv_streaming);
+    server-side CSVs are always parsed straight from their memory map.
+    sheets selects the Excel sheet(s) to combine (default: first sheet).
+    project=True peeks at the header and reads only dashboard columns.
+    """
+
+    kind = file_kind(file.name)
+
+    # -----------------------------
+    # CSV Handling
+    # -----------------------------
+    usecols = None
+    if kind == "csv" and project:
+        usecols = projection_columns(csv_header(file)) or None
+    if kind == "columnar" and project:
+        usecols = projection_columns(columnar_header(file)) or None
+
+    if kind == "csv" and hasattr(file, "path"):
+        # Server-side file: let the C parser memory-map it directly,
+        # whatever its size: pages come from the OS cache, so the chunked
+        # reader would only add Python-level copies
+        try:
+            return pd.read_csv(file.path, usecols=usecols, memory_map=True)
+        except UnicodeDecodeError:
+            return pd.read_csv(
+                file.path,
+                usecols=usecols,
+                memory_map=True,
+                encoding="latin1"
+            )
+
+    if kind == "csv" and streaming:
+        return read_csv_chunked(
+            file,
+            usecols=usecols,
+            progress_callback=progress_callback
+        )
+
+    if kind == "csv":
+        try:
+            return pd.read_csv(file, usecols=usecols)
+        except UnicodeDecodeError:
+            file.seek(0)
+            return pd.read_csv(file, usecols=usecols, encoding="latin1")
+
+    # -----------------------------
+    # Excel Handling
+    # -----------------------------
+    if kind == "excel":
+        return read_excel_fast(file, sheets=sheets, project=project)
+
+    # -----------------------------
+    # Parquet / Arrow Handling
+    # -----------------------------
+    if kind == "columnar":
+        return read_columnar(file, usecols=usecols)
+
+    return None
+
+
+def ingest_file(
+    file,
+    use_cache=True,
+    streaming=None,
+    sheets=None,
+    project=False,
+    progress_callback=None
+):
+    """
+    Parse one file, or fetch it from the Parquet cache.
+    No Streamlit calls, so it is safe to run in worker threads.
+    Returns (df, cache_key, cache_hit).
+    """
+
+    if streaming is None:
+        streaming = file_size(file) >= STREAMING_MIN_BYTES
+
+    # Parquet / Arrow sources are already columnar: nothing to cache
+    if file_kind(file.name) == "columnar":
+        use_cache = False
+
+    # -----------------------------
+    # Content-addressed Cache
+    # -----------------------------
+    key = None
+    df = None
+
+    if use_cache and cache_available():
+        key = file_fingerprint(
+            file,
+            {"streaming": streaming, "sheets": sheets, "project": project}
+        )
+        df = load_cached(key)
+
+    cache_hit = df is not None
+
+    if df is None:
+        df = read_dataset(
+            file,
+            streaming=streaming,
+            sheets=sheets,
+            project=project,
+            progress_callback=progress_callback
+        )
+
+        # Dates are parsed once here and cached as datetime64
+        df = parse_date_columns(df)
+
+        # Cached files are stored date-sorted, so cache hits need no sort
+        if SORT_BY_DATE and df is not None:
+            df, _ = sort_by_date(df, detect_roles(df.columns.tolist())["date"])
+
+        if key and df is not None and not df.empty:
+            store_cached(key, df)
+
+    return df, key, cache_hit
+
+
+def date_parse_failures(frames: list) -> dict:
+    """Date values that did not parse, per column, over the ingested frames."""
+    totals = {}
+    for frame in frames:
+        for col, failed in frame.attrs.get("date_parse_failures", {}).items():
+            totals[col] = totals.get(col, 0) + failed
+    return totals
+
+
+def publish_dataset(
+    df,
+    key=None,
+    cache_hit=False,
+    memory_report=None,
+    row_index=None,
+    date_failures=None
+):
+    """
+    Make a DataFrame the active dataset for every page.
+    """
+    # Rows are kept sorted by order date so date windows are slices
+    date_col = detect_roles(df.columns.tolist())["date"] if df is not None else None
+    if SORT_BY_DATE:
+        df, order = sort_by_date(df, date_col)
+        if order is not None and row_index is not None:
+            row_index = row_index.take(order)
+
+    # Support ALL existing pages safely
+    st.session_state["df"] = df
+    st.session_state["data"] = df
+    st.session_state["dataset_key"] = key
+    st.session_state["dataset_cache_hit"] = cache_hit
+    st.session_state["memory_report"] = memory_report
+    # Non-blank date values turned into NaT at ingestion, per column
+    st.session_state["date_parse_failures"] = date_failures or {}
+    # Order-line hash index used for de-duplicated appends (built lazily)
+    st.session_state["dataset_row_index"] = row_index
+
+    # Every publish is a new dataset version: per-dataset caches (cube,
+    # schema, aggregates) key on it, never on the content itself
+    register_version(df, new_version())
+
+    # Roles, dtypes, cardinalities and date range, computed once per upload
+    publish_schema(df)
 
-def load_dataset(file):
+    # Pre-aggregated rollups shared by every chart and page
+    st.session_state["cube"] = None
+    if CUBE_BUILD_ON_UPLOAD:
+        publish_cube(df)
+
+    # One row per order (totals, lines, first date), for order KPIs
+    publish_order_facts(df)
+
+
+def load_dataset(
+    file,
+    use_cache=True,
+    streaming=None,
+    compact=False,
+    sheets=None,
+    project=False,
+    progress_callback=None
+):
     """
     Load CSV or Excel file into a Pandas DataFrame.
+    Repeat uploads of the same file are served from the local Parquet cache.
+    streaming=None enables chunked CSV ingestion for files above
+    STREAMING_MIN_BYTES.
+    compact=True runs the categorical / key downcast pass after loading.
+    sheets lists the Excel sheets to read (default: first sheet).
+    project=True keeps only the columns the dashboards use.
     Stores data safely in Streamlit session_state for all pages.
     """
 
     try:
-        # -----------------------------
-        # CSV Handling
-        # -----------------------------
-        if file.name.lower().endswith(".csv"):
-            try:
-                df = pd.read_csv(file)
-            except UnicodeDecodeError:
-                df = pd.read_csv(file, encoding="latin1")
-
-        # -----------------------------
-        # Excel Handling
-        # -----------------------------
-        elif file.name.lower().endswith((".xlsx", ".xls")):
-            df = pd.read_excel(file, engine="openpyxl")
-
-        else:
+        if file_kind(file.name) is None:
             st.error("Unsupported file format. Please upload CSV or Excel.")
             return None
 
+        df, key, cache_hit = ingest_file(
+            file,
+            use_cache=use_cache,
+            streaming=streaming,
+            sheets=sheets,
+            project=project,
+            progress_callback=progress_callback
+        )
+
         # -----------------------------
         # Safety Checks
         # -----------------------------
@@ -35,12 +267,19 @@ def load_dataset(file):
             st.error("Uploaded file is empty or invalid.")
             return None
 
+        # -----------------------------
+        # Optional Compaction
+        # -----------------------------
+        date_failures = date_parse_failures([df])
+
+        memory_report = None
+        if compact:
+            df, memory_report = compact_dataframe(df)
+
         # -----------------------------
         # SESSION STATE (CRITICAL)
         # -----------------------------
-        # Support ALL existing pages safely
-        st.session_state["df"] = df
-        st.session_state["data"] = df
+        publish_dataset(df, key, cache_hit, memory_report, date_failures=date_failures)
 
         return df
 
@@ -49,38 +288,110 @@ def load_dataset(file):
         return None
 
 
-def detect_columns(df, dtype="datetime"):
-    """
-    Detect columns of a certain type in the DataFrame.
-    dtype: 'datetime', 'numeric', 'categorical'
+def load_datasets(
+    files,
+    append=False,
+    use_cache=True,
+    compact=False,
+    sheets=None,
+    project=False,
+    max_workers=INGEST_MAX_WORKERS,
+    progress_callback=None
+):
     """
+    Load several files at once (parsed in parallel) into one dataset.
 
-    if df is None or df.empty:
-        return []
+    Files are combined in upload order and de-duplicated on the
+    order-line key (see utils.dataset_merge). append=True adds them to
+    the dataset already in session_state instead of replacing it; the
+    stored hash index means only the new files are hashed.
+    Returns the combined DataFrame, or None on failure.
+    """
 
     try:
-        if dtype == "datetime":
-            cols = df.columns.tolist()
-            datetime_cols = []
+        unsupported = [f.name for f in files if file_kind(f.name) is None]
+        if unsupported:
+            st.error(f"Unsupported file format: {', '.join(unsupported)}")
+            return None
 
-            for col in cols:
-                try:
-                    converted = pd.to_datetime(df[col], errors="coerce")
-                    if converted.notna().sum() > 0:
-                        datetime_cols.append(col)
-                except Exception:
-                    continue
+        # -----------------------------
+        # Parallel Parsing
+        # -----------------------------
+        results = [None] * len(files)
+        workers = max(1, min(max_workers, len(files)))
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(
+                    ingest_file,
+                    file,
+                    use_cache=use_cache,
+                    sheets=sheets,
+                    project=project
+                ): i
+                for i, file in enumerate(files)
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                results[futures[future]] = future.result()
+                if progress_callback is not None:
+                    progress_callback(done / len(files))
 
-            return datetime_cols
+        frames = [df for df, _, _ in results if df is not None and not df.empty]
+        if not frames:
+            st.error("Uploaded files are empty or invalid.")
+            return None
 
-        elif dtype == "numeric":
-            return df.select_dtypes(include=["number"]).columns.tolist()
+        date_failures = date_parse_failures(frames)
 
-        elif dtype == "categorical":
-            return df.select_dtypes(include=["object", "category"]).columns.tolist()
+        memory_report = None
+        if compact:
+            compacted = [compact_dataframe(frame) for frame in frames]
+            frames = [frame for frame, _ in compacted]
+            memory_report = {
+                "before": sum(r["before"] for _, r in compacted),
+                "after": sum(r["after"] for _, r in compacted)
+            }
+            memory_report["saved"] = memory_report["before"] - memory_report["after"]
+            memory_report["saved_pct"] = (
+                memory_report["saved"] / memory_report["before"] * 100
+                if memory_report["before"] else 0.0
+            )
 
-        else:
-            return df.columns.tolist()
+        # -----------------------------
+        # De-duplicated Combination
+        # -----------------------------
+        base = st.session_state.get("df") if append else None
+        row_index = st.session_state.get("dataset_row_index") if append else None
+
+        if base is None:
+            base, frames = frames[0], frames[1:]
+            row_index = None
+
+        reports = []
+        for frame in frames:
+            base, row_index, report = append_deltas(base, frame, base_index=row_index)
+            reports.append(report)
+
+        keys = [key for _, key, _ in results]
+        publish_dataset(
+            base,
+            key=keys[0] if len(keys) == 1 and not append else None,
+            cache_hit=all(hit for _, _, hit in results),
+            memory_report=memory_report,
+            row_index=row_index,
+            date_failures=date_failures
+        )
+        st.session_state["append_report"] = {
+            "files": len(files),
+            "added_rows": sum(r["added_rows"] for r in reports),
+            "replaced_rows": sum(r["replaced_rows"] for r in reports),
+            "total_rows": int(len(base)),
+            "line_key": all(r["line_key"] for r in reports)
+        }
+
+        return base
+
+    except Exception as e:
+        st.error(f"Error loading datasets: {e}")
+        return None
 
-    except Exception:
-        return []
@@ -1,10 +1,88 @@
+from collections import OrderedDict
+
+import numpy as np
 import pandas as pd
 
+from utils.date_parsing import ensure_datetime, is_datetime
+from utils.fingerprint import dataset_version, register_version
+
+MONTH_NAMES = [
+    "Jan", "Feb", "Mar", "Apr", "May", "Jun",
+    "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"
+]
+
+MAX_CACHED_CALENDARS = 8
+
+# (dataset version, date_col) -> calendar side table
+_CALENDARS = OrderedDict()
+
+
+def build_calendar(dates: pd.Series) -> pd.DataFrame:
+    """
+    Year / Month / MonthName for every row, as compact columns aligned
+    with the source rows; missing for rows without a valid date.
+
+    Only the distinct dates are decomposed and the result is mapped back
+    through the factorized codes, so no per-row strings are created.
+    """
+    dates = ensure_datetime(dates)
+    codes, uniques = pd.factorize(dates)
+    uniques = pd.DatetimeIndex(uniques)
+    missing = codes < 0
+
+    years = np.zeros(len(codes), dtype=np.int16)
+    months = np.ones(len(codes), dtype=np.int8)
+    if len(uniques):
+        years = uniques.year.to_numpy().astype(np.int16)[codes]
+        months = uniques.month.to_numpy().astype(np.int8)[codes]
+
+    return pd.DataFrame(
+        {
+            "Year": pd.arrays.IntegerArray(years, missing),
+            "Month": pd.arrays.IntegerArray(months, missing),
+            "MonthName": pd.Categorical.from_codes(
+                np.where(missing, -1, months - 1), categories=MONTH_NAMES, ordered=True
+            )
+        },
+        index=dates.index
+    )
+
+
+def calendar_features(df, date_col) -> pd.DataFrame:
+    """
+    Calendar side table of a dataset, computed once per dataset and
+    date column and reused across reruns and pages.
+    """
+    if df is None or df.empty or not date_col or date_col not in df.columns:
+        return pd.DataFrame(columns=["Year", "Month", "MonthName"])
+
+    version = dataset_version(df)
+    if version is None:
+        return build_calendar(df[date_col])
+
+    key = (version, date_col)
+    calendar = _CALENDARS.get(key)
+
+    if calendar is None:
+        calendar = build_calendar(df[date_col])
+        _CALENDARS[key] = calendar
+        while len(_CALENDARS) > MAX_CACHED_CALENDARS:
+            _CALENDARS.popitem(last=False)
+
+    _CALENDARS.move_to_end(key)
+    return calendar
+
 
 def preprocess(df, date_col):
     """
     Standard preprocessing used across dashboards.
     Safely handles missing or invalid date columns.
+
+    Returns a shallow view of the dataset with the cached calendar
+    columns attached; the base columns are shared, not copied. Rows
+    without a valid date are kept (with missing calendar values, so
+    date groupings leave them out) and the view keeps the dataset's
+    version, so the cube and other per-dataset caches still apply.
     """
 
     if df is None or df.empty:
@@ -14,20 +92,21 @@ def preprocess(df, date_col):
         # Fail silently but safely (do not crash dashboards)
         return df
 
-    df = df.copy()
+    calendar = calendar_features(df, date_col)
 
-    # Convert date column safely
-    df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
+    # Convert date column safely (no-op when parsed at ingestion)
+    dates = ensure_datetime(df[date_col])
 
-    # Drop rows where date conversion failed
-    df = df.dropna(subset=[date_col])
+    version = dataset_version(df)
+    df = df.copy(deep=False)
+    register_version(df, version)
 
-    if df.empty:
-        return df
+    if not is_datetime(df[date_col]):
+        df[date_col] = dates.to_numpy()
 
     # Date features
-    df["Year"] = df[date_col].dt.year
-    df["Month"] = df[date_col].dt.month
-    df["MonthName"] = df[date_col].dt.strftime("%b")
+    df["Year"] = calendar["Year"].array
+    df["Month"] = calendar["Month"].array
+    df["MonthName"] = calendar["MonthName"].array
 
     return df
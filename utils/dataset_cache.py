@@ -0,0 +1,147 @@
+# utils/dataset_cache.py
+
+import hashlib
+import os
+
+import pandas as pd
+
+from config import (
+    DATASET_CACHE_DIR,
+    DATASET_CACHE_MAX_BYTES,
+    ENABLE_DATASET_CACHE
+)
+
+# Bump when the parse pipeline changes so stale cache files are ignored
+CACHE_VERSION = 3
+
+HASH_CHUNK_BYTES = 8 * 1024 * 1024
+
+
+def cache_available() -> bool:
+    """True when the Parquet cache is enabled and pyarrow is installed."""
+    if not ENABLE_DATASET_CACHE:
+        return False
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+
+    return True
+
+
+def file_fingerprint(file, *options) -> str:
+    """
+    Content hash of an uploaded file.
+    Extra options (e.g. parse settings) are folded into the key.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+
+    if hasattr(file, "getbuffer"):
+        # Streamlit uploads are BytesIO: hash the buffer without copying it
+        buffer = file.getbuffer()
+        for start in range(0, len(buffer), HASH_CHUNK_BYTES):
+            digest.update(buffer[start:start + HASH_CHUNK_BYTES])
+        buffer.release()
+    else:
+        file.seek(0)
+        while True:
+            chunk = file.read(HASH_CHUNK_BYTES)
+            if not chunk:
+                break
+            digest.update(chunk)
+        file.seek(0)
+
+    digest.update(f"v{CACHE_VERSION}".encode())
+    for option in options:
+        digest.update(repr(option).encode())
+
+    return digest.hexdigest()
+
+
+def _cache_path(key: str) -> str:
+    return os.path.join(DATASET_CACHE_DIR, f"{key}.parquet")
+
+
+def load_cached(key: str):
+    """
+    Return the cached DataFrame for a key, or None on a miss.
+    A hit refreshes the entry's position in the LRU order.
+    """
+    path = _cache_path(key)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        df = pd.read_parquet(path)
+    except Exception:
+        # Corrupted / partially written entry: drop it and re-parse
+        _remove(path)
+        return None
+
+    os.utime(path, None)
+    return df
+
+
+def store_cached(key: str, df: pd.DataFrame) -> bool:
+    """
+    Persist a parsed DataFrame as Parquet and enforce the size budget.
+    Returns False (without raising) when the frame cannot be cached,
+    e.g. mixed-type object columns that Arrow cannot represent.
+    """
+    if df is None or df.empty:
+        return False
+
+    os.makedirs(DATASET_CACHE_DIR, exist_ok=True)
+
+    path = _cache_path(key)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+
+    try:
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except Exception:
+        _remove(tmp_path)
+        return False
+
+    evict_lru()
+    return True
+
+
+def evict_lru(max_bytes: int = DATASET_CACHE_MAX_BYTES) -> int:
+    """
+    Delete least recently used cache files until the cache fits max_bytes.
+    Returns the number of files removed.
+    """
+    if not os.path.isdir(DATASET_CACHE_DIR):
+        return 0
+
+    entries = []
+    for name in os.listdir(DATASET_CACHE_DIR):
+        if not name.endswith(".parquet"):
+            continue
+        path = os.path.join(DATASET_CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        _remove(path)
+        total -= size
+        removed += 1
+
+    return removed
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,159 @@
+# utils/dataset_merge.py
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype, union_categoricals
+
+from utils.column_detector import detect_column
+
+
+def line_key_columns(df: pd.DataFrame):
+    """
+    ORDER_ID plus a line number column identifying one order line, or
+    None when the extract does not have both.
+    """
+    cols = df.columns.tolist()
+    order_col = detect_column(cols, ["order_id", "order_no", "invoice_no"])
+    line_col = detect_column(cols, ["line_id", "line_no", "line_number", "order_line"])
+    if order_col is None or line_col is None:
+        return None
+    return [order_col, line_col]
+
+
+def dedup_key_columns(df: pd.DataFrame) -> list:
+    """
+    Columns identifying one order line (see line_key_columns). Without
+    a line number nothing else identifies a line (an order may have
+    several lines of one SKU), so every column is part of the key and
+    only identical lines are de-duplicated.
+    """
+    return line_key_columns(df) or df.columns.tolist()
+
+
+def _key_frame(df: pd.DataFrame, key_cols: list) -> pd.DataFrame:
+    """
+    Key columns with numeric ids (plain or categorical) widened to
+    float64, so the same id read as int32, int64 or float hashes alike.
+    """
+    keys = {}
+    for col in key_cols:
+        series = df[col]
+        values = series.cat.categories if isinstance(series.dtype, pd.CategoricalDtype) else series
+        if is_numeric_dtype(values) and not is_bool_dtype(values):
+            series = pd.Series(
+                series.to_numpy(dtype=np.float64, na_value=np.nan),
+                index=series.index
+            )
+        keys[col] = series
+    return pd.DataFrame(keys, copy=False)
+
+
+def row_hashes(df: pd.DataFrame, key_cols: list) -> np.ndarray:
+    """
+    64-bit hash per row over the key columns. Categorical and plain
+    string columns holding the same values hash identically, as do
+    numeric ids of any width.
+    """
+    return pd.util.hash_pandas_object(_key_frame(df, key_cols), index=False).to_numpy()
+
+
+def build_row_index(df: pd.DataFrame, key_cols: list) -> pd.Index:
+    """Hash index aligned with the rows of df (position i -> row i)."""
+    return pd.Index(row_hashes(df, key_cols))
+
+
+def concat_frames(frames: list) -> pd.DataFrame:
+    """
+    Concatenate frames, keeping categorical columns categorical by
+    merging their categories instead of falling back to object.
+    """
+    frames = [frame for frame in frames if frame is not None and not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+
+    columns = list(dict.fromkeys(col for frame in frames for col in frame.columns))
+    merged = {}
+
+    for col in columns:
+        pieces = [
+            frame[col] if col in frame.columns
+            else pd.Series(np.nan, index=frame.index, name=col)
+            for frame in frames
+        ]
+
+        merged[col] = _concat_column(pieces, col)
+
+    return pd.DataFrame(merged, copy=False)
+
+
+def _concat_column(pieces: list, name) -> pd.Series:
+    if any(isinstance(piece.dtype, pd.CategoricalDtype) for piece in pieces):
+        try:
+            categoricals = [piece.astype("category") for piece in pieces]
+            return pd.Series(
+                union_categoricals(categoricals, ignore_order=True),
+                name=name
+            )
+        except TypeError:
+            # Category dtypes differ (e.g. an all-missing piece): plain concat
+            pass
+
+    return pd.concat(pieces, ignore_index=True)
+
+
+def append_deltas(
+    base: pd.DataFrame,
+    delta: pd.DataFrame,
+    key_cols: list = None,
+    base_index: pd.Index = None
+):
+    """
+    Append a delta extract to an existing dataset, de-duplicated on the
+    order-line key (see dedup_key_columns). New rows win: every base row
+    whose key appears in the delta is replaced by the delta's rows with
+    that key (e.g. an order line whose state changed since). Rows within
+    the delta are kept as-is.
+
+    Duplicates are found through a hash index of the base keys, so only
+    the delta is hashed and nothing is re-sorted. Pass the index returned
+    by the previous call as base_index to skip re-hashing the base.
+
+    Returns (merged_df, merged_index, report).
+    """
+
+    if key_cols is None:
+        key_cols = dedup_key_columns(base if base is not None and not base.empty else delta)
+
+    if base is None or base.empty:
+        base = delta.iloc[:0]
+        base_index = pd.Index(np.array([], dtype=np.uint64))
+
+    if base_index is None or len(base_index) != len(base):
+        base_index = build_row_index(base, key_cols)
+
+    delta_hashes = row_hashes(delta, key_cols)
+
+    keep_base = ~base_index.isin(delta_hashes)
+    replaced = int(len(base) - keep_base.sum())
+
+    kept = base[keep_base] if replaced else base
+    merged = concat_frames([kept, delta])
+    if not isinstance(merged.index, pd.RangeIndex):
+        merged = merged.reset_index(drop=True)
+    merged_index = pd.Index(
+        np.concatenate([base_index.to_numpy()[keep_base], delta_hashes])
+    )
+
+    report = {
+        "base_rows": int(len(base)),
+        "delta_rows": int(len(delta_hashes)),
+        "replaced_rows": replaced,
+        "added_rows": int(len(merged) - len(base)),
+        "total_rows": int(len(merged)),
+        "key_columns": key_cols,
+        "line_key": line_key_columns(delta) == key_cols
+    }
+
+    return merged, merged_index, report
@@ -0,0 +1,97 @@
+# utils/dataset_view.py
+
+import numpy as np
+import pandas as pd
+
+
+class DatasetView:
+    """
+    Read-only, copy-on-write handle over the session dataset.
+
+    Base columns are never copied or mutated: assigning a column stores
+    it in an overlay that shadows the base, and row filters keep an
+    array of positions that is only applied to the columns actually
+    read. Memory per rerun therefore scales with the derived columns
+    and the columns touched, not with the whole table.
+    """
+
+    def __init__(self, base: pd.DataFrame, positions=None, overlay=None):
+        self._base = base
+        self._positions = positions
+        self._overlay = dict(overlay or {})
+        self._cache = {}
+
+    # ---------------- Shape ----------------
+    @property
+    def columns(self) -> list:
+        cols = list(self._base.columns)
+        cols.extend(col for col in self._overlay if col not in self._base.columns)
+        return cols
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    def __len__(self) -> int:
+        if self._positions is None:
+            return len(self._base)
+        return len(self._positions)
+
+    def __contains__(self, col) -> bool:
+        return col in self._overlay or col in self._base.columns
+
+    # ---------------- Columns ----------------
+    def __getitem__(self, col) -> pd.Series:
+        if col in self._overlay:
+            return self._overlay[col]
+
+        series = self._cache.get(col)
+        if series is None:
+            series = self._base[col]
+            if self._positions is not None:
+                series = series.take(self._positions)
+            self._cache[col] = series
+        return series
+
+    def __setitem__(self, col, values):
+        """Store a derived column in the overlay; the base is untouched."""
+        if col in self and values is self[col]:
+            return
+        if isinstance(values, pd.Series):
+            values = values.set_axis(self.index)
+        else:
+            values = pd.Series(values, index=self.index, name=col)
+        self._overlay[col] = values.rename(col)
+
+    @property
+    def index(self) -> pd.Index:
+        if self._positions is None:
+            return self._base.index
+        return self._base.index.take(self._positions)
+
+    # ---------------- Rows ----------------
+    def where(self, mask) -> "DatasetView":
+        """New view keeping the rows where mask is True."""
+        keep = np.flatnonzero(np.asarray(mask, dtype=bool))
+        if len(keep) == len(self):
+            return self
+
+        positions = keep if self._positions is None else self._positions[keep]
+        overlay = {col: series.iloc[keep] for col, series in self._overlay.items()}
+        return DatasetView(self._base, positions, overlay)
+
+    def dropna(self, subset: list) -> "DatasetView":
+        """New view without the rows missing any of the subset columns."""
+        mask = np.ones(len(self), dtype=bool)
+        for col in subset:
+            mask &= self[col].notna().to_numpy()
+        return self.where(mask)
+
+    # ---------------- Materialization ----------------
+    def frame(self, cols: list = None) -> pd.DataFrame:
+        """
+        DataFrame of the requested columns only (all by default), built
+        from the existing column arrays without copying them.
+        """
+        cols = self.columns if cols is None else cols
+        return pd.DataFrame({col: self[col] for col in cols}, copy=False)
@@ -0,0 +1,84 @@
+# utils/date_layout.py
+
+import numpy as np
+import pandas as pd
+
+from config import ZONE_MAP_CHUNK_ROWS
+from utils.date_parsing import ensure_datetime, is_datetime
+
+
+def _sort_keys(dates: pd.Series) -> np.ndarray:
+    """int64 sort keys of a datetime column with NaT mapped last."""
+    keys = ensure_datetime(dates).to_numpy().view("int64").copy()
+    keys[keys == np.iinfo(np.int64).min] = np.iinfo(np.int64).max
+    return keys
+
+
+def sort_by_date(df: pd.DataFrame, date_col: str):
+    """
+    Physically order a dataset by date (stable, NaT last) so date
+    windows become contiguous row ranges.
+
+    Returns (sorted_df, order) where order maps new positions to old
+    ones, or (df, None) when the frame is already sorted or has no
+    parsed date column.
+    """
+    if df is None or df.empty or not date_col or date_col not in df.columns:
+        return df, None
+    if not is_datetime(df[date_col]):
+        return df, None
+
+    keys = _sort_keys(df[date_col])
+    if (keys[1:] >= keys[:-1]).all():
+        return df, None
+
+    order = np.argsort(keys, kind="stable")
+    return df.take(order).reset_index(drop=True), order
+
+
+class ZoneMap:
+    """
+    Per-chunk min/max of an integer column (e.g. day codes).
+
+    A range query only inspects chunks whose [min, max] overlaps the
+    range; chunks entirely inside it are taken whole without looking at
+    their rows, and the rest are skipped.
+    """
+
+    def __init__(self, values: np.ndarray, chunk_rows: int = ZONE_MAP_CHUNK_ROWS, null_value=None):
+        self.values = values
+        self.chunk_rows = chunk_rows
+
+        n_chunks = -(-len(values) // chunk_rows) if len(values) else 0
+        self.mins = np.empty(n_chunks, dtype=np.int64)
+        self.maxs = np.empty(n_chunks, dtype=np.int64)
+
+        for chunk in range(n_chunks):
+            block = values[chunk * chunk_rows:(chunk + 1) * chunk_rows]
+            if null_value is not None:
+                block = block[block != null_value]
+            if len(block):
+                self.mins[chunk], self.maxs[chunk] = block.min(), block.max()
+            else:
+                # All-null chunk: never overlaps a range
+                self.mins[chunk] = np.iinfo(np.int64).max
+                self.maxs[chunk] = np.iinfo(np.int64).min
+
+    def positions(self, lo: int, hi: int) -> np.ndarray:
+        """Sorted row positions with lo <= value < hi."""
+        overlapping = np.flatnonzero((self.maxs >= lo) & (self.mins < hi))
+        if not len(overlapping):
+            return np.empty(0, dtype=np.int64)
+
+        inside = (self.mins[overlapping] >= lo) & (self.maxs[overlapping] < hi)
+
+        parts = []
+        for chunk, whole in zip(overlapping, inside):
+            start = chunk * self.chunk_rows
+            block = self.values[start:start + self.chunk_rows]
+            if whole:
+                parts.append(np.arange(start, start + len(block)))
+            else:
+                parts.append(start + np.flatnonzero((block >= lo) & (block < hi)))
+
+        return np.concatenate(parts)
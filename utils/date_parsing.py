@@ -0,0 +1,158 @@
+# utils/date_parsing.py
+
+import warnings
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+from config import CORE_COLUMNS, DATE_MIN_PARSE_RATIO, DATE_SAMPLE_SIZE
+from utils.column_detector import detect_roles
+
+
+def is_datetime(series: pd.Series) -> bool:
+    return pd.api.types.is_datetime64_any_dtype(series)
+
+
+def _sample(values: pd.Index, size: int = DATE_SAMPLE_SIZE) -> pd.Index:
+    values = values.dropna()
+    if len(values) <= size:
+        return values
+    positions = np.linspace(0, len(values) - 1, size).astype(int)
+    return values[positions]
+
+
+def _parse_ratio(sample: pd.Index, fmt) -> float:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        parsed = pd.to_datetime(sample, format=fmt, errors="coerce")
+    return float(parsed.notna().mean()) if len(sample) else 0.0
+
+
+def infer_date_format(values: pd.Index):
+    """
+    Pick the strftime format that parses the most of a sample of values.
+    Month-first and day-first guesses are both tried; on a tie the
+    month-first one wins, matching plain pd.to_datetime.
+    Returns (format or None, share of the sample parsed).
+    """
+    sample = _sample(pd.Index(values).astype(str))
+    if len(sample) == 0:
+        return None, 0.0
+
+    candidates = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for value in sample[:20]:
+            for dayfirst in (False, True):
+                fmt = guess_datetime_format(value, dayfirst=dayfirst)
+                if fmt and fmt not in candidates:
+                    candidates.append(fmt)
+
+    best_fmt, best_ratio = None, 0.0
+    for fmt in candidates:
+        ratio = _parse_ratio(sample, fmt)
+        if ratio > best_ratio:
+            best_fmt, best_ratio = fmt, ratio
+
+    if best_fmt is None:
+        best_ratio = _parse_ratio(sample, None)
+
+    return best_fmt, best_ratio
+
+
+def _parse_dates(series: pd.Series, min_ratio: float):
+    """
+    parse_dates_fast plus the number of non-blank values that did not
+    parse (0 when the series is returned unchanged).
+    """
+    if is_datetime(series):
+        return series, 0
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        uniques = series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series)
+
+    fmt, ratio = infer_date_format(uniques)
+    if ratio < min_ratio:
+        return series, 0
+
+    text = uniques.astype(str)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        parsed = pd.to_datetime(text, format=fmt, errors="coerce")
+
+    # Missing values carry code -1, which take() fills with NaT
+    values = parsed.take(codes, allow_fill=True, fill_value=pd.NaT)
+
+    failed = np.flatnonzero(parsed.isna() & (text.str.strip() != ""))
+    failures = int(np.isin(codes, failed).sum()) if len(failed) else 0
+
+    return pd.Series(values, index=series.index, name=series.name), failures
+
+
+def parse_dates_fast(series: pd.Series, min_ratio: float = 0.0) -> pd.Series:
+    """
+    Convert a column of date strings to datetime64.
+
+    Dates repeat millions of times, so only the distinct values are
+    parsed (with a format inferred from a sample) and the result is
+    mapped back through the factorized codes. Unparseable values become
+    NaT, as with pd.to_datetime(errors="coerce").
+    Returns the series unchanged if less than min_ratio of the sample
+    looks like dates.
+    """
+    return _parse_dates(series, min_ratio)[0]
+
+
+def ensure_datetime(series: pd.Series) -> pd.Series:
+    """
+    Datetime view of a column: returned as-is when ingestion already
+    parsed it, otherwise parsed via parse_dates_fast.
+    """
+    if is_datetime(series):
+        return series
+    return parse_dates_fast(series)
+
+
+def date_columns(df: pd.DataFrame) -> list:
+    """
+    Columns to parse at ingestion: the detected date role, ORDER_DATE,
+    and any other column whose name mentions 'date'.
+    """
+    cols = df.columns.tolist()
+    wanted = {detect_roles(cols)["date"]}
+    wanted.update(col for col in CORE_COLUMNS if "DATE" in col)
+
+    return [
+        col for col in cols
+        if isinstance(col, str)
+        and (col in wanted or "date" in col.lower())
+        and not is_datetime(df[col])
+        and not pd.api.types.is_numeric_dtype(df[col])
+    ]
+
+
+def parse_date_columns(df: pd.DataFrame, min_ratio: float = DATE_MIN_PARSE_RATIO) -> pd.DataFrame:
+    """
+    Parse every date column of a freshly ingested frame in place and
+    return it. Columns where fewer than min_ratio of sampled values look
+    like dates are left untouched.
+
+    Values of a parsed column that do not match its format become NaT;
+    their count per column is kept in df.attrs["date_parse_failures"]
+    (which the Parquet cache preserves) so the upload can report them.
+    """
+    if df is None or df.empty:
+        return df
+
+    failures = {}
+    for col in date_columns(df):
+        df[col], failed = _parse_dates(df[col], min_ratio)
+        if failed:
+            failures[col] = failed
+
+    df.attrs["date_parse_failures"] = failures
+    return df
@@ -0,0 +1,258 @@
+# utils/excel_ingest.py
+
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from itertools import islice
+
+import pandas as pd
+
+from config import EXCEL_BLOCK_ROWS, EXCEL_MAX_WORKERS, EXCEL_SHEET_COLUMN
+from utils.column_detector import projection_columns
+from utils.csv_streaming import ColumnBuilder
+
+
+def calamine_available() -> bool:
+    """True when the Rust-based calamine reader is installed."""
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _is_xls(name: str) -> bool:
+    return name.lower().endswith(".xls")
+
+
+def _file_buffer(file) -> memoryview:
+    """
+    Read-only view of an upload's bytes: in-memory uploads are shared,
+    not copied; other files are read once. Callers release() the view
+    when done, or an in-memory upload stays locked against resizing.
+    """
+    if hasattr(file, "getbuffer"):
+        return file.getbuffer().toreadonly()
+    file.seek(0)
+    data = file.read()
+    file.seek(0)
+    return memoryview(data)
+
+
+class _BufferReader(io.RawIOBase):
+    """
+    Seekable file over a shared buffer. Each reader keeps its own
+    position, so several sheets can be parsed from one upload at once
+    without copying it.
+    """
+
+    def __init__(self, buffer: memoryview):
+        self._buffer = buffer
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        chunk = self._buffer[self._position:self._position + len(target)]
+        target[:len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self._position, os.SEEK_END: len(self._buffer)}[whence]
+        self._position = max(base + offset, 0)
+        return self._position
+
+
+def list_sheets(file) -> list:
+    """
+    Sheet names of an Excel upload, read without loading any cell data.
+    """
+    data = _file_buffer(file)
+    try:
+        if calamine_available():
+            from python_calamine import CalamineWorkbook
+            return CalamineWorkbook.from_filelike(_BufferReader(data)).sheet_names
+
+        if _is_xls(file.name):
+            import xlrd
+            # xlrd only parses from bytes; legacy .xls files are small
+            return xlrd.open_workbook(file_contents=data.tobytes(), on_demand=True).sheet_names()
+
+        from openpyxl import load_workbook
+        workbook = load_workbook(_BufferReader(data), read_only=True)
+        try:
+            return workbook.sheetnames
+        finally:
+            workbook.close()
+    finally:
+        data.release()
+
+
+def _rows_to_frame(rows, project: bool = False) -> pd.DataFrame:
+    """
+    Header row + value rows (tuples) -> DataFrame, converted
+    EXCEL_BLOCK_ROWS rows at a time into column builders so the rows
+    are never all held as tuples. Fully empty rows are dropped.
+    project=True keeps only the dashboard columns while streaming.
+    """
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame()
+
+    columns = [
+        str(name) if name is not None else f"Unnamed: {i}"
+        for i, name in enumerate(header)
+    ]
+
+    keep = projection_columns(columns) if project else []
+    if keep:
+        positions = [columns.index(col) for col in keep]
+        rows = ([row[i] for i in positions] for row in rows)
+        columns = keep
+
+    builders = {col: ColumnBuilder(EXCEL_BLOCK_ROWS) for col in columns}
+    filled = False
+    while True:
+        block = list(islice(rows, EXCEL_BLOCK_ROWS))
+        if not block:
+            break
+        frame = pd.DataFrame.from_records(block, columns=columns).dropna(how="all")
+        del block
+        if frame.empty:
+            continue
+        for col, builder in builders.items():
+            builder.append(frame[col])
+        filled = True
+
+    if not filled:
+        return pd.DataFrame(columns=columns)
+
+    return pd.DataFrame(
+        {col: builder.series(col) for col, builder in builders.items()},
+        columns=columns
+    )
+
+
+def _read_sheet_openpyxl(data: memoryview, sheet: str, project: bool = False) -> pd.DataFrame:
+    """
+    Stream one sheet in openpyxl read-only mode: rows come straight out
+    of the XML as value tuples, no cell objects or styles are built.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(
+        _BufferReader(data),
+        read_only=True,
+        data_only=True,
+        keep_links=False
+    )
+    try:
+        return _rows_to_frame(workbook[sheet].iter_rows(values_only=True), project)
+    finally:
+        workbook.close()
+
+
+def _calamine_cell(value):
+    """Calamine cell -> the value pandas' calamine reader would give."""
+    if value == "":
+        return None
+    if type(value) is date:
+        return datetime(value.year, value.month, value.day)
+    return value
+
+
+def _read_sheet_calamine(data: memoryview, sheet: str, project: bool = False) -> pd.DataFrame:
+    """
+    Parse one sheet with calamine in a single pass: the header row
+    resolves the projection and the remaining rows stream into column
+    builders, instead of a header read followed by a full read_excel.
+    """
+    from python_calamine import CalamineWorkbook
+
+    workbook = CalamineWorkbook.from_filelike(_BufferReader(data))
+    try:
+        rows = workbook.get_sheet_by_name(sheet).iter_rows()
+        return _rows_to_frame(([_calamine_cell(value) for value in row] for row in rows), project)
+    finally:
+        workbook.close()
+
+
+def read_sheet(
+    data: memoryview,
+    sheet: str,
+    xls: bool = False,
+    project: bool = False
+) -> pd.DataFrame:
+    """
+    Parse a single sheet with the fastest engine available:
+    calamine, then xlrd for legacy .xls, then streaming openpyxl.
+    Fully empty rows are dropped whichever engine reads the sheet.
+    project=True reads only the columns resolved from the sheet header.
+    """
+    if calamine_available():
+        return _read_sheet_calamine(data, sheet, project)
+
+    if not xls:
+        return _read_sheet_openpyxl(data, sheet, project)
+
+    # Legacy .xls (at most 65,536 rows): the header is read first to
+    # resolve the projection
+    usecols = None
+    if project:
+        header = pd.read_excel(_BufferReader(data), sheet_name=sheet, engine="xlrd", nrows=0)
+        usecols = projection_columns(header.columns.tolist()) or None
+
+    df = pd.read_excel(
+        _BufferReader(data),
+        sheet_name=sheet,
+        engine="xlrd",
+        usecols=usecols
+    )
+    return df.dropna(how="all").reset_index(drop=True)
+
+
+def read_excel_fast(
+    file,
+    sheets=None,
+    project: bool = False,
+    max_workers: int = EXCEL_MAX_WORKERS
+) -> pd.DataFrame:
+    """
+    Read one or several sheets of an Excel upload into a single frame.
+
+    sheets=None reads the first sheet. Several sheets are parsed in
+    parallel (each worker opens its own workbook) and concatenated;
+    the source sheet is kept in EXCEL_SHEET_COLUMN.
+    project=True keeps only the dashboard columns (see projection_columns).
+    """
+    xls = _is_xls(file.name)
+
+    if not sheets:
+        sheets = list_sheets(file)[:1]
+
+    data = _file_buffer(file)
+    try:
+        if len(sheets) == 1:
+            return read_sheet(data, sheets[0], xls, project)
+
+        workers = max(1, min(max_workers, len(sheets)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            frames = list(pool.map(lambda sheet: read_sheet(data, sheet, xls, project), sheets))
+    finally:
+        data.release()
+
+    for sheet, frame in zip(sheets, frames):
+        frame[EXCEL_SHEET_COLUMN] = sheet
+
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+
+    return pd.concat(frames, ignore_index=True)
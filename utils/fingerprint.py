@@ -0,0 +1,44 @@
+# utils/fingerprint.py
+#
+# Datasets are identified by a version token issued when they are
+# published, not by hashing (part of) their content: a sampled hash
+# cannot tell apart frames that differ in unsampled rows.
+
+import uuid
+import weakref
+
+import pandas as pd
+
+# id(df) -> dataset version token, dropped when the frame is freed
+_versions = {}
+
+
+def new_version() -> str:
+    """Fresh dataset version token, issued on every publish."""
+    return uuid.uuid4().hex
+
+
+def register_version(df: pd.DataFrame, version: str):
+    """
+    Attach a version token (see new_version) to a published dataset,
+    or to a view of it. Per-dataset caches key on this token, so
+    a registered frame must not be modified afterwards: changed data is
+    published again and gets a new token.
+    """
+    if df is None or not version:
+        return
+    key = id(df)
+    if key not in _versions:
+        weakref.finalize(df, _versions.pop, key, None)
+    _versions[key] = version
+
+
+def dataset_version(df: pd.DataFrame):
+    """
+    Version token of a published dataset (or of a view sharing its
+    rows), or None for any other frame. Results computed from frames
+    without a version are not cached.
+    """
+    if df is None:
+        return None
+    return _versions.get(id(df))
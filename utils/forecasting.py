@@ -3,10 +3,12 @@ import pandas as pd
 import numpy as np
 from sklearn.linear_model import LinearRegression
 
+from utils.date_parsing import ensure_datetime
+
 
 def prepare_time_series(df, date_col, sales_col, freq="M"):
     df = df[[date_col, sales_col]].copy()
-    df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
+    df[date_col] = ensure_datetime(df[date_col])
     df = df.dropna()
 
     ts = (
@@ -0,0 +1,120 @@
+# utils/hll.py
+
+import numpy as np
+import pandas as pd
+
+from config import HLL_MERGE_BLOCK_BYTES, HLL_PRECISION
+
+
+def hash_values(values) -> np.ndarray:
+    """Stable 64-bit hashes of any array of ids."""
+    return pd.util.hash_array(np.asarray(values))
+
+
+def _leading_zeros(words: np.ndarray) -> np.ndarray:
+    """Leading zero bits of uint64 words (64 for zero), exact."""
+    high = (words >> np.uint64(32)).astype(np.float64)
+    low = (words & np.uint64(0xFFFFFFFF)).astype(np.float64)
+
+    # Both halves are below 2**32, so float64 log2 is exact enough to floor
+    with np.errstate(divide="ignore"):
+        zeros = np.where(
+            high > 0,
+            31 - np.floor(np.log2(high)),
+            np.where(low > 0, 63 - np.floor(np.log2(low)), 64)
+        )
+    return zeros.astype(np.uint8)
+
+
+def registers_of(hashes: np.ndarray, precision: int = HLL_PRECISION):
+    """Register index and rank (position of the first 1 bit) per hash."""
+    hashes = hashes.astype(np.uint64, copy=False)
+    index = (hashes >> np.uint64(64 - precision)).astype(np.uint16)
+    rest = hashes << np.uint64(precision)
+    rank = np.minimum(_leading_zeros(rest), 64 - precision) + 1
+    return index, rank.astype(np.uint8)
+
+
+def estimate(registers: np.ndarray) -> np.ndarray:
+    """
+    Cardinality estimates of HyperLogLog register rows (shape
+    [sketches, m]), with the small-range (linear counting) correction.
+    """
+    registers = np.atleast_2d(registers)
+    m = registers.shape[1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+
+    raw = alpha * m * m / np.exp2(-registers.astype(np.float64)).sum(axis=1)
+    empty = (registers == 0).sum(axis=1)
+
+    with np.errstate(divide="ignore"):
+        linear = m * np.log(m / np.maximum(empty, 1))
+    return np.where((raw <= 2.5 * m) & (empty > 0), linear, raw)
+
+
+def relative_error(precision: int = HLL_PRECISION) -> float:
+    """Standard error of a HyperLogLog estimate (1.04 / sqrt(m))."""
+    return 1.04 / np.sqrt(2 ** precision)
+
+
+class CellSketches:
+    """
+    HyperLogLog sketches of distinct ids for many cells at once
+    (e.g. day x city x warehouse x brand), stored sparsely as the
+    (cell, register, rank) entries actually set.
+
+    Sketches are mergeable: any grouping of cells (after any filter)
+    is answered by taking the register-wise max of its cells.
+    """
+
+    def __init__(self, cell_ids: np.ndarray, hashes: np.ndarray, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.m = 2 ** precision
+
+        index, rank = registers_of(hashes, precision)
+        keys = cell_ids.astype(np.int64) * self.m + index
+
+        best = pd.Series(rank).groupby(keys, sort=True).max()
+        entry_keys = best.index.to_numpy()
+
+        self.cells = entry_keys // self.m
+        self.index = (entry_keys % self.m).astype(np.uint16)
+        self.rank = best.to_numpy().astype(np.uint8)
+
+    @property
+    def error(self) -> float:
+        return relative_error(self.precision)
+
+    def estimate(self, groups: np.ndarray, n_groups: int) -> np.ndarray:
+        """
+        Distinct count per group, where groups maps every cell to a
+        group id (or -1 to leave the cell out).
+
+        Dense registers are only built for the groups that have entries
+        (ids may span a much larger key space), a block of at most
+        HLL_MERGE_BLOCK_BYTES at a time.
+        """
+        entry_groups = groups[self.cells]
+        entries = np.flatnonzero(entry_groups >= 0)
+        out = np.zeros(n_groups)
+        if not len(entries):
+            return out
+
+        present, compact = np.unique(entry_groups[entries], return_inverse=True)
+        order = np.argsort(compact, kind="stable")
+        compact, entries = compact[order], entries[order]
+
+        block = max(1, HLL_MERGE_BLOCK_BYTES // self.m)
+        for start in range(0, len(present), block):
+            stop = min(start + block, len(present))
+            lo, hi = np.searchsorted(compact, [start, stop])
+
+            registers = np.zeros((stop - start, self.m), dtype=np.uint8)
+            np.maximum.at(
+                registers,
+                (compact[lo:hi] - start, self.index[entries[lo:hi]]),
+                self.rank[entries[lo:hi]]
+            )
+            out[present[start:stop]] = estimate(registers)
+
+        return out
@@ -0,0 +1,175 @@
+# utils/kpi_engine.py
+
+import numpy as np
+import pandas as pd
+
+from utils.agg_cache import cached_aggregate
+from utils.cube import get_cube
+from utils.date_parsing import ensure_datetime, is_datetime
+from utils.schema import get_schema
+
+# KPI name -> column roles it reads
+KPIS = {
+    "total_sales": ["sales"],
+    "avg_line_value": ["sales"],
+    "total_quantity": ["quantity"],
+    "lines": [],
+    "orders": ["order_id"],
+    "aov": ["sales", "order_id"],
+    "date_min": ["date"],
+    "date_max": ["date"],
+    "active_days": ["date"],
+    "avg_daily_sales": ["sales", "date"],
+    "best_day_sales": ["sales", "date"]
+}
+
+# Headline KPIs computed together, so separate wrapper calls share one pass
+STANDARD_KPIS = [
+    "total_sales", "avg_line_value", "total_quantity", "lines",
+    "orders", "aov", "date_min", "date_max"
+]
+
+
+def _buffer(df: pd.DataFrame, col: str) -> np.ndarray:
+    """Contiguous float64 buffer of a numeric column (missing -> 0)."""
+    values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.ascontiguousarray(np.nan_to_num(values))
+
+
+def _order_codes(df: pd.DataFrame, order_col: str) -> np.ndarray:
+    """Order code per row (-1 when missing), reusing the cube's codes."""
+    cube = get_cube(df, build=False)
+    factorized = cube.order_codes() if cube is not None else None
+    if factorized is not None and len(factorized[0]) == len(df):
+        return factorized[0]
+    return pd.factorize(df[order_col])[0]
+
+
+def _compute(df: pd.DataFrame, kpis: list, cols: dict) -> dict:
+    """Every requested KPI, reading each needed column buffer once."""
+    out = {}
+    sales = _buffer(df, cols["sales"]) if cols.get("sales") else None
+
+    if "lines" in kpis:
+        out["lines"] = len(df)
+    if "total_sales" in kpis:
+        out["total_sales"] = float(sales.sum())
+    if "avg_line_value" in kpis:
+        out["avg_line_value"] = float(sales.mean()) if len(sales) else 0.0
+    if "total_quantity" in kpis:
+        out["total_quantity"] = float(_buffer(df, cols["quantity"]).sum())
+
+    if {"orders", "aov"} & set(kpis):
+        codes = _order_codes(df, cols["order_id"])
+        valid = codes >= 0
+        orders = int(np.count_nonzero(np.bincount(codes[valid]))) if valid.any() else 0
+        out["orders"] = orders
+        if "aov" in kpis:
+            out["aov"] = float(sales[valid].sum() / orders) if orders else 0.0
+
+    date_kpis = {"date_min", "date_max", "active_days", "avg_daily_sales", "best_day_sales"}
+    if date_kpis & set(kpis):
+        dates = df[cols["date"]]
+        if dates.dt.tz is not None:
+            dates = dates.dt.tz_localize(None)
+        days = dates.to_numpy().astype("datetime64[D]")
+        valid = ~np.isnat(days)
+        day_numbers = days[valid].view("int64")
+
+        if len(day_numbers):
+            first, last = day_numbers.min(), day_numbers.max()
+            out["date_min"] = pd.Timestamp(np.datetime64(int(first), "D"))
+            out["date_max"] = pd.Timestamp(np.datetime64(int(last), "D"))
+
+            # Daily totals from one bincount over day offsets
+            offsets = day_numbers - first
+            active = np.bincount(offsets, minlength=last - first + 1) > 0
+            out["active_days"] = int(active.sum())
+
+            if sales is not None:
+                daily = np.bincount(offsets, weights=sales[valid], minlength=last - first + 1)[active]
+                out["avg_daily_sales"] = float(daily.mean())
+                out["best_day_sales"] = float(daily.max())
+        else:
+            out.update({"date_min": None, "date_max": None, "active_days": 0,
+                        "avg_daily_sales": 0.0, "best_day_sales": 0.0})
+
+    return {kpi: out[kpi] for kpi in kpis if kpi in out}
+
+
+def _filter_rows(df: pd.DataFrame, where: dict) -> pd.DataFrame:
+    """
+    Rows of df matching {column: labels} filters (a (start, end) tuple
+    on a date column is an inclusive day range), selected through the
+    cube's row index when it covers every filtered column.
+    """
+    if not where:
+        return df
+
+    cube = get_cube(df)
+    if cube is not None and cube.has(list(where), exact_dates=False):
+        rows = cube.select_rows(where)
+        return df if rows is None else df.iloc[rows]
+
+    for col, wanted in where.items():
+        if isinstance(wanted, tuple) and is_datetime(df[col]):
+            dates = ensure_datetime(df[col])
+            lo = pd.Timestamp(wanted[0]).normalize()
+            hi = pd.Timestamp(wanted[1]).normalize() + pd.Timedelta(days=1)
+            df = df[((dates >= lo) & (dates < hi)).to_numpy()]
+        else:
+            df = df[df[col].isin(list(wanted)).to_numpy()]
+    return df
+
+
+def compute_kpis(
+    df: pd.DataFrame,
+    kpis: list = STANDARD_KPIS,
+    cols: dict = None,
+    schema=None,
+    where: dict = None
+) -> dict:
+    """
+    Several KPIs in one batch over contiguous NumPy buffers, cached per
+    dataset, column mapping and filter.
+
+    kpis are names from KPIS; cols maps roles (sales, quantity, date,
+    order_id) to columns and defaults to the dataset schema (schema, e.g.
+    the parent's for a filtered frame, else get_schema). KPIs whose
+    columns are missing are left out of the result. aov is sales per
+    distinct order over lines that carry an order id.
+
+    For a filtered view pass the published dataset with where (as for
+    daily_series) rather than a filtered copy: the filter is part of
+    the cache key, while frames without a dataset version are
+    recomputed on every call.
+    """
+    if df is None or df.empty:
+        return {}
+
+    where = {col: wanted for col, wanted in (where or {}).items() if wanted is not None}
+    if any(col not in df.columns for col in where):
+        return {}
+
+    roles = dict((schema or get_schema(df)).columns)
+    roles.update(cols or {})
+
+    def available(kpi):
+        for role in KPIS[kpi]:
+            col = roles.get(role)
+            if not col or col not in df.columns:
+                return False
+            if role in ("sales", "quantity") and not pd.api.types.is_numeric_dtype(df[col]):
+                return False
+            if role == "date" and not is_datetime(df[col]):
+                return False
+        return True
+
+    kpis = [kpi for kpi in dict.fromkeys(kpis) if kpi in KPIS and available(kpi)]
+    used = {role: roles.get(role) for role in ["sales", "quantity", "date", "order_id"]}
+
+    result = cached_aggregate(
+        df, [], sorted(kpis), ("kpis", used, where),
+        lambda: _compute(_filter_rows(df, where), kpis, used)
+    )
+    return dict(result)
@@ -2,23 +2,41 @@
 
 import pandas as pd
 
+from config import ORDER_VALUE_PERCENTILES
+from utils.kpi_engine import compute_kpis
+from utils.orders import order_value_quantiles
+
 
 def kpi_total_sales(df: pd.DataFrame, sales_col: str) -> float:
     """Total sales KPI"""
     if df.empty or sales_col not in df.columns:
         return 0.0
-    return float(df[sales_col].sum())
+    return compute_kpis(df, cols={"sales": sales_col}).get("total_sales", 0.0)
 
 
 def kpi_aov(df: pd.DataFrame, sales_col: str) -> float:
-    """Average Order Value KPI"""
+    """Average Order Value KPI (per order; per line without order ids)"""
     if df.empty or sales_col not in df.columns:
         return 0.0
-    return float(df[sales_col].mean())
+    kpis = compute_kpis(df, cols={"sales": sales_col})
+    return kpis.get("aov", kpis.get("avg_line_value", 0.0))
 
 
 def kpi_orders(df: pd.DataFrame) -> int:
-    """Total number of orders"""
+    """Total number of orders (order lines without order ids)"""
     if df.empty:
         return 0
-    return int(len(df))
+    return int(compute_kpis(df).get("orders", len(df)))
+
+
+def kpi_order_value_percentiles(
+    df: pd.DataFrame,
+    sales_col: str,
+    order_col: str,
+    percentiles=ORDER_VALUE_PERCENTILES
+) -> dict:
+    """Order value percentiles KPI, e.g. {"p50": ..., "p90": ...}"""
+    summary = order_value_quantiles(df, sales_col, order_col, percentiles)
+    if summary.empty:
+        return {}
+    return summary.drop(columns="orders").iloc[0].to_dict()
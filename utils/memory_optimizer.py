@@ -0,0 +1,92 @@
+# utils/memory_optimizer.py
+
+import numpy as np
+import pandas as pd
+
+from config import CATEGORY_MAX_RATIO
+from utils.column_detector import detect_roles
+from utils.schema import DIMENSION_ROLES
+
+# Integer key columns (ids, codes) are narrowed to int32 when every
+# value fits. Measures (amounts, quantities, prices) keep their 64-bit
+# dtype: int32 products such as price * quantity overflow silently
+# (60000 * 50000 wraps to -1294967296) and float32 sums lose precision.
+KEY_INT_DTYPE = np.int32
+
+
+def _is_string_column(series: pd.Series) -> bool:
+    return (
+        pd.api.types.is_object_dtype(series)
+        or pd.api.types.is_string_dtype(series)
+    ) and not isinstance(series.dtype, pd.CategoricalDtype)
+
+
+def _downcast_key(series: pd.Series) -> pd.Series:
+    values = series.to_numpy()
+    info = np.iinfo(KEY_INT_DTYPE)
+    if len(values) and (values.min() < info.min or values.max() > info.max):
+        return series
+    return series.astype(KEY_INT_DTYPE)
+
+
+def compact_dataframe(
+    df: pd.DataFrame,
+    category_max_ratio: float = CATEGORY_MAX_RATIO
+):
+    """
+    Shrink a DataFrame's resident memory.
+
+    - Low/mid-cardinality string columns become categoricals
+      (unique values / rows <= category_max_ratio).
+    - Integer key columns (order id, outlet, SKU, ... codes) become
+      int32 when every value fits. Measures are left as they are.
+
+    Returns (compacted_df, report) where report holds bytes before/after
+    and the per-column dtype changes.
+    """
+
+    if df is None or df.empty:
+        return df, {"before": 0, "after": 0, "saved": 0, "saved_pct": 0.0, "columns": {}}
+
+    before = int(df.memory_usage(deep=True).sum())
+    rows = len(df)
+
+    roles = detect_roles(df.columns.tolist())
+    keys = {roles[role] for role in DIMENSION_ROLES if roles.get(role)}
+
+    columns = {}
+    changes = {}
+
+    for col in df.columns:
+        series = df[col]
+        compacted = series
+
+        if _is_string_column(series):
+            if series.nunique(dropna=True) / rows <= category_max_ratio:
+                compacted = series.astype("category")
+
+        elif not isinstance(series.dtype, np.dtype) or series.dtype.itemsize <= 4:
+            # Extension dtypes (nullable ints, datetimes with tz, ...) and
+            # already-narrow columns are left untouched
+            pass
+
+        elif col in keys and series.dtype.kind in "iu":
+            compacted = _downcast_key(series)
+
+        if compacted.dtype != series.dtype:
+            changes[col] = (str(series.dtype), str(compacted.dtype))
+
+        columns[col] = compacted
+
+    result = pd.DataFrame(columns, index=df.index, copy=False)
+    after = int(result.memory_usage(deep=True).sum())
+
+    report = {
+        "before": before,
+        "after": after,
+        "saved": before - after,
+        "saved_pct": (before - after) / before * 100 if before else 0.0,
+        "columns": changes
+    }
+
+    return result, report
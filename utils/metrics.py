@@ -1,3 +1,8 @@
+from config import ORDER_VALUE_PERCENTILES
+from utils.kpi_engine import compute_kpis
+from utils.orders import order_value_quantiles
+
+
 def kpi_total_sales(df, sales_col):
     """
     Returns total sales safely.
@@ -5,25 +10,43 @@ def kpi_total_sales(df, sales_col):
     if df is None or df.empty or not sales_col or sales_col not in df.columns:
         return 0
 
-    return float(df[sales_col].sum())
+    return compute_kpis(df, cols={"sales": sales_col}).get("total_sales", 0)
 
 
 def kpi_aov(df, sales_col):
     """
     Returns average order value safely.
+    Sales per distinct order; falls back to the line average when the
+    dataset has no order ids.
     """
     if df is None or df.empty or not sales_col or sales_col not in df.columns:
         return 0
 
-    return float(df[sales_col].mean())
+    kpis = compute_kpis(df, cols={"sales": sales_col})
+    return kpis.get("aov", kpis.get("avg_line_value", 0))
 
 
 def kpi_orders(df):
     """
-    Returns total number of records.
-    (Kept intentionally as row count to avoid breaking logic)
+    Returns total number of orders (distinct order ids).
+    Falls back to the number of records without order ids.
     """
-    if df is None:
+    if df is None or df.empty:
         return 0
 
-    return int(len(df))
+    return int(compute_kpis(df).get("orders", len(df)))
+
+
+def kpi_order_value_percentiles(df, sales_col, order_col, percentiles=ORDER_VALUE_PERCENTILES):
+    """
+    Returns order value percentiles safely, e.g. {"p50": ..., "p90": ...}.
+    Mean order value is easily skewed by a few large orders.
+    """
+    if df is None or df.empty or not sales_col or not order_col:
+        return {}
+
+    summary = order_value_quantiles(df, sales_col, order_col, percentiles)
+    if summary.empty:
+        return {}
+
+    return summary.drop(columns="orders").iloc[0].to_dict()
@@ -0,0 +1,217 @@
+# utils/orders.py
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from config import ORDER_VALUE_PERCENTILES
+from utils.agg_cache import cached_aggregate
+from utils.cube import get_cube
+from utils.date_parsing import is_datetime
+from utils.fingerprint import dataset_version
+from utils.quantile_sketch import exact_quantiles, quantile_label
+from utils.schema import get_schema
+
+MAX_CACHED_ORDER_FACTS = 8
+
+# Order fact table columns (outlet / rep keep their role names)
+ORDER_TOTAL = "order_total"
+ORDER_LINES = "lines"
+ORDER_QUANTITY = "quantity"
+FIRST_DATE = "first_date"
+
+# dataset version -> order fact table
+_ORDER_FACTS = OrderedDict()
+
+
+# ---------------- Order Fact Table ----------------
+def build_order_facts(df: pd.DataFrame, schema=None):
+    """
+    One row per order, from the order lines: order total, line count,
+    quantity, first order date, and the outlet / rep of its first line.
+
+    Orders are factorized once and every measure is a bincount (or a
+    minimum / take) over the codes, so no groupby is involved. Returns
+    None without order id and sales columns.
+    """
+    schema = schema or get_schema(df)
+    order_col = schema.col("order_id")
+    sales_col = schema.col("sales")
+
+    if (
+        df is None
+        or df.empty
+        or order_col not in df.columns
+        or sales_col not in df.columns
+        or not pd.api.types.is_numeric_dtype(df[sales_col])
+    ):
+        return None
+
+    # Reuse the cube's order codes when it has already factorized them
+    cube = get_cube(df, build=False)
+    factorized = cube.order_codes() if cube is not None else None
+    if factorized is None or len(factorized[0]) != len(df):
+        factorized = pd.factorize(df[order_col])
+    codes, labels = factorized
+    valid = codes >= 0
+    if not valid.all():
+        codes = codes[valid]
+    n = len(labels)
+
+    def values(col):
+        column = df[col] if valid.all() else df[col][valid]
+        return column.to_numpy(dtype=np.float64, na_value=np.nan)
+
+    facts = {
+        ORDER_TOTAL: np.bincount(codes, weights=np.nan_to_num(values(sales_col)), minlength=n),
+        ORDER_LINES: np.bincount(codes, minlength=n)
+    }
+
+    qty_col = schema.col("quantity")
+    if qty_col in df.columns and pd.api.types.is_numeric_dtype(df[qty_col]):
+        facts[ORDER_QUANTITY] = np.bincount(codes, weights=np.nan_to_num(values(qty_col)), minlength=n)
+
+    date_col = schema.col("date")
+    if date_col in df.columns and is_datetime(df[date_col]) and df[date_col].dt.tz is None:
+        dates = df[date_col].to_numpy()
+        dates = (dates if valid.all() else dates[valid]).astype("datetime64[ns]").view("int64")
+        nat = np.iinfo(np.int64).min
+
+        first = np.full(n, np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first, codes, np.where(dates == nat, np.iinfo(np.int64).max, dates))
+        first[first == np.iinfo(np.int64).max] = nat
+        facts[FIRST_DATE] = first.view("datetime64[ns]")
+
+    # Position of every order's first line
+    rows = np.flatnonzero(valid)
+    first_line = np.empty(n, dtype=np.int64)
+    first_line[codes[::-1]] = rows[::-1]
+
+    for role in ["outlet", "rep"]:
+        col = schema.col(role)
+        if col in df.columns:
+            facts[role] = df[col].take(first_line).to_numpy()
+
+    return pd.DataFrame(facts, index=pd.Index(labels, name=order_col))
+
+
+def _remember(version: str, facts: pd.DataFrame):
+    _ORDER_FACTS[version] = facts
+    _ORDER_FACTS.move_to_end(version)
+    while len(_ORDER_FACTS) > MAX_CACHED_ORDER_FACTS:
+        _ORDER_FACTS.popitem(last=False)
+
+
+def publish_order_facts(df: pd.DataFrame):
+    """Build the order fact table of a newly loaded dataset into session."""
+    st.session_state["order_facts"] = None
+    if df is None or df.empty:
+        return None
+
+    facts = build_order_facts(df)
+    version = dataset_version(df)
+    if facts is not None and version is not None:
+        _remember(version, facts)
+        st.session_state["order_facts"] = (version, facts)
+    return facts
+
+
+def get_order_facts(df: pd.DataFrame, sales_col: str = None, schema=None):
+    """
+    Order fact table of a dataset (the one built at upload when it
+    matches, else built once and cached by dataset version), or None when
+    the dataset has no order ids. With sales_col, None is also returned
+    when the table was built from a different sales column. schema
+    defaults to get_schema (a filtered frame's is derived from the
+    session dataset's).
+    """
+    if df is None or df.empty:
+        return None
+
+    schema = schema or get_schema(df)
+    if sales_col is not None and sales_col != schema.col("sales"):
+        return None
+
+    version = dataset_version(df)
+    if version is None:
+        return build_order_facts(df, schema)
+
+    published = st.session_state.get("order_facts")
+    if published is not None and published[0] == version:
+        return published[1]
+
+    facts = _ORDER_FACTS.get(version)
+    if facts is None:
+        facts = build_order_facts(df, schema)
+        if facts is None:
+            return None
+        _remember(version, facts)
+
+    return facts
+
+
+# ---------------- Order Value Distribution ----------------
+def order_value_quantiles(
+    df: pd.DataFrame,
+    sales_col: str,
+    order_col: str,
+    qs=ORDER_VALUE_PERCENTILES,
+    group_col: str = None
+) -> pd.DataFrame:
+    """
+    Quantiles of order value (sales summed per order), overall or per
+    group_col, as columns p50, p90, ... plus an "orders" count.
+
+    Per group, an order's value is the sum of its lines in that group,
+    and an order counts in every group it has lines in (so a two-brand
+    order adds one value to each brand).
+
+    Answered from the cube's per-cell quantile sketches (within
+    QUANTILE_SKETCH_ALPHA relative error) whenever group_col is one of
+    its filter dimensions; other groups are computed exactly.
+    """
+    if (
+        df is None
+        or df.empty
+        or sales_col not in df.columns
+        or order_col not in df.columns
+        or (group_col is not None and group_col not in df.columns)
+    ):
+        return pd.DataFrame()
+
+    dims = [group_col] if group_col else []
+
+    cube = get_cube(df)
+    if cube is not None and sales_col in cube.measures:
+        summary = cube.order_value_quantiles(dims, qs)
+        if summary is not None:
+            return summary
+
+    def compute():
+        if not dims:
+            facts = get_order_facts(df, sales_col)
+            if facts is not None and facts.index.name == order_col:
+                values = facts[ORDER_TOTAL]
+            else:
+                values = df.groupby(order_col, sort=False, observed=True)[sales_col].sum()
+            stats = exact_quantiles(values, qs)
+            stats["orders"] = len(values)
+            return pd.DataFrame([stats])
+
+        # Each order's value within each group it has lines in
+        values = df[[group_col, order_col, sales_col]].groupby(
+            [group_col, order_col], sort=False, observed=True
+        )[sales_col].sum()
+
+        rows = []
+        for label, group_values in values.groupby(level=0, observed=True):
+            stats = exact_quantiles(group_values, qs)
+            stats.update({group_col: label, "orders": len(group_values)})
+            rows.append(stats)
+        return pd.DataFrame(rows, columns=[group_col] + [quantile_label(q) for q in qs] + ["orders"])
+
+    return cached_aggregate(
+        df, [order_col] + dims, [sales_col], ("order_quantiles", tuple(qs)), compute
+    )
@@ -18,7 +18,7 @@ def calculate_pricing_metrics(df, price_col, qty_col, discount_col):
 
 def sku_level_pricing(df, sku_col):
     return (
-        df.groupby(sku_col)
+        df.groupby(sku_col, observed=True)
         .agg(
             Gross_Sales=("Gross_Sales", "sum"),
             Net_Sales=("Net_Sales", "sum"),
@@ -0,0 +1,98 @@
+# utils/quantile_sketch.py
+
+import numpy as np
+import pandas as pd
+
+from config import QUANTILE_SKETCH_ALPHA
+
+
+class CellQuantiles:
+    """
+    DDSketch-style quantile sketches of a value for many cells at once.
+
+    Positive values fall into logarithmic buckets whose width is a fixed
+    share of the value, so any quantile is returned within a relative
+    error of alpha. Values <= 0 share one bucket reported as 0. Buckets
+    are counted per cell and stored sparsely; sketches merge by adding
+    bucket counts, so any grouping of cells (after any filter) is
+    answered without touching the rows.
+    """
+
+    def __init__(self, cell_ids: np.ndarray, values: np.ndarray, alpha: float = QUANTILE_SKETCH_ALPHA):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = np.log(self.gamma)
+
+        values = np.asarray(values, dtype=np.float64)
+        keep = ~np.isnan(values)
+        cell_ids, values = cell_ids[keep], values[keep]
+
+        positive = values > 0
+        buckets = np.zeros(len(values), dtype=np.int64)
+        buckets[positive] = np.ceil(np.log(values[positive]) / self._log_gamma).astype(np.int64)
+
+        # Bucket 0 holds values <= 0; positive buckets start at 1
+        self.offset = int(buckets[positive].min()) - 1 if positive.any() else 0
+        buckets[positive] -= self.offset
+        self.n_buckets = int(buckets.max()) + 1 if len(buckets) else 1
+
+        keys = cell_ids.astype(np.int64) * self.n_buckets + buckets
+        entry_keys, counts = np.unique(keys, return_counts=True)
+
+        self.cells = entry_keys // self.n_buckets
+        self.buckets = entry_keys % self.n_buckets
+        self.counts = counts
+
+    def _bucket_values(self) -> np.ndarray:
+        """Representative value of every bucket (0 for the first)."""
+        keys = np.arange(self.n_buckets) + self.offset
+        values = 2 * self.gamma ** keys / (self.gamma + 1)
+        values[0] = 0.0
+        return values
+
+    def histograms(self, groups: np.ndarray, n_groups: int) -> np.ndarray:
+        """
+        Merged bucket counts per group (shape [n_groups, buckets]), where
+        groups maps every cell to a group id (or -1 to leave it out).
+        """
+        entry_groups = groups[self.cells]
+        keep = entry_groups >= 0
+        flat = entry_groups[keep] * self.n_buckets + self.buckets[keep]
+
+        counts = np.bincount(flat, weights=self.counts[keep], minlength=n_groups * self.n_buckets)
+        return counts.reshape(n_groups, self.n_buckets)
+
+    def quantiles(self, groups: np.ndarray, n_groups: int, qs) -> tuple:
+        """
+        Quantiles qs per group (NaN for empty groups) and the number of
+        values in each group.
+        """
+        counts = self.histograms(groups, n_groups)
+        cumulative = np.cumsum(counts, axis=1)
+        totals = cumulative[:, -1] if self.n_buckets else np.zeros(n_groups)
+
+        values = self._bucket_values()
+        out = np.full((n_groups, len(qs)), np.nan)
+
+        for i, q in enumerate(qs):
+            rank = q * np.maximum(totals - 1, 0)
+            bucket = (cumulative > rank[:, None]).argmax(axis=1)
+            out[:, i] = np.where(totals > 0, values[bucket], np.nan)
+
+        return out, totals.astype(np.int64)
+
+
+def quantile_label(q: float) -> str:
+    """Column label of a quantile, e.g. 0.5 -> 'p50'."""
+    return f"p{q * 100:g}"
+
+
+def exact_quantiles(values: pd.Series, qs) -> dict:
+    """Reference quantiles of a Series (lower interpolation)."""
+    values = values.dropna()
+    if values.empty:
+        return {quantile_label(q): np.nan for q in qs}
+    return {
+        quantile_label(q): float(value)
+        for q, value in zip(qs, values.quantile(list(qs), interpolation="lower"))
+    }
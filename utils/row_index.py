@@ -0,0 +1,92 @@
+# utils/row_index.py
+
+import numpy as np
+import pandas as pd
+
+
+class DimensionIndex:
+    """
+    Sorted row ids per value of one dimension (an inverted index).
+
+    Rows are bucketed by their integer code with a stable counting
+    sort, so the rows holding any value are one contiguous, already
+    sorted slice of a single array.
+    """
+
+    def __init__(self, codes: np.ndarray, card: int):
+        self.codes = codes
+        self.card = card
+        self.row_ids = np.argsort(codes, kind="stable")
+        self.offsets = np.zeros(card + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=card), out=self.offsets[1:])
+
+    def count(self, wanted: np.ndarray) -> int:
+        """Number of rows holding any of the wanted codes."""
+        return int((self.offsets[wanted + 1] - self.offsets[wanted]).sum())
+
+    def rows(self, wanted: np.ndarray) -> np.ndarray:
+        """Sorted row ids holding any of the wanted codes."""
+        slices = [self.row_ids[self.offsets[code]:self.offsets[code + 1]] for code in wanted]
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        if len(slices) == 1:
+            return slices[0]
+        return np.sort(np.concatenate(slices))
+
+    def lookup(self, wanted: np.ndarray) -> np.ndarray:
+        """Boolean table over codes, True for the wanted ones."""
+        table = np.zeros(self.card, dtype=bool)
+        table[wanted] = True
+        return table
+
+
+class RowIndex:
+    """
+    Row-id indexes over the dimension codes of a dataset, built lazily
+    once per dimension and shared by every filter that uses it.
+
+    Combining filters starts from the most selective dimension's rows
+    and checks the remaining dimensions through code lookup tables, so
+    the work is proportional to the selected rows rather than to the
+    table (no n-length masks are allocated).
+    """
+
+    def __init__(self, codes: dict, labels: dict):
+        self._codes = codes
+        self._labels = labels
+        self._indexes = {}
+
+    def index(self, col: str) -> DimensionIndex:
+        idx = self._indexes.get(col)
+        if idx is None:
+            idx = DimensionIndex(self._codes[col], len(self._labels[col]) + 1)
+            self._indexes[col] = idx
+        return idx
+
+    def wanted_codes(self, col: str, values) -> np.ndarray:
+        """Codes of the given labels (unknown labels are ignored)."""
+        positions = self._labels[col].get_indexer(pd.Index(list(values)))
+        return np.unique(positions[positions >= 0])
+
+    def select(self, where: dict):
+        """
+        Sorted row ids matching every {column: labels} filter, or None
+        when there is nothing to filter on.
+        """
+        where = {col: values for col, values in (where or {}).items() if values is not None}
+        if not where:
+            return None
+
+        wanted = {col: self.wanted_codes(col, values) for col, values in where.items()}
+
+        # Most selective dimension first
+        cols = sorted(wanted, key=lambda col: self.index(col).count(wanted[col]))
+        rows = self.index(cols[0]).rows(wanted[cols[0]])
+
+        for col in cols[1:]:
+            if not len(rows):
+                break
+            table = self.index(col).lookup(wanted[col])
+            rows = rows[table[self._codes[col][rows]]]
+
+        return rows
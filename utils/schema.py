@@ -0,0 +1,148 @@
+# utils/schema.py
+
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+
+import pandas as pd
+import streamlit as st
+
+from utils.column_detector import detect_roles
+from utils.fingerprint import dataset_version
+
+# Roles whose distinct counts are recorded (filters, chart sizing)
+DIMENSION_ROLES = [
+    "sku", "brand", "city", "state", "outlet", "rep",
+    "warehouse", "order_state", "order_type", "order_id"
+]
+
+MAX_CACHED_SCHEMAS = 8
+
+_SCHEMAS = OrderedDict()
+
+
+@dataclass
+class DatasetSchema:
+    """
+    Everything pages need to know about a dataset's shape, resolved once
+    per upload instead of re-scanning columns on every rerun.
+    """
+    version: str  # dataset version token (None when unpublished)
+    row_count: int
+    columns: dict  # role -> column name (auto_detect_columns compatible)
+    dtypes: dict = field(default_factory=dict)
+    cardinalities: dict = field(default_factory=dict)
+    date_min: pd.Timestamp = None
+    date_max: pd.Timestamp = None
+    date_nulls: int = 0
+
+    def col(self, role: str, default=None):
+        """Column playing a role, e.g. schema.col("sales", "AMOUNT")."""
+        return self.columns.get(role) or default
+
+    def missing(self, roles: list) -> list:
+        """Roles from the list that the dataset does not provide."""
+        return [role for role in roles if not self.columns.get(role)]
+
+
+def build_schema(df: pd.DataFrame) -> DatasetSchema:
+    """
+    Resolve roles, dtypes, cardinalities and the date range of a dataset.
+    """
+    if df is None or df.empty:
+        return DatasetSchema(version=None, row_count=0, columns=detect_roles([]))
+
+    columns = detect_roles(df.columns.tolist())
+
+    cardinalities = {}
+    for role in DIMENSION_ROLES:
+        col = columns.get(role)
+        if col and col not in cardinalities:
+            cardinalities[col] = int(df[col].nunique(dropna=True))
+
+    date_min = date_max = None
+    date_nulls = 0
+    date_col = columns.get("date")
+    if date_col and pd.api.types.is_datetime64_any_dtype(df[date_col]):
+        date_min = df[date_col].min()
+        date_max = df[date_col].max()
+        date_nulls = int(df[date_col].isna().sum())
+
+    return DatasetSchema(
+        version=dataset_version(df),
+        row_count=int(len(df)),
+        columns=columns,
+        dtypes={col: str(dtype) for col, dtype in df.dtypes.items()},
+        cardinalities=cardinalities,
+        date_min=date_min,
+        date_max=date_max,
+        date_nulls=date_nulls
+    )
+
+
+def _remember(schema: DatasetSchema):
+    if schema.version is None:
+        return
+    _SCHEMAS[schema.version] = schema
+    _SCHEMAS.move_to_end(schema.version)
+    while len(_SCHEMAS) > MAX_CACHED_SCHEMAS:
+        _SCHEMAS.popitem(last=False)
+
+
+def publish_schema(df: pd.DataFrame) -> DatasetSchema:
+    """Build the schema for a newly loaded dataset and store it in session."""
+    schema = build_schema(df)
+    _remember(schema)
+    st.session_state["schema"] = schema
+    return schema
+
+
+def derive_schema(parent: DatasetSchema, df) -> DatasetSchema:
+    """
+    Schema of a frame derived from a dataset (a filter, a sample, added
+    or dropped columns) without rescanning it: everything is taken from
+    the parent's schema, roles are re-detected from the column names
+    only when those differ, and cardinalities and the date range stay
+    the parent's (upper bounds for a subset).
+    """
+    columns = list(df.columns)
+    dtypes = {col: str(df[col].dtype) for col in columns}
+    if parent is None:
+        return DatasetSchema(version=None, row_count=int(len(df)), columns=detect_roles(columns), dtypes=dtypes)
+
+    if list(parent.dtypes) == columns:
+        return replace(parent, version=None, row_count=int(len(df)))
+
+    return replace(
+        parent,
+        version=None,
+        row_count=int(len(df)),
+        columns=detect_roles(columns),
+        dtypes=dtypes,
+        cardinalities={col: n for col, n in parent.cardinalities.items() if col in dtypes}
+    )
+
+
+def get_schema(df: pd.DataFrame, parent: DatasetSchema = None) -> DatasetSchema:
+    """
+    Schema of a dataset: the one stored at upload time when it matches,
+    otherwise built once and cached by dataset version.
+
+    Frames without a version (filtered or otherwise derived) are never
+    scanned: their schema is derived from parent, by default the
+    session dataset's (see derive_schema).
+    """
+    version = dataset_version(df)
+    session_schema = st.session_state.get("schema")
+
+    if version is None:
+        return derive_schema(parent or session_schema, df)
+
+    if session_schema is not None and session_schema.version == version:
+        return session_schema
+
+    schema = _SCHEMAS.get(version)
+    if schema is None:
+        schema = build_schema(df)
+        _remember(schema)
+
+    return schema
@@ -4,19 +4,21 @@ import pandas as pd
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 
-from utils.column_detector import auto_detect_columns
+from utils.schema import get_schema
 
 
-def prepare_outlet_features(df: pd.DataFrame) -> pd.DataFrame:
+def prepare_outlet_features(df: pd.DataFrame, cols: dict = None) -> pd.DataFrame:
     """
     Prepare outlet-level aggregated features for clustering.
+    Column roles come from the dataset schema unless passed in.
     Safe for Streamlit production use.
     """
 
     if df is None or df.empty:
         return pd.DataFrame()
 
-    cols = auto_detect_columns(df)
+    if cols is None:
+        cols = get_schema(df).columns
 
     outlet_col = cols.get("outlet")
     sales_col = cols.get("sales")
@@ -36,7 +38,7 @@ def prepare_outlet_features(df: pd.DataFrame) -> pd.DataFrame:
 
     outlet_df = (
         df
-        .groupby(outlet_col, as_index=False)
+        .groupby(outlet_col, as_index=False, observed=True)
         .agg(agg)
     )
 
@@ -0,0 +1,141 @@
+# utils/server_source.py
+
+import mmap
+import os
+
+import pandas as pd
+
+from config import SERVER_DATA_DIR, SERVER_FILE_EXTENSIONS
+
+
+def server_source_enabled() -> bool:
+    """True when a server-side data directory is configured and exists."""
+    return bool(SERVER_DATA_DIR) and os.path.isdir(SERVER_DATA_DIR)
+
+
+def list_server_files() -> list:
+    """
+    Supported data files under SERVER_DATA_DIR, as paths relative to it.
+    """
+    if not server_source_enabled():
+        return []
+
+    root = os.path.realpath(SERVER_DATA_DIR)
+    files = []
+
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.lower().endswith(SERVER_FILE_EXTENSIONS):
+                files.append(os.path.relpath(os.path.join(dirpath, filename), root))
+
+    return sorted(files)
+
+
+def resolve_server_path(name: str) -> str:
+    """
+    Absolute path of a file inside the whitelisted directory.
+    Raises ValueError for anything outside it (../, symlinks) or with an
+    unsupported extension.
+    """
+    if not server_source_enabled():
+        raise ValueError("Server-side ingestion is not configured")
+
+    root = os.path.realpath(SERVER_DATA_DIR)
+    path = os.path.realpath(os.path.join(root, name))
+
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"{name} is outside the allowed data directory")
+    if not path.lower().endswith(SERVER_FILE_EXTENSIONS):
+        raise ValueError(f"{name} is not a supported data file")
+    if not os.path.isfile(path):
+        raise ValueError(f"{name} does not exist")
+
+    return path
+
+
+class ServerFile:
+    """
+    Read-only, memory-mapped view of a server-side file exposing the
+    file-like surface the loaders use (name, size, read/seek/tell,
+    getbuffer). Pages come from the OS page cache, so nothing is
+    buffered in the Python heap.
+    """
+
+    def __init__(self, name: str):
+        self.path = resolve_server_path(name)
+        self.name = os.path.basename(self.path)
+        self.size = os.path.getsize(self.path)
+
+        if self.size == 0:
+            raise ValueError(f"{name} is empty")
+
+        self._handle = open(self.path, "rb")
+        self._map = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._map.read(size)
+
+    def readline(self) -> bytes:
+        return self._map.readline()
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        self._map.seek(offset, whence)
+        return self._map.tell()
+
+    def tell(self) -> int:
+        return self._map.tell()
+
+    def getbuffer(self) -> memoryview:
+        """Zero-copy view of the mapped file (used for hashing)."""
+        return memoryview(self._map)
+
+    def getvalue(self) -> bytes:
+        return self._map[:]
+
+    def close(self):
+        self._map.close()
+        self._handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_server_file(name: str) -> ServerFile:
+    """Validate and memory-map a file from the whitelisted directory."""
+    return ServerFile(name)
+
+
+def read_columnar(file, usecols=None) -> pd.DataFrame:
+    """
+    Read a Parquet or Arrow/Feather file. Server files are opened through
+    pyarrow's memory map so Arrow buffers are not copied on read, and
+    numeric columns convert to pandas without a copy where possible.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    source = pa.memory_map(file.path) if hasattr(file, "path") else file
+    name = file.name.lower()
+
+    if name.endswith(".parquet"):
+        table = pq.read_table(source, columns=usecols)
+    else:
+        table = pa.ipc.open_file(source).read_all()
+        if usecols:
+            table = table.select(usecols)
+
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def columnar_header(file) -> list:
+    """Column names of a Parquet or Arrow file, read from its schema."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    source = pa.memory_map(file.path) if hasattr(file, "path") else file
+    if file.name.lower().endswith(".parquet"):
+        return pq.read_schema(source).names
+    return pa.ipc.open_file(source).schema.names
@@ -0,0 +1,301 @@
+# utils/time_windows.py
+
+import numpy as np
+import pandas as pd
+
+from config import FISCAL_YEAR_START_MONTH, YOY_LAG_DAYS
+from utils.agg_cache import cached_aggregate
+from utils.cube import get_cube
+from utils.date_parsing import ensure_datetime
+
+TOTAL = "Total"
+
+# Year-over-year alignments: ISO (week + weekday) or fiscal (days since
+# the fiscal year start), each by day, week or month
+CALENDARS = ["iso", "fiscal"]
+GRANULARITIES = ["day", "week", "month"]
+
+
+def calendar_keys(days: pd.DatetimeIndex, calendar: str, fiscal_start: int = FISCAL_YEAR_START_MONTH) -> dict:
+    """
+    Year and 1-based day / week / month position of every day under a
+    calendar. ISO days are aligned by week and weekday, and an ISO
+    week's month is that of its Thursday (so weeks are never split).
+    Fiscal weeks count 7-day blocks from the fiscal year start.
+    """
+    if calendar == "iso":
+        iso = days.isocalendar()
+        weekday = days.weekday.to_numpy()
+        week = iso["week"].to_numpy(dtype=np.int64)
+        thursday = days + pd.to_timedelta(3 - weekday, unit="D")
+        return {
+            "year": iso["year"].to_numpy(dtype=np.int64),
+            "day": (week - 1) * 7 + weekday + 1,
+            "week": week,
+            "month": thursday.month.to_numpy(dtype=np.int64)
+        }
+
+    if calendar == "fiscal":
+        month = days.month.to_numpy(dtype=np.int64)
+        year = days.year.to_numpy(dtype=np.int64) - (month < fiscal_start)
+        year_start = pd.to_datetime(pd.DataFrame({"year": year, "month": fiscal_start, "day": 1}))
+        day = (days - pd.DatetimeIndex(year_start)).days.to_numpy(dtype=np.int64)
+        return {
+            "year": year,
+            "day": day + 1,
+            "week": day // 7 + 1,
+            "month": (month - fiscal_start) % 12 + 1
+        }
+
+    raise ValueError(f"Unsupported calendar: {calendar}")
+
+
+def year_label(year: int, calendar: str, fiscal_start: int = FISCAL_YEAR_START_MONTH) -> str:
+    """Display label of a calendar year, e.g. FY2024-25."""
+    if calendar == "fiscal" and fiscal_start != 1:
+        return f"FY{year}-{(year + 1) % 100:02d}"
+    return str(year)
+
+
+class DailySeries:
+    """
+    Dense daily values of one or more series (rows) over a contiguous
+    day range (columns), e.g. sales per city per day.
+
+    Prefix sums are kept per series, so any trailing window sum, moving
+    average or period-over-period change is two lookups per point, for
+    every series at once.
+    """
+
+    def __init__(self, values: np.ndarray, start, names=None):
+        self.values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+        n_series, n_days = self.values.shape
+
+        self.days = pd.date_range(pd.Timestamp(start).normalize(), periods=n_days, freq="D")
+        self.names = pd.Index([TOTAL] if names is None else names)
+
+        self.prefix = np.zeros((n_series, n_days + 1))
+        np.cumsum(self.values, axis=1, out=self.prefix[:, 1:])
+
+        self._calendars = {}
+
+    def __len__(self):
+        return self.values.shape[1]
+
+    def __sizeof__(self):
+        return self.values.nbytes + self.prefix.nbytes + self.days.nbytes
+
+    def range_sum(self, start: int, stop: int) -> np.ndarray:
+        """Sum of day positions [start, stop) for every series."""
+        start, stop = max(start, 0), min(stop, len(self))
+        return self.prefix[:, stop] - self.prefix[:, start]
+
+    # ---------------- Trailing Windows ----------------
+    def trailing_sum(self, window: int) -> np.ndarray:
+        """
+        Sum of the `window` days ending on each day (series x days);
+        NaN until a full window is available.
+        """
+        stops = np.arange(1, len(self) + 1)
+        sums = self.prefix[:, stops] - self.prefix[:, np.maximum(stops - window, 0)]
+        sums[:, stops < window] = np.nan
+        return sums
+
+    def moving_average(self, window: int) -> np.ndarray:
+        return self.trailing_sum(window) / window
+
+    def change(self, window: int, lag: int) -> np.ndarray:
+        """
+        % change of each trailing window against the window ending
+        `lag` days earlier (NaN when that one is missing or zero).
+        """
+        current = self.trailing_sum(window)
+        previous = np.full_like(current, np.nan)
+        if lag < len(self):
+            previous[:, lag:] = current[:, :len(self) - lag]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct = (current - previous) / previous * 100
+        pct[~np.isfinite(pct)] = np.nan
+        return pct
+
+    def wow(self) -> np.ndarray:
+        """Trailing 7 days against the 7 days before."""
+        return self.change(7, 7)
+
+    def mom(self) -> np.ndarray:
+        """Trailing 28 days against the 28 days before (4-week months)."""
+        return self.change(28, 28)
+
+    def yoy(self, window: int = 28) -> np.ndarray:
+        """Trailing window against the same weekdays a year earlier."""
+        return self.change(window, YOY_LAG_DAYS)
+
+    def latest(self, values: np.ndarray) -> pd.Series:
+        """Last value of a (series x days) result per series."""
+        return pd.Series(values[:, -1] if len(self) else np.nan, index=self.names)
+
+    def frame(self, values: np.ndarray = None) -> pd.DataFrame:
+        """Days x series frame of the daily values (or of a result)."""
+        values = self.values if values is None else values
+        return pd.DataFrame(values.T, index=self.days, columns=self.names)
+
+    # ---------------- Calendar Periods ----------------
+    def period_starts(self, freq: str) -> pd.DatetimeIndex:
+        """Start day of the ISO week ("W") or month ("M") of every day."""
+        if freq == "W":
+            return self.days - pd.to_timedelta(self.days.weekday, unit="D")
+        if freq == "M":
+            return self.days - pd.to_timedelta(self.days.day - 1, unit="D")
+        raise ValueError(f"Unsupported period: {freq}")
+
+    def period_totals(self, freq: str) -> pd.DataFrame:
+        """
+        Totals per calendar week (ISO, Monday start) or month, indexed
+        by the period's first day, so weeks of different years never
+        collapse together. Edge periods may be partial.
+        """
+        if not len(self):
+            return pd.DataFrame(columns=self.names)
+
+        starts = self.period_starts(freq)
+        bounds = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+        stops = np.r_[bounds[1:], len(self)]
+
+        totals = self.prefix[:, stops] - self.prefix[:, bounds]
+        return pd.DataFrame(totals.T, index=starts[bounds], columns=self.names)
+
+    def period_growth(self, freq: str) -> pd.Series:
+        """% change of the last calendar period against the one before."""
+        totals = self.period_totals(freq)
+        if len(totals) < 2:
+            return pd.Series(0.0, index=self.names)
+
+        previous, last = totals.iloc[-2], totals.iloc[-1]
+        growth = (last - previous) / previous.where(previous != 0) * 100
+        return growth.fillna(0)
+
+    # ---------------- Year over Year ----------------
+    def calendar(self, calendar: str) -> dict:
+        """
+        calendar_keys of the series' days, computed once. One day past
+        either end is included, to tell which edge periods are partial.
+        """
+        if calendar not in self._calendars:
+            days = self.days
+            if len(self):
+                days = pd.date_range(days[0] - pd.Timedelta(days=1), periods=len(self) + 2, freq="D")
+            self._calendars[calendar] = calendar_keys(days, calendar)
+        return self._calendars[calendar]
+
+    def years(self, calendar: str) -> list:
+        """Calendar years the series covers (possibly partially)."""
+        return sorted(set(self.calendar(calendar)["year"][1:-1].tolist()))
+
+    def year_over_year(
+        self,
+        year: int,
+        compare_year: int,
+        calendar: str = "iso",
+        granularity: str = "week",
+        series=TOTAL
+    ) -> pd.DataFrame:
+        """
+        One series' totals of two years side by side, aligned by the
+        calendar's day / week / month position, plus the % change.
+        Periods the series covers only partly (its edges) are NaN, so
+        they are not compared against complete ones.
+        """
+        keys = self.calendar(calendar)
+        values = self.values[self.names.get_loc(series)]
+        years, positions = keys["year"][1:-1], keys[granularity][1:-1]
+        edges = {(keys["year"][i], keys[granularity][i]) for i in (0, -1)}
+        n_positions = int(keys[granularity].max()) + 1
+
+        out = {}
+        for each in (year, compare_year):
+            in_year = years == each
+            totals = np.bincount(positions[in_year], weights=values[in_year], minlength=n_positions)
+            covered = np.bincount(positions[in_year], minlength=n_positions) > 0
+            for edge_year, edge_position in edges:
+                if edge_year == each:
+                    covered[edge_position] = False
+            out[year_label(each, calendar)] = np.where(covered, totals, np.nan)[1:]
+
+        aligned = pd.DataFrame(out, index=pd.RangeIndex(1, n_positions, name=granularity))
+        current, previous = aligned.iloc[:, 0], aligned.iloc[:, -1]
+        aligned["Change %"] = (current - previous) / previous.where(previous != 0) * 100
+        return aligned.dropna(how="all", subset=aligned.columns[:-1])
+
+
+def _dense(days: pd.Series, keys, values: np.ndarray, start, stop):
+    """Series x days matrix from (day, key, value) cells."""
+    offsets = ((ensure_datetime(days) - start) // pd.Timedelta(days=1)).to_numpy()
+    n_days = int((stop - start) // pd.Timedelta(days=1)) + 1
+
+    if keys is None:
+        codes, names = np.zeros(len(offsets), dtype=np.int64), None
+    else:
+        codes, names = pd.factorize(keys, sort=True)
+
+    inside = (offsets >= 0) & (offsets < n_days) & (codes >= 0)
+    n_series = 1 if names is None else len(names)
+
+    flat = codes[inside] * n_days + offsets[inside]
+    matrix = np.bincount(flat, weights=values[inside], minlength=n_series * n_days)
+    return matrix.reshape(n_series, n_days), names
+
+
+def daily_series(df: pd.DataFrame, date_col: str, value_col: str, by: str = None, where: dict = None):
+    """
+    DailySeries of value_col summed per day (and per `by` value), dense
+    over the date range (the filter's range when where has one).
+
+    Built from the cube's daily rollup when it covers the request,
+    else from the rows; cached per dataset, measure, split and filter.
+    """
+    if df is None or df.empty or date_col not in df.columns or value_col not in df.columns:
+        return DailySeries(np.zeros((1, 0)), pd.Timestamp.today())
+
+    where = {col: wanted for col, wanted in (where or {}).items() if wanted is not None}
+    dims = [date_col] + ([by] if by else [])
+
+    def compute():
+        cube = get_cube(df)
+        if cube is not None and cube.has(dims + list(where)) and value_col in cube.measures:
+            cells = cube.rollup(dims, where=where)
+            days = cells[date_col]
+            calendar = cube.labels(date_col)
+            start, stop = calendar.min(), calendar.max()
+        else:
+            rows = df
+            for col, wanted in where.items():
+                if col == date_col and isinstance(wanted, tuple):
+                    dates = ensure_datetime(rows[col])
+                    lo = pd.Timestamp(wanted[0]).normalize()
+                    hi = pd.Timestamp(wanted[1]).normalize() + pd.Timedelta(days=1)
+                    rows = rows[((dates >= lo) & (dates < hi)).to_numpy()]
+                else:
+                    rows = rows[rows[col].isin(list(wanted)).to_numpy()]
+
+            dates = ensure_datetime(rows[date_col]).dt.normalize()
+            cells = rows[[value_col] + ([by] if by else [])].assign(**{date_col: dates})
+            cells = cells.groupby(dims, observed=True, as_index=False)[value_col].sum()
+            days = cells[date_col]
+            all_days = ensure_datetime(df[date_col]).dt.normalize()
+            start, stop = all_days.min(), all_days.max()
+
+        if date_col in where and isinstance(where[date_col], tuple):
+            start = pd.Timestamp(where[date_col][0]).normalize()
+            stop = pd.Timestamp(where[date_col][1]).normalize()
+
+        if pd.isna(start) or stop < start:
+            return DailySeries(np.zeros((1, 0)), pd.Timestamp.today(), None)
+
+        values = cells[value_col].to_numpy(dtype=np.float64, na_value=0)
+        matrix, names = _dense(days, cells[by] if by else None, values, start, stop)
+        return DailySeries(matrix, start, names)
+
+    # The series itself is cached, so its prefix sums and calendar keys
+    # are reused across reruns
+    return cached_aggregate(df, dims, [value_col], ("daily_series", where), compute)
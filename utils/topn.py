@@ -0,0 +1,259 @@
+# utils/topn.py
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from config import CSV_CHUNK_ROWS, HEAVY_HITTER_EPSILON, HEAVY_HITTER_MIN_GROUPS
+from utils.agg_cache import cached_aggregate
+from utils.cube import get_cube
+
+
+# ---------------- Exact Top-N ----------------
+def top_n_positions(values: np.ndarray, n: int) -> np.ndarray:
+    """
+    Positions of the n largest values, largest first.
+
+    np.argpartition selects them in linear time; only those n are then
+    sorted, instead of sorting every group.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if n <= 0 or not len(values):
+        return np.empty(0, dtype=np.int64)
+
+    # NaN totals rank last, as with sort_values(ascending=False)
+    keys = np.where(np.isnan(values), -np.inf, values)
+
+    if n < len(keys):
+        candidates = np.argpartition(-keys, n - 1)[:n]
+    else:
+        candidates = np.arange(len(keys))
+
+    return candidates[np.argsort(-keys[candidates], kind="stable")]
+
+
+def top_n_series(totals: pd.Series, n: int) -> pd.Series:
+    """The n largest entries of an aggregated Series, largest first."""
+    return totals.iloc[top_n_positions(totals.to_numpy(), n)]
+
+
+def top_n_frame(totals: pd.DataFrame, value_col: str, n: int) -> pd.DataFrame:
+    """The n rows of an aggregated frame with the largest value_col."""
+    return totals.iloc[top_n_positions(totals[value_col].to_numpy(), n)]
+
+
+# ---------------- Heavy Hitters ----------------
+class SpaceSaving:
+    """
+    Weighted Space-Saving summary of the heaviest keys of a stream.
+
+    At most k counters are kept. Each estimate over-counts by at most
+    its recorded error, and every error is bounded by epsilon x total
+    weight (k = ceil(1 / epsilon)), so any key heavier than that is
+    guaranteed to be tracked. Summaries are mergeable, which is what
+    lets chunks be folded in one at a time.
+
+    Weights are assumed non-negative (negative lines are clipped).
+    """
+
+    def __init__(self, epsilon: float = HEAVY_HITTER_EPSILON):
+        self.epsilon = epsilon
+        self.k = max(1, math.ceil(1 / epsilon))
+        self.counts = pd.Series(dtype=np.float64)
+        self.errors = pd.Series(dtype=np.float64)
+        self.total = 0.0
+        # Largest weight a key absent from the summary may carry
+        self.floor = 0.0
+
+    def update(self, keys, weights=None):
+        """Fold one chunk of (key, weight) pairs into the summary."""
+        keys = pd.Series(keys)
+        weights = (
+            pd.Series(1.0, index=keys.index) if weights is None
+            else pd.Series(np.asarray(weights, dtype=np.float64), index=keys.index)
+        )
+        weights = weights.fillna(0).clip(lower=0)
+
+        chunk = weights.groupby(keys.to_numpy(), observed=True, sort=False).sum()
+        self.total += float(chunk.sum())
+
+        # Exact per-chunk totals, truncated to k counters
+        if len(chunk) > self.k:
+            keep = top_n_positions(chunk.to_numpy(), self.k)
+            dropped = np.ones(len(chunk), dtype=bool)
+            dropped[keep] = False
+            floor = float(chunk.to_numpy()[dropped].max())
+            chunk = chunk.iloc[keep]
+        else:
+            floor = 0.0
+
+        self._merge(chunk, pd.Series(0.0, index=chunk.index), floor)
+
+    def merge(self, other: "SpaceSaving"):
+        """Fold another summary (e.g. from a parallel worker) into this one."""
+        self.total += other.total
+        self._merge(other.counts, other.errors, other.floor)
+
+    def _merge(self, counts: pd.Series, errors: pd.Series, floor: float):
+        keys = self.counts.index.union(counts.index)
+
+        # A key missing on one side may still have up to that side's floor
+        merged = (
+            self.counts.reindex(keys, fill_value=self.floor)
+            + counts.reindex(keys, fill_value=floor)
+        )
+        merged_errors = (
+            self.errors.reindex(keys, fill_value=self.floor)
+            + errors.reindex(keys, fill_value=floor)
+        )
+        merged_floor = self.floor + floor
+
+        if len(merged) > self.k:
+            keep = top_n_positions(merged.to_numpy(), self.k)
+            dropped = np.ones(len(merged), dtype=bool)
+            dropped[keep] = False
+            merged_floor = max(merged_floor, float(merged.to_numpy()[dropped].max()))
+            merged, merged_errors = merged.iloc[keep], merged_errors.iloc[keep]
+
+        self.counts = merged
+        self.errors = merged_errors
+        self.floor = merged_floor
+
+    @property
+    def max_error(self) -> float:
+        """Largest possible over-count of any reported estimate."""
+        return float(self.errors.max()) if len(self.errors) else 0.0
+
+    @property
+    def untracked_bound(self) -> float:
+        """Largest weight a key missing from the summary may carry (<= epsilon x total)."""
+        return self.floor
+
+    def top_guaranteed(self, n: int) -> bool:
+        """
+        True when the top n keys are certainly the true top n: the n-th
+        key's lower bound is at least every other key's possible weight,
+        tracked (its estimate) or not (untracked_bound).
+        """
+        if n <= 0:
+            return True
+
+        positions = top_n_positions(self.counts.to_numpy(), n + 1)
+        if len(positions) < n:
+            return self.floor == 0
+
+        last = positions[n - 1]
+        lower = float(self.counts.iloc[last] - self.errors.iloc[last])
+        rival = self.floor
+        if len(positions) > n:
+            rival = max(rival, float(self.counts.iloc[positions[n]]))
+        return lower >= rival
+
+    def top(self, n: int) -> pd.DataFrame:
+        """Top n keys with estimate, error and guaranteed lower bound."""
+        positions = top_n_positions(self.counts.to_numpy(), n)
+        counts = self.counts.iloc[positions]
+        errors = self.errors.iloc[positions]
+        return pd.DataFrame({
+            "estimate": counts.to_numpy(),
+            "error": errors.to_numpy(),
+            "lower_bound": (counts - errors).to_numpy()
+        }, index=counts.index)
+
+
+def heavy_hitters(
+    df: pd.DataFrame,
+    group_col: str,
+    value_col: str = None,
+    n: int = 10,
+    epsilon: float = HEAVY_HITTER_EPSILON,
+    chunk_rows: int = CSV_CHUNK_ROWS
+):
+    """
+    Approximate top-n groups by summed value_col (or row count),
+    streamed over chunks of rows.
+    Returns (top frame indexed by group, SpaceSaving summary).
+    """
+    summary = SpaceSaving(epsilon)
+
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        summary.update(
+            chunk[group_col].to_numpy(),
+            None if value_col is None else chunk[value_col].to_numpy()
+        )
+
+    return summary.top(n), summary
+
+
+def error_caption(summary: SpaceSaving) -> str:
+    """Human readable error bounds (shown and unshown keys) for chart captions."""
+    total = summary.total or 1.0
+    return (
+        f"Approximate (Space-Saving, ε={summary.epsilon:g}): values may be "
+        f"over-stated by up to {summary.max_error:,.0f} "
+        f"({summary.max_error / total:.3%} of total); groups not tracked may "
+        f"total up to {summary.untracked_bound:,.0f} "
+        f"({summary.untracked_bound / total:.3%} of total) each"
+    )
+
+
+# ---------------- Chart Helper ----------------
+def _group_count(df: pd.DataFrame, group_col: str):
+    """Number of groups when known without a scan (categoricals), else None."""
+    dtype = df[group_col].dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return len(dtype.categories)
+    return None
+
+
+def top_groups(
+    df: pd.DataFrame,
+    group_col: str,
+    value_col: str,
+    n: int = 10,
+    approximate: bool = None
+):
+    """
+    Top n groups of df by summed value_col, largest first.
+
+    Exact totals come from the cube (or a groupby) followed by partial
+    selection. With approximate=True, or by default when there is no
+    cube and more than HEAVY_HITTER_MIN_GROUPS groups, a streamed
+    Space-Saving pass is used instead, unless its bounds cannot
+    guarantee the top n (see SpaceSaving.top_guaranteed), in which
+    case the exact totals are computed after all.
+
+    Returns (frame of [group_col, value_col], caption or None); the
+    caption states the error bound of approximate results.
+    """
+    cube = get_cube(df)
+    exact_cube = cube is not None and cube.has([group_col]) and value_col in cube.measures
+
+    if approximate is None:
+        groups = _group_count(df, group_col)
+        approximate = not exact_cube and groups is not None and groups > HEAVY_HITTER_MIN_GROUPS
+
+    def compute():
+        if approximate:
+            top, summary = heavy_hitters(df, group_col, value_col, n)
+            if summary.top_guaranteed(n):
+                frame = pd.DataFrame({
+                    group_col: top.index.to_numpy(),
+                    value_col: top["estimate"].to_numpy()
+                })
+                return frame, error_caption(summary)
+
+        if exact_cube:
+            totals = cube.rollup([group_col])[[group_col, value_col]]
+        else:
+            totals = df.groupby(group_col, as_index=False, observed=True)[value_col].sum()
+        return top_n_frame(totals, value_col, n).reset_index(drop=True), None
+
+    frame, caption = cached_aggregate(
+        df, [group_col], [value_col],
+        ("sum", "top", n, "approx" if approximate else "exact"),
+        compute
+    )
+    return frame.copy(deep=False), caption
@@ -1,6 +1,12 @@
 import plotly.express as px
+import plotly.graph_objects as go
 import pandas as pd
 
+from utils.agg_cache import cached_aggregate
+from utils.cube import get_cube
+from utils.orders import order_value_quantiles
+from utils.topn import top_groups
+
 
 # ---------------- Line Chart ----------------
 def line_sales_trend(df, date_col, sales_col):
@@ -17,11 +23,16 @@ def line_sales_trend(df, date_col, sales_col):
     ):
         return px.line(title="Sales Trend")
 
-    trend = (
-        df.groupby(date_col, as_index=False)[sales_col]
-        .sum()
-        .sort_values(date_col)
-    )
+    def compute():
+        cube = get_cube(df)
+        if cube is not None and cube.has([date_col]) and sales_col in cube.measures:
+            trend = cube.rollup([date_col])[[date_col, sales_col]]
+        else:
+            trend = df.groupby(date_col, as_index=False)[sales_col].sum()
+        return trend.sort_values(date_col)
+
+    # Tagged per module: the other line_sales_trend shapes its result differently
+    trend = cached_aggregate(df, [date_col], [sales_col], ("sum", "visualizations.line_sales_trend"), compute)
 
     fig = px.line(
         trend,
@@ -40,9 +51,11 @@ def line_sales_trend(df, date_col, sales_col):
 
 
 # ---------------- Bar Chart ----------------
-def bar_top(df, group_col, value_col, title="Top 10"):
+def bar_top(df, group_col, value_col, title="Top 10", top_n=10, approximate=None):
     """
     Create a bar chart for top N categories by value.
+    Approximate (heavy-hitter) results carry their error bound in the
+    chart caption.
     """
     if (
         df is None
@@ -54,19 +67,14 @@ def bar_top(df, group_col, value_col, title="Top 10"):
     ):
         return px.bar(title=title)
 
-    agg = (
-        df.groupby(group_col, as_index=False)[value_col]
-        .sum()
-        .sort_values(value_col, ascending=False)
-        .head(10)
-    )
+    agg, caption = top_groups(df, group_col, value_col, top_n, approximate)
 
     fig = px.bar(
         agg,
         x=group_col,
         y=value_col,
         text=value_col,
-        title=title
+        title=title if caption is None else f"{title}<br><sup>{caption}</sup>"
     )
 
     fig.update_traces(texttemplate="%{text:,.0f}", textposition="outside")
@@ -98,14 +106,23 @@ def heatmap(df, x_col, y_col, value_col, title="Heatmap"):
     ):
         return px.imshow(title=title)
 
-    pivot_df = pd.pivot_table(
-        df,
-        index=y_col,
-        columns=x_col,
-        values=value_col,
-        aggfunc="sum",
-        fill_value=0
-    )
+    def compute():
+        source = df
+        cube = get_cube(df)
+        if cube is not None and cube.has([x_col, y_col]) and value_col in cube.measures:
+            source = cube.rollup([x_col, y_col])
+
+        return pd.pivot_table(
+            source,
+            index=y_col,
+            columns=x_col,
+            values=value_col,
+            aggfunc="sum",
+            fill_value=0,
+            observed=True
+        )
+
+    pivot_df = cached_aggregate(df, [y_col, x_col], [value_col], "pivot_sum", compute)
 
     fig = px.imshow(
         pivot_df,
@@ -127,6 +144,42 @@ def heatmap(df, x_col, y_col, value_col, title="Heatmap"):
     return fig
 
 
+# ---------------- Box Summary ----------------
+BOX_QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+
+def box_order_values(df, group_col, sales_col, order_col, title="Order Value Distribution", top_n=15):
+    """
+    Box summary of order values per group (whiskers at p5 / p95), where
+    an order's value in a group is the sum of its lines there; drawn
+    from precomputed quantiles rather than the raw orders.
+    Shows the top_n groups by number of orders.
+    """
+    summary = order_value_quantiles(df, sales_col, order_col, BOX_QUANTILES, group_col)
+    if summary.empty:
+        return go.Figure(layout={"title": title})
+
+    summary = summary.nlargest(top_n, "orders")
+
+    fig = go.Figure(go.Box(
+        x=summary[group_col].astype(str),
+        lowerfence=summary["p5"],
+        q1=summary["p25"],
+        median=summary["p50"],
+        q3=summary["p75"],
+        upperfence=summary["p95"],
+        name="Order value"
+    ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title=group_col,
+        yaxis_title="Order value",
+        template="plotly_white"
+    )
+    return fig
+
+
 # ---------------- KPI Cards ----------------
 def kpi_card(value, name, color="green"):
     """
@@ -2,6 +2,8 @@
 
 import pandas as pd
 
+from utils.agg_cache import cached_aggregate
+
 
 def warehouse_kpis(
     df: pd.DataFrame,
@@ -21,23 +23,26 @@ def warehouse_kpis(
         if col not in df.columns:
             return pd.DataFrame()
 
-    temp = df[[warehouse_col, sales_col, qty_col]].copy()
-
-    result = (
-        temp
-        .groupby(warehouse_col, as_index=False)
-        .agg(
-            Total_Sales=(sales_col, "sum"),
-            Total_Quantity=(qty_col, "sum"),
-            Order_Count=(sales_col, "count")
+    def compute():
+        result = (
+            df[[warehouse_col, sales_col, qty_col]]
+            .groupby(warehouse_col, as_index=False, observed=True)
+            .agg(
+                Total_Sales=(sales_col, "sum"),
+                Total_Quantity=(qty_col, "sum"),
+                Order_Count=(sales_col, "count")
+            )
         )
-    )
 
-    # Fill numeric nulls
-    num_cols = result.select_dtypes(include="number").columns
-    result[num_cols] = result[num_cols].fillna(0)
+        # Fill numeric nulls
+        num_cols = result.select_dtypes(include="number").columns
+        result[num_cols] = result[num_cols].fillna(0)
 
-    return result
+        return result
+
+    return cached_aggregate(
+        df, [warehouse_col], [sales_col, qty_col], "warehouse_kpis", compute
+    )
 
 
 def warehouse_asset_analysis(
@@ -58,19 +63,22 @@ def warehouse_asset_analysis(
         if col not in df.columns:
             return pd.DataFrame()
 
-    temp = df[[warehouse_col, asset_col, sales_col]].copy()
-
-    result = (
-        temp
-        .groupby([warehouse_col, asset_col], as_index=False)
-        .agg(
-            Sales=(sales_col, "sum"),
-            Orders=(sales_col, "count")
+    def compute():
+        result = (
+            df[[warehouse_col, asset_col, sales_col]]
+            .groupby([warehouse_col, asset_col], as_index=False, observed=True)
+            .agg(
+                Sales=(sales_col, "sum"),
+                Orders=(sales_col, "count")
+            )
         )
-    )
 
-    # Fill numeric nulls
-    num_cols = result.select_dtypes(include="number").columns
-    result[num_cols] = result[num_cols].fillna(0)
+        # Fill numeric nulls
+        num_cols = result.select_dtypes(include="number").columns
+        result[num_cols] = result[num_cols].fillna(0)
 
-    return result
+        return result
+
+    return cached_aggregate(
+        df, [warehouse_col, asset_col], [sales_col], "warehouse_assets", compute
+    )